@@ -0,0 +1,263 @@
+"""
+Asynchrone Anbindung externer SAT-Solver. Die Solver werden mit asyncio.create_subprocess_exec gestartet und
+erhalten die KNF im DIMACS Format ueber stdin, es werden keine Dateien mit festen Namen verwendet. Ein Semaphor
+begrenzt die Anzahl gleichzeitig laufender Prozesse, nach Ablauf des Zeitlimits wird der Prozess beendet.
+
+Die Ausgabe wird zeilenweise gelesen, waehrend der Solver noch laeuft. Erkannt werden das Format der
+SAT-Competition ("s SATISFIABLE", "v 1 -2 0") und das Ergebnisformat von minisat ("SAT", "1 -2 0").
+Liefert der Solver keine Statuszeile, wird der Exit-Code 10 bzw. 20 ausgewertet.
+"""
+import asyncio
+import collections
+import os
+import subprocess
+import time
+
+from aufgabe1neu import ENCODING_TSEITIN, ParserStringToDIMACS
+
+STATUS_SAT = "SAT"
+STATUS_UNSAT = "UNSAT"
+STATUS_UNKNOWN = "UNKNOWN"
+STATUS_TIMEOUT = "TIMEOUT"
+STATUS_ERROR = "ERROR"
+
+# minisat liest die KNF von stdin und schreibt das Ergebnis nach stdout
+DEFAULT_COMMAND = ("minisat", "-verb=0", "/dev/stdin", "/dev/stdout")
+
+SolverResult = collections.namedtuple("SolverResult", ["index", "status", "model", "seconds", "error"])
+
+_STATUS_WORDS = {
+    "SAT": STATUS_SAT,
+    "SATISFIABLE": STATUS_SAT,
+    "UNSAT": STATUS_UNSAT,
+    "UNSATISFIABLE": STATUS_UNSAT,
+    "INDET": STATUS_UNKNOWN,
+    "UNKNOWN": STATUS_UNKNOWN,
+}
+
+_EXIT_CODES = {10: STATUS_SAT, 20: STATUS_UNSAT}
+
+
+class _OutputParser:
+    """ Wertet die Ausgabe eines Solvers Zeile fuer Zeile aus """
+    def __init__(self):
+        self.status = None
+        self.literals = []
+
+    def feed(self, line):
+        words = line.split()
+        if not words or words[0] == "c":
+            return
+        if words[0] == "s" and len(words) > 1:
+            self.status = _STATUS_WORDS.get(words[1], STATUS_UNKNOWN)
+        elif words[0] == "v":
+            self._add_literals(words[1:])
+        elif words[0] in _STATUS_WORDS:
+            self.status = _STATUS_WORDS[words[0]]
+        elif self.status == STATUS_SAT:
+            # minisat schreibt die Literale ohne "v" in die Zeile nach "SAT"
+            try:
+                self._add_literals(words)
+            except ValueError:
+                pass
+
+    def _add_literals(self, words):
+        literals = [int(word) for word in words]
+        self.literals.extend(literal for literal in literals if literal != 0)
+
+    def model(self, num_variables):
+        """ Liefert die Literale aller Variablen, nicht ausgegebene Variablen sind falsch """
+        if self.status != STATUS_SAT or not self.literals:
+            return None
+        values = {abs(literal): literal for literal in self.literals}
+        return [values.get(variable, -variable) for variable in range(1, max(num_variables, len(values)) + 1)]
+
+
+def _count_variables(clauses):
+    return max((abs(literal) for clause in clauses for literal in clause), default=0)
+
+
+def _iter_dimacs_chunks(clauses, num_variables, chunk_size):
+    """ Liefert eine Klauselmenge im DIMACS Format als bytes in Stuecken von etwa chunk_size Byte """
+    lines = ["p cnf " + str(num_variables) + " " + str(len(clauses)) + "\n"]
+    size = 0
+    for clause in clauses:
+        line = "".join(str(literal) + " " for literal in clause) + "0\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(lines).encode("ascii")
+            lines = []
+            size = 0
+    if lines:
+        yield "".join(lines).encode("ascii")
+
+
+class AsyncSolver:
+    """
+    Startet einen externen Solver je Klauselmenge. Es laufen hoechstens max_concurrent Prozesse gleichzeitig,
+    weitere Aufrufe von solve warten, bis ein Prozess beendet ist.
+
+    Attribute: calls: Anzahl der gestarteten Prozesse
+               timeouts: Anzahl der Prozesse, die nach Ablauf des Zeitlimits beendet wurden
+               peak_processes: hoechste Anzahl gleichzeitig laufender Prozesse
+    """
+    def __init__(self, command=DEFAULT_COMMAND, max_concurrent=None, timeout=None, chunk_size=65536):
+        """
+            :param command: Programm und Argumente, die KNF wird auf stdin geschrieben
+            :param max_concurrent: maximale Anzahl gleichzeitiger Prozesse, None fuer die Anzahl der CPUs
+            :param timeout: Zeitlimit je Aufruf in Sekunden oder None
+            :param chunk_size: Groesse der Stuecke, in denen die KNF geschrieben und die Ausgabe gelesen wird
+        """
+        self.calls = 0
+        self.timeouts = 0
+        self.peak_processes = 0
+        self._command = list(command)
+        self._max_concurrent = max_concurrent or os.cpu_count() or 1
+        self._timeout = timeout
+        self._chunk_size = chunk_size
+        self._running = 0
+        # das Semaphor gehoert zu einer Ereignisschleife und wird je Schleife neu angelegt
+        self._loop = None
+        self._semaphore = None
+
+    @property
+    def max_concurrent(self):
+        return self._max_concurrent
+
+    def _limit(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+        return self._semaphore
+
+    async def solve(self, clauses, num_variables=None, index=0):
+        """ Loest eine Klauselmenge mit dem externen Solver
+
+            :param clauses: ClauseStore oder Liste von Klauseln (Listen von int)
+            :param num_variables: Anzahl der Variablen, None fuer die groesste vorkommende Variable
+            :param index: wird unveraendert in das Ergebnis uebernommen
+            :return: SolverResult, model ist bei STATUS_SAT die Liste der Literale aller Variablen, sonst None;
+                     error enthaelt bei STATUS_ERROR die Beschreibung des Fehlers
+        """
+        if num_variables is None:
+            num_variables = getattr(clauses, "num_variables", None)
+            if num_variables is None:
+                num_variables = _count_variables(clauses)
+        async with self._limit():
+            return await self._run(clauses, num_variables, index)
+
+    async def _run(self, clauses, num_variables, index):
+        start = time.perf_counter()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self._command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as error:
+            return SolverResult(index, STATUS_ERROR, None, time.perf_counter() - start, str(error))
+        self.calls += 1
+        self._running += 1
+        self.peak_processes = max(self.peak_processes, self._running)
+        parser = _OutputParser()
+        try:
+            await asyncio.wait_for(self._communicate(process, clauses, num_variables, parser), self._timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return SolverResult(index, STATUS_TIMEOUT, None, time.perf_counter() - start, None)
+        except ValueError as error:
+            return SolverResult(index, STATUS_ERROR, None, time.perf_counter() - start, str(error))
+        finally:
+            # nach Zeitlimit, Fehler oder Abbruch darf kein Prozess zurueckbleiben
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            self._running -= 1
+        status = parser.status or _EXIT_CODES.get(process.returncode)
+        if status is None:
+            return SolverResult(index, STATUS_ERROR, None, time.perf_counter() - start,
+                                "Solver exited with code %d without a result" % process.returncode)
+        return SolverResult(index, status, parser.model(num_variables), time.perf_counter() - start, None)
+
+    async def _communicate(self, process, clauses, num_variables, parser):
+        # Schreiben und Lesen laufen gleichzeitig, sonst koennten beide Pipes volllaufen
+        await asyncio.gather(self._feed(process, clauses, num_variables), self._read(process, parser))
+        await process.wait()
+
+    async def _feed(self, process, clauses, num_variables):
+        try:
+            for chunk in _iter_dimacs_chunks(clauses, num_variables, self._chunk_size):
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # der Solver hat beendet, ohne die ganze Eingabe zu lesen, das Ergebnis steht in seiner Ausgabe
+            return
+        process.stdin.close()
+
+    async def _read(self, process, parser):
+        rest = b""
+        while True:
+            chunk = await process.stdout.read(self._chunk_size)
+            if not chunk:
+                break
+            lines = (rest + chunk).split(b"\n")
+            rest = lines.pop()
+            for line in lines:
+                parser.feed(line.decode("ascii", "replace"))
+        if rest:
+            parser.feed(rest.decode("ascii", "replace"))
+
+    async def solve_many(self, problems):
+        """ Loest viele Klauselmengen gleichzeitig. Die Eingabe wird nur so weit gelesen, wie Aufrufe in Arbeit
+            sind, die Ergebnisse werden geliefert, sobald sie vorliegen.
+
+            :param problems: Iterable von ClauseStore oder Listen von Klauseln
+            :return: asynchroner Generator von SolverResult, index ist die Position in problems
+        """
+        problems = iter(problems)
+        pending = set()
+        next_index = 0
+        try:
+            while True:
+                while len(pending) < 2 * self._max_concurrent:
+                    problem = next(problems, None)
+                    if problem is None:
+                        break
+                    pending.add(asyncio.ensure_future(self.solve(problem, index=next_index)))
+                    next_index += 1
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+def solve_formulas(formulas, command=DEFAULT_COMMAND, max_concurrent=None, timeout=None, encoding=ENCODING_TSEITIN):
+    """ Loest Formeln mit einem externen Solver, mehrere Prozesse laufen gleichzeitig
+
+        :param formulas: Liste von Strings oder Objekten der Klasse Term
+        :param command: Programm und Argumente, siehe AsyncSolver
+        :param max_concurrent: maximale Anzahl gleichzeitiger Prozesse
+        :param timeout: Zeitlimit je Formel in Sekunden oder None
+        :param encoding: ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN oder ENCODING_PLAISTED_GREENBAUM
+        :return: Liste von SolverResult in der Reihenfolge der Formeln, model ist bei STATUS_SAT ein Dictionary
+                 Variable -> Boolean der Variablen der Formel
+    """
+    stores = [ParserStringToDIMACS.convert_formula_to_clauses(formula, encoding) for formula in formulas]
+    solver = AsyncSolver(command, max_concurrent, timeout)
+
+    async def collect():
+        return [result async for result in solver.solve_many(stores)]
+
+    results = [None] * len(stores)
+    for result in asyncio.run(collect()):
+        model = result.model
+        if model is not None:
+            names = stores[result.index].variable_names
+            model = {names[abs(literal) - 1]: literal > 0 for literal in model if names[abs(literal) - 1] is not None}
+        results[result.index] = result._replace(model=model)
+    return results
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+from asyncsolver import (
+    STATUS_ERROR, STATUS_SAT, STATUS_TIMEOUT, STATUS_UNSAT, AsyncSolver, _OutputParser, solve_formulas,
+)
+
+# Ersatz fuer einen Solver: liest DIMACS von stdin, "--minisat" waehlt das Ausgabeformat von minisat,
+# "--sleep" wartet vor der Antwort
+FAKE_SOLVER = """import itertools, sys, time
+if "--sleep" in sys.argv:
+    time.sleep(float(sys.argv[sys.argv.index("--sleep") + 1]))
+lines = [line.split() for line in sys.stdin if line.strip() and line[0] not in "cp"]
+clauses = [[int(x) for x in line[:-1]] for line in lines]
+n = max([abs(l) for c in clauses for l in c] + [0])
+for bits in itertools.product((False, True), repeat=n):
+    if all(any(bits[abs(l) - 1] == (l > 0) for l in c) for c in clauses):
+        model = " ".join(str(v if bits[v - 1] else -v) for v in range(1, n + 1))
+        print("SAT\\n" + model + " 0" if "--minisat" in sys.argv else "s SATISFIABLE\\nv " + model + " 0")
+        sys.exit(10)
+print("UNSAT" if "--minisat" in sys.argv else "s UNSATISFIABLE")
+sys.exit(20)
+"""
+
+
+def _fake_solver(directory):
+    script = os.path.join(directory, "fake_solver.py")
+    with open(script, "w") as file:
+        file.write(FAKE_SOLVER)
+    return [sys.executable, script]
+
+
+def test_output_parser():
+    parser = _OutputParser()
+    for line in ["c comment", "s SATISFIABLE", "v 1 -2", "v 3 0"]:
+        parser.feed(line)
+    assert parser.status == STATUS_SAT and parser.model(4) == [1, -2, 3, -4]
+    parser = _OutputParser()
+    for line in ["SAT", "-1 2 0"]:
+        parser.feed(line)
+    assert parser.model(2) == [-1, 2]
+    parser = _OutputParser()
+    parser.feed("UNSATISFIABLE")
+    assert parser.status == STATUS_UNSAT and parser.model(2) is None
+
+
+def test_solve_many_with_concurrency_limit():
+    with tempfile.TemporaryDirectory() as directory:
+        command = _fake_solver(directory)
+        problems = [[[1, 2], [-1], [-2, 3]], [[1], [-1]], [], [[1, -2], [2]]] * 2
+        solver = AsyncSolver(command, max_concurrent=2)
+
+        async def collect():
+            return [result async for result in solver.solve_many(problems)]
+
+        results = sorted(asyncio.run(collect()))
+        assert [result.index for result in results] == list(range(8))
+        assert [result.status for result in results[:4]] == [STATUS_SAT, STATUS_UNSAT, STATUS_SAT, STATUS_SAT]
+        assert results[0].model == [-1, 2, 3] and results[3].model == [1, 2]
+        assert solver.calls == 8 and 1 <= solver.peak_processes <= 2
+        minisat = AsyncSolver(command + ["--minisat"])
+        result = asyncio.run(minisat.solve([[1, 2], [-1]], num_variables=3))
+        assert result.status == STATUS_SAT and result.model == [-1, 2, -3]
+
+
+def test_timeout_and_errors():
+    with tempfile.TemporaryDirectory() as directory:
+        command = _fake_solver(directory)
+        solver = AsyncSolver(command + ["--sleep", "30"], timeout=0.5)
+        result = asyncio.run(solver.solve([[1]]))
+        assert result.status == STATUS_TIMEOUT and result.seconds < 10
+        assert solver.timeouts == 1
+        result = asyncio.run(AsyncSolver([os.path.join(directory, "missing")]).solve([[1]]))
+        assert result.status == STATUS_ERROR
+        result = asyncio.run(AsyncSolver([sys.executable, "-c", "import sys; sys.exit(3)"]).solve([[1]]))
+        assert result.status == STATUS_ERROR and "code 3" in result.error
+        results = solve_formulas(["And(a,Not(b))", "And(a,Not(a))"], command, max_concurrent=2)
+        assert results[0].status == STATUS_SAT and results[0].model == {"a": True, "b": False}
+        assert results[1].status == STATUS_UNSAT and results[1].model is None
+
+
+test_output_parser()
+test_solve_many_with_concurrency_limit()
+test_timeout_and_errors()
@@ -1,80 +1,797 @@
+import collections
+import contextlib
+import io
+import itertools
+import os
+import re
 import subprocess
+import sys
+import tempfile
+import time
+import weakref
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from preprocessing import Preprocessor
+from solver import CDCLSolver
+
+# Ein Token ist eine Klammer, ein Komma oder ein Name aus beliebigen anderen Zeichen ausser Leerraum
+_TOKEN_PATTERN = re.compile(r"\s*([(),]|[^\s(),]+)")
+
+# minimale und maximale Anzahl der Parameter je Operator, None fuer beliebig viele
+_OPERATOR_ARITY = {
+    "Or": (1, None),
+    "And": (1, None),
+    "Not": (1, 1),
+    "Impl": (2, 2),
+    "BiImpl": (2, 2),
+}
+
+
+# Operatoren, deren gleichnamige Parameter in Term eingeebnet werden
+_FLATTENED_OPERATORS = frozenset(("And", "Or"))
+
+# Anzahl der bisher neu angelegten Terme, siehe allocated_terms
+_allocated_terms = 0
+
+# Operatorkennungen, siehe Term.code
+OP_VARIABLE = 0
+OP_TOP = 1
+OP_BOT = 2
+OP_NOT = 3
+OP_AND = 4
+OP_OR = 5
+OP_IMPL = 6
+OP_BIIMPL = 7
+
+_OPERATOR_CODES = {
+    "TOP": OP_TOP,
+    "BOT": OP_BOT,
+    "Not": OP_NOT,
+    "And": OP_AND,
+    "Or": OP_OR,
+    "Impl": OP_IMPL,
+    "BiImpl": OP_BIIMPL,
+}
+
+# Kodierungen fuer convert_formula_to_dimacs
+ENCODING_DISTRIBUTIVE = "distributive"
+ENCODING_TSEITIN = "tseitin"
+ENCODING_PLAISTED_GREENBAUM = "plaisted-greenbaum"
+
+# SAT-Solver fuer get_all_models
+BACKEND_CDCL = "cdcl"
+BACKEND_MINISAT = "minisat"
+
+# Polaritaeten eines Teilterms fuer die Plaisted-Greenbaum Kodierung
+_POSITIVE = 1
+_NEGATIVE = 2
+_BOTH = _POSITIVE | _NEGATIVE
+
+# Aufgaben auf den expliziten Stacks von convert_to_cnf und apply_distributive_law_completely
+_EVALUATE = 0
+_COMBINE = 1
+_STORE = 2
+_COMPOUND_OPERATORS = frozenset(("Or", "And", "Impl", "BiImpl"))
+
+
+# Ergebnis je Formel bei ParserStringToDIMACS.convert_formulas_to_dimacs:
+# Index in der Eingabe, Formel, DIMACS-String oder None, Exception oder None
+BatchResult = collections.namedtuple("BatchResult", ["index", "formula", "dimacs", "error"])
+
+
+class FormulaSyntaxError(Exception):
+    """
+    Fehler beim Einlesen einer Formel, die nicht der vorgegebenen Syntax entspricht
+
+    Attribute: position: Zeichenoffset im Eingabestring, an dem der Fehler erkannt wurde
+    """
+    def __init__(self, message, position):
+        super().__init__("%s at position %d" % (message, position))
+        self.message = message
+        self.position = position
+
+    def __reduce__(self):
+        return FormulaSyntaxError, (self.message, self.position)
+
+
 class Term:
     """
     Klasse zur Repraesentation von logischen Ausdruecken der Form
-    Operator(Term1,Term2), Not(Term), Variable, TOP, BOT
+    Operator(Term1,Term2), And(Term1,...,TermN), Or(Term1,...,TermN), Not(Term), Variable, TOP, BOT
+
+    Terme sind unveraenderlich und werden ueber eine Unique-Tabelle geteilt (Hash-Consing):
+    strukturell gleiche Terme sind dasselbe Objekt, Vergleich und Hashwert kosten daher O(1).
+    And/Or-Parameter mit demselben Operator werden beim Erzeugen eingeebnet,
+    And(And(a,b),c) ist derselbe Term wie And(a,b,c).
 
-    Attribute: parameters: Liste der Parameter eines Terms, Anzahl der Elemente
+    Attribute: parameters: Tupel der Parameter eines Terms, Anzahl der Elemente
                          entspricht der Stelligkeit des Operators
 
                 operator: enthaelt die Art der Verknuepfung eines logischen Ausdrucks
-                          2-stellig: Or, And, Biimpl, Impl
+                          n-stellig: Or, And
+                          2-stellig: Biimpl, Impl
                           1-stellig: Not
                           0-stellig: Variable, BOT, TOP
 
+                code: Operatorkennung als Zahl (OP_VARIABLE, OP_TOP, OP_BOT, OP_NOT, OP_AND, OP_OR, OP_IMPL, OP_BIIMPL)
+
+    """
+    __slots__ = ("operator", "parameters", "code", "_hash", "__weakref__")
+
+    # Unique-Tabelle (Operator, Parameter) -> Term, nicht mehr referenzierte Terme fallen heraus
+    _unique_table = weakref.WeakValueDictionary()
+
+    def __new__(cls, operator, parameters=None):
+        global _allocated_terms
+        parameters = tuple(parameters) if parameters else ()
+        if operator in _FLATTENED_OPERATORS and any(parameter.operator == operator for parameter in parameters):
+            flattened = []
+            for parameter in parameters:
+                if parameter.operator == operator:
+                    flattened.extend(parameter.parameters)
+                else:
+                    flattened.append(parameter)
+            parameters = tuple(flattened)
+        key = (operator, parameters)
+        term = cls._unique_table.get(key)
+        if term is None:
+            operator = sys.intern(operator)
+            term = object.__new__(cls)
+            object.__setattr__(term, "operator", operator)
+            object.__setattr__(term, "parameters", parameters)
+            object.__setattr__(term, "code", _OPERATOR_CODES.get(operator, OP_VARIABLE))
+            object.__setattr__(term, "_hash", hash(key))
+            cls._unique_table[key] = term
+            _allocated_terms += 1
+        return term
+
+    def __hash__(self):
+        return self._hash
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Term is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Term is immutable")
+
+    def __reduce__(self):
+        return Term, (self.operator, self.parameters)
+
+
+def allocated_terms():
+    """ Anzahl der seit dem Programmstart neu angelegten Terme, Treffer in der Unique-Tabelle zaehlen nicht
+
+    :return: int
+    """
+    return _allocated_terms
+
+
+class CNFCache:
+    """
+    Beschraenkter Cache fuer ParserStringToDIMACS.convert_to_cnf, der umgewandelte Teilterme speichert.
+    Da Terme ueber Hash-Consing geteilt werden, ist der Term selbst der Schluessel. Ist der Cache voll,
+    wird der am laengsten nicht verwendete Eintrag verdraengt (LRU).
+
+    Attribute: maxsize: maximale Anzahl der Eintraege, None fuer unbeschraenkt
+               hits: Anzahl der Treffer
+               misses: Anzahl der Fehlversuche
+    """
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def get(self, term):
+        """ Liefert die gespeicherte KNF eines Terms
+
+        :param term: Objekt der Klasse Term
+        :return: Term in KNF oder None
+        """
+        result = self._entries.get(term)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(term)
+        return result
+
+    def put(self, term, result):
+        """ Speichert die KNF eines Terms
+
+        :param term: Objekt der Klasse Term
+        :param result: Term in KNF
+        """
+        self._entries[term] = result
+        self._entries.move_to_end(term)
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """ Entfernt alle Eintraege, die Zaehler bleiben erhalten """
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ConversionStats:
+    """
+    Messwerte einer Umwandlung, die den Funktionen von ParserStringToDIMACS ueber den Parameter stats uebergeben
+    werden koennen. Ohne stats (None) wird nichts gemessen.
+
+    Stufen: "parse" (build_term_from_string), "convert" (convert_to_cnf), darin enthalten "simplify" (simplify),
+    "nnf" (to_nnf), "rewrite" (De Morgan, doppelte Verneinung, verneinte Implikationen) und "distribute"
+    (Distributivgesetz), "emit" (Klauseln als ganzzahlige Literale, bei den definitorischen Kodierungen
+    einschliesslich der Umwandlung), "preprocess", "dimacs" (Stringausgabe) und "solve" (Aufrufe des SAT-Solvers).
+
+    Attribute: stage_seconds: Dictionary Stufe -> Sekunden
+               stage_terms: Dictionary Stufe -> Anzahl der in der Stufe neu angelegten Terme
+               distributive_expansions: Anzahl der Anwendungen des Distributivgesetzes, die ein Or ausmultipliziert haben
+               max_stack_depth: groesste Tiefe des Stacks von convert_to_cnf, entspricht der Rekursionstiefe
+               solver_calls: Anzahl der Aufrufe von solve()
+               callback: Funktion, die nach jeder Stufe und jedem Solveraufruf mit (Stufe, Sekunden, stats)
+                         aufgerufen wird, oder None
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.stage_seconds = {}
+        self.stage_terms = {}
+        self.distributive_expansions = 0
+        self.max_stack_depth = 0
+        self.solver_calls = 0
+
+    @property
+    def terms_allocated(self):
+        return sum(self.stage_terms.values())
+
+    @property
+    def solver_seconds(self):
+        return self.stage_seconds.get("solve", 0.0)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """ Misst die Laufzeit und die neu angelegten Terme eines Abschnitts als Stufe name
+
+        :param name: String
+        """
+        terms = _allocated_terms
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            seconds = time.perf_counter() - start
+            self.stage_terms[name] = self.stage_terms.get(name, 0) + _allocated_terms - terms
+            self.add_time(name, seconds)
+            if self.callback is not None:
+                self.callback(name, seconds, self)
+
+    def add_time(self, name, seconds):
+        """ Addiert die Laufzeit eines Teils einer Stufe, ohne callback aufzurufen
+
+        :param name: String
+        :param seconds: float
+        """
+        self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+
+    def as_dict(self):
+        """ Messwerte als Dictionary, z.B. fuer die Ausgabe als JSON """
+        return {
+            "stage_seconds": dict(self.stage_seconds),
+            "stage_terms": dict(self.stage_terms),
+            "terms_allocated": self.terms_allocated,
+            "distributive_expansions": self.distributive_expansions,
+            "max_stack_depth": self.max_stack_depth,
+            "solver_calls": self.solver_calls,
+            "solver_seconds": self.solver_seconds,
+        }
+
+
+class VariableMap:
+    """
+    Zuordnung zwischen Variablennamen und Variablennummern im DIMACS Format.
+
+    Attribute: variable_number_by_name: Dictionary, das jeder Variablen der Formel ihre Nummer zuordnet
+               variable_names: Liste der Variablennamen, Eintrag i gehoert zu Variable i + 1,
+                               Hilfsvariablen haben den Namen None
     """
-    def __init__(self, operator, parameters=None):
-        self.parameters = parameters
-        self.operator = operator
+    def __init__(self):
+        self.variable_number_by_name = {}
+        self.variable_names = []
+
+    @property
+    def num_variables(self):
+        return len(self.variable_names)
+
+    def variable_number(self, name):
+        """ Liefert die Nummer einer Variablen der Formel, neue Namen erhalten die naechste freie Nummer
+
+        :param name: String
+        :return: int
+        """
+        number = self.variable_number_by_name.get(name)
+        if number is None:
+            self.variable_names.append(name)
+            number = len(self.variable_names)
+            self.variable_number_by_name[name] = number
+        return number
+
+    def new_auxiliary_variable(self):
+        """ Legt eine neue Hilfsvariable ohne Namen an
+
+        :return: Nummer der Hilfsvariablen
+        """
+        self.variable_names.append(None)
+        return len(self.variable_names)
+
+    def original_variables(self):
+        """ Nummern aller Variablen, die zur Formel gehoeren und keine Hilfsvariablen sind
+
+        :return: Liste von int
+        """
+        return [number for number, name in enumerate(self.variable_names, 1) if name is not None]
+
+
+class ClauseStore(VariableMap):
+    """
+    Kompakter Speicher fuer eine Klauselmenge mit ganzzahligen Literalen wie im DIMACS Format:
+    Variable n als Literal n, Not(Variable n) als -n.
+
+    Attribute: literals: array('i') mit den Literalen aller Klauseln hintereinander
+               offsets: array('q'), Klausel i belegt literals[offsets[i]:offsets[i + 1]]
+               sowie die Attribute von VariableMap
+    """
+    def __init__(self):
+        super().__init__()
+        self.literals = array("i")
+        self.offsets = array("q", [0])
+
+    @property
+    def num_clauses(self):
+        return len(self.offsets) - 1
+
+    def add_clause(self, literals):
+        """ Haengt eine Klausel an
+
+        :param literals: Iterable von int
+        """
+        self.literals.extend(literals)
+        self.offsets.append(len(self.literals))
+
+    def clause(self, index):
+        """ Liefert die Literale der Klausel mit dem gegebenen Index
+
+        :param index: int
+        :return: array('i')
+        """
+        return self.literals[self.offsets[index]:self.offsets[index + 1]]
+
+    def __len__(self):
+        return self.num_clauses
+
+    def __iter__(self):
+        literals = self.literals
+        offsets = self.offsets
+        for index in range(len(offsets) - 1):
+            yield literals[offsets[index]:offsets[index + 1]]
+
+    def to_dimacs(self):
+        """ Erzeugt in einem Durchlauf die Stringausgabe im DIMACS Format. Gibt es Hilfsvariablen,
+            folgt auf die Kopfzeile eine Kommentarzeile "c ind ... 0" mit den Nummern der Variablen der Formel.
+
+        :return: DIMACS-String
+        """
+        lines = ["p cnf " + str(self.num_variables) + " " + str(self.num_clauses)]
+        if None in self.variable_names:
+            lines.append("c ind " + "".join(str(number) + " " for number in self.original_variables()) + "0")
+        for clause in self:
+            lines.append("".join(str(literal) + " " for literal in clause) + "0")
+        return "\n".join(lines)
+
+
+class DimacsWriter(VariableMap):
+    """
+    Schreibt Klauseln im DIMACS Format direkt in ein Datei-Objekt im Text- oder Binaermodus, waehrend sie erzeugt
+    werden. Es werden nur die Zeilen bis zur Puffergroesse im Speicher gehalten.
+    Sind die Anzahl der Variablen und Klauseln beim Anlegen bekannt, wird die Kopfzeile sofort geschrieben.
+    Sonst wird eine Kopfzeile fester Breite reserviert und in close() ueberschrieben, dazu muss die Datei
+    seekable sein. In diesem Fall koennen auch nach close() weitere Klauseln angehaengt werden.
+    Sobald es Hilfsvariablen gibt, werden die Nummern der Variablen der Formel in Kommentarzeilen "c ind ... 0"
+    festgehalten.
+
+    Attribute: file: Datei-Objekt, in das geschrieben wird
+               num_clauses: Anzahl der bisher geschriebenen Klauseln
+               sowie die Attribute von VariableMap
+    """
+    # "p cnf " und zwei Zahlen mit bis zu 20 Stellen
+    _HEADER_WIDTH = 47
+
+    def __init__(self, file, num_variables=None, num_clauses=None, buffer_size=65536):
+        super().__init__()
+        self.file = file
+        self.num_clauses = 0
+        self._binary = _is_binary_file(file)
+        self._buffer = []
+        self._buffered_size = 0
+        self._buffer_size = buffer_size
+        self._has_auxiliary_variables = False
+        self._declared_variables = 0
+        if num_variables is None or num_clauses is None:
+            if not (hasattr(file, "seekable") and file.seekable()):
+                raise ValueError("Header counts are required for a file object that is not seekable")
+            self._expected_counts = None
+            self._header_position = file.tell()
+            self._write("p cnf 0 0".ljust(DimacsWriter._HEADER_WIDTH) + "\n")
+        else:
+            self._expected_counts = (num_variables, num_clauses)
+            self._header_position = None
+            self._write("p cnf " + str(num_variables) + " " + str(num_clauses) + "\n")
+
+    @property
+    def num_variables(self):
+        return max(len(self.variable_names), self._declared_variables)
+
+    def declare_variables(self, num_variables):
+        """ Sorgt dafuer, dass die Kopfzeile mindestens num_variables Variablen angibt, z.B. wenn Klauseln mit
+            bereits nummerierten Literalen ohne Namen geschrieben werden
+
+        :param num_variables: int
+        """
+        self._declared_variables = max(self._declared_variables, num_variables)
+
+    def variable_number(self, name):
+        num_variables = len(self.variable_names)
+        number = super().variable_number(name)
+        if self._has_auxiliary_variables and number > num_variables:
+            self._write("c ind " + str(number) + " 0\n")
+        return number
+
+    def new_auxiliary_variable(self):
+        if not self._has_auxiliary_variables:
+            self._has_auxiliary_variables = True
+            self._write("c ind " + "".join(str(number) + " " for number in self.original_variables()) + "0\n")
+        return super().new_auxiliary_variable()
+
+    def add_clause(self, literals):
+        """ Schreibt eine Klausel
+
+        :param literals: Iterable von int
+        """
+        self.num_clauses += 1
+        self._write("".join(str(literal) + " " for literal in literals) + "0\n")
+
+    def _write(self, line):
+        self._buffer.append(line)
+        self._buffered_size += len(line)
+        if self._buffered_size >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """ Schreibt den Puffer in die Datei """
+        if self._buffer:
+            chunk = "".join(self._buffer)
+            self.file.write(chunk.encode("ascii") if self._binary else chunk)
+            self._buffer = []
+            self._buffered_size = 0
+
+    def close(self):
+        """ Schreibt den Puffer und traegt bei reservierter Kopfzeile die aktuellen Anzahlen ein.
+            Die Datei selbst bleibt geoeffnet.
+        """
+        self.flush()
+        if self._header_position is not None:
+            end = self.file.tell()
+            header = "p cnf " + str(self.num_variables) + " " + str(self.num_clauses)
+            self.file.seek(self._header_position)
+            header = header.ljust(DimacsWriter._HEADER_WIDTH)
+            self.file.write(header.encode("ascii") if self._binary else header)
+            self.file.seek(end)
+        elif self._expected_counts is not None and self._expected_counts != (self.num_variables, self.num_clauses):
+            raise ValueError("Written CNF does not match the header counts")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.flush()
+
+
+class _ChunkList:
+    """ Datei-Ersatz fuer DimacsWriter, der die geschriebenen Stuecke in einer Liste sammelt """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+
+
+def _is_binary_file(file):
+    """ Prueft, ob ein Datei-Objekt bytes statt str erwartet """
+    if isinstance(file, io.TextIOBase):
+        return False
+    if isinstance(file, (io.BufferedIOBase, io.RawIOBase)):
+        return True
+    return "b" in getattr(file, "mode", "")
+
+
+class MinisatSolver:
+    """
+    Anbindung des externen Programms minisat mit derselben Schnittstelle wie CDCLSolver (add_clause, solve, model).
+    Die Klauseln stehen in einer Datei in einem eigenen temporaeren Verzeichnis, neue Klauseln werden angehaengt
+    und nur die Kopfzeile wird an Ort und Stelle aktualisiert.
+
+    Attribute: model: nach erfolgreichem solve() die Liste der Literale aller Variablen, sonst None
+               calls: Anzahl der Aufrufe von minisat
+    """
+    def __init__(self, clauses=(), num_variables=0, command="minisat"):
+        self.model = None
+        self.calls = 0
+        self._command = command
+        self._directory = tempfile.TemporaryDirectory(prefix="minisat-")
+        self._cnf_path = os.path.join(self._directory.name, "problem.cnf")
+        self._model_path = os.path.join(self._directory.name, "problem.model")
+        self._file = open(self._cnf_path, "w+")
+        self._writer = DimacsWriter(self._file)
+        self._writer.declare_variables(num_variables)
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, literals):
+        """ Haengt eine Klausel an die Datei an
+
+            :param literals: Iterable von int
+        """
+        literals = list(literals)
+        if literals:
+            self._writer.declare_variables(max(abs(literal) for literal in literals))
+        self._writer.add_clause(literals)
+        return True
+
+    def solve(self, assumptions=()):
+        """ Ruft minisat fuer die bisherigen Klauseln auf
+
+            :param assumptions: Literale, die fuer diesen Aufruf als Einheitsklauseln angenommen werden
+            :return: True, falls erfuellbar (Modell in self.model), sonst False
+        """
+        self.model = None
+        if assumptions:
+            raise ValueError("The minisat backend does not support assumptions")
+        self._writer.close()
+        self._file.flush()
+        self.calls += 1
+        subprocess.run([self._command, self._cnf_path, self._model_path],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with open(self._model_path, "r") as modelfile:
+            result = modelfile.read().split()
+        if not result or result[0] != "SAT":
+            return False
+        self.model = [int(literal) for literal in result[1:] if literal != "0"]
+        # minisat gibt unbelegte Variablen am Ende nicht immer aus
+        for variable in range(len(self.model) + 1, self._writer.num_variables + 1):
+            self.model.append(-variable)
+        return True
+
+    def close(self):
+        """ Entfernt die temporaeren Dateien """
+        self._file.close()
+        self._directory.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class IncrementalCNF(ClauseStore):
+    """
+    Klauselmenge, die schrittweise um Klauseln und Formeln erweitert wird, z.B. um Modelle auszuschliessen oder
+    weitere Bedingungen hinzuzufuegen. Die Nummern der Variablen bleiben erhalten, eine neue Formel wird allein
+    umgewandelt und verwendet die Nummern bereits bekannter Variablen.
+    Ist eine Datei angegeben, wird jede neue Klausel angehaengt, ohne die Datei neu zu lesen oder zu schreiben; die
+    Kopfzeile hat feste Breite und wird mit sync() an Ort und Stelle aktualisiert. Sobald es Hilfsvariablen gibt,
+    werden die Variablen der Formeln wie bei write_dimacs in Zeilen "c ind ... 0" festgehalten. Der Solver von
+    solve() erhaelt nur die Klauseln, die seit dem letzten Aufruf hinzugekommen sind.
+
+    Attribute: model: nach erfolgreichem solve() Dictionary Variable -> Boolean der benannten Variablen, sonst None
+               sowie die Attribute von ClauseStore
+    """
+    def __init__(self, file=None, encoding=ENCODING_DISTRIBUTIVE, cache=None):
+        """
+            :param file: seekable Datei-Objekt fuer die DIMACS-Ausgabe oder None
+            :param encoding: Kodierung fuer add_formula, ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN oder
+                             ENCODING_PLAISTED_GREENBAUM
+            :param cache: CNFCache fuer die distributive Kodierung oder None
+        """
+        super().__init__()
+        self.model = None
+        self._encoding = encoding
+        self._cache = cache
+        self._writer = None if file is None else DimacsWriter(file)
+        self._solver = None
+        self._solved_clauses = 0
+
+    def variable_number(self, name):
+        number = super().variable_number(name)
+        # der DimacsWriter nummeriert gleich und haelt die Variablen der Formel in "c ind"-Zeilen fest
+        if self._writer is not None:
+            self._writer.variable_number(name)
+        return number
+
+    def new_auxiliary_variable(self):
+        number = super().new_auxiliary_variable()
+        if self._writer is not None:
+            self._writer.new_auxiliary_variable()
+        return number
+
+    def add_clause(self, literals):
+        """ Haengt eine Klausel an und schreibt sie in die Datei
+
+        :param literals: Iterable von int
+        """
+        literals = list(literals)
+        super().add_clause(literals)
+        if self._writer is not None:
+            self._writer.add_clause(literals)
+
+    def add_formula(self, formula):
+        """ Wandelt eine Formel um und haengt ihre Klauseln an, die Klauselmenge wird also mit der Formel
+            konjugiert. Eine Formel, deren KNF TOP ist, fuegt keine Klausel hinzu, BOT die leere Klausel.
+
+        :param formula: String oder Objekt der Klasse Term
+        :return: Anzahl der neuen Klauseln
+        """
+        before = self.num_clauses
+        for clause in ParserStringToDIMACS.clause_source(formula, self._encoding, self._cache)(self):
+            self.add_clause(clause)
+        return self.num_clauses - before
+
+    def sync(self):
+        """ Schreibt gepufferte Klauseln in die Datei und traegt die aktuellen Anzahlen in die Kopfzeile ein.
+            Danach koennen weitere Klauseln hinzugefuegt werden.
+        """
+        self._writer.declare_variables(self.num_variables)
+        self._writer.close()
+        self._writer.file.flush()
+
+    def solve(self, assumptions=()):
+        """ Prueft die bisherigen Klauseln auf Erfuellbarkeit mit einem inkrementellen CDCLSolver
+
+        :param assumptions: Literale, die nur fuer diesen Aufruf angenommen werden
+        :return: True, falls erfuellbar (Modell in self.model), sonst False
+        """
+        if self._solver is None:
+            self._solver = CDCLSolver()
+        for index in range(self._solved_clauses, self.num_clauses):
+            self._solver.add_clause(self.clause(index))
+        self._solved_clauses = self.num_clauses
+        self.model = None
+        if not self._solver.solve(assumptions):
+            return False
+        values = self._solver.model
+        self.model = {
+            name: number <= len(values) and values[number - 1] > 0
+            for number, name in enumerate(self.variable_names, 1) if name is not None
+        }
+        return True
 
 
 class ParserStringToDIMACS:
 
+    @staticmethod
+    def tokenize(formula):
+        """ Zerlegt eine Formel im Stringformat in einem einzigen Durchlauf in Tokens.
+            Leerraum wird dabei uebersprungen. Ein Token ist entweder eine Klammer, ein Komma
+            oder ein Name (Operator oder Variable), Namen duerfen aus mehreren Zeichen bestehen.
+
+            Argumente: formula: String
+
+            returns: Generator von Paaren (token, position), position ist der Zeichenoffset im String
+        """
+        for match in _TOKEN_PATTERN.finditer(formula):
+            yield match.group(1), match.start(1)
+
     @staticmethod
     def build_term_from_string(formula):
         """ Erzeugt für eine Formel im Stringformat,
             welche nach der vorgegebenen Syntax gebildet wurde,
-            einen entsprechenden Term
+            einen entsprechenden Term.
+            Die Formel wird einmal von links nach rechts gelesen, die offenen Operatoren liegen
+            auf einem expliziten Stack, die Laufzeit ist daher linear in der Laenge der Formel.
 
             Argumente: formula: String
 
             returns: term
+            raises: FormulaSyntaxError mit dem Zeichenoffset des Fehlers
     """
-        formula = ParserStringToDIMACS.eat_whitespace(formula)
-        if len(formula) > 3:
-            if formula[:2] == "Or":
-                formula = formula[3:len(formula) - 1]
-                operator = "Or"
-            elif formula[:3] == "And":
-                formula = formula[4:len(formula) - 1]
-                operator = "And"
-            elif formula[:3] == "Not":
-                formula = formula[4:len(formula) - 1]
-                operator = "Not"
-            elif formula[:4] == "Impl":
-                formula = formula[5:len(formula) - 1]
-                operator = "Impl"
-            elif formula[:6] == "BiImpl":
-                formula = formula[7:len(formula) - 1]
-                operator = "BiImpl"
+        # Stack der offenen Operatoren, jeder Eintrag: [Operator, Position, Parameterliste]
+        stack = []
+        result = None
+        # Name, bei dem noch nicht feststeht, ob er Operator oder Variable ist
+        pending_name = None
+        pending_position = 0
+        expect_operand = True
+        for token, position in ParserStringToDIMACS.tokenize(formula):
+            if pending_name is not None:
+                if token == "(":
+                    if pending_name not in _OPERATOR_ARITY:
+                        raise FormulaSyntaxError("Unknown operator '%s'" % pending_name, pending_position)
+                    stack.append([pending_name, pending_position, []])
+                    pending_name = None
+                    continue
+                if pending_name in _OPERATOR_ARITY:
+                    raise FormulaSyntaxError("Expected '(' after operator '%s'" % pending_name, pending_position)
+                term = Term(pending_name, [])
+                pending_name = None
+                if not stack:
+                    result = term
+                else:
+                    stack[-1][2].append(term)
+                expect_operand = False
+            if result is not None:
+                raise FormulaSyntaxError("Unexpected '%s' after end of formula" % token, position)
+            if expect_operand:
+                if token in "(),":
+                    raise FormulaSyntaxError("Expected operand, found '%s'" % token, position)
+                pending_name = token
+                pending_position = position
+            elif token == ",":
+                operator, _, parameters = stack[-1]
+                maximum = _OPERATOR_ARITY[operator][1]
+                if maximum is not None and len(parameters) >= maximum:
+                    raise FormulaSyntaxError("Too many parameters for '%s'" % operator, position)
+                expect_operand = True
+            elif token == ")":
+                operator, operator_position, parameters = stack.pop()
+                if len(parameters) < _OPERATOR_ARITY[operator][0]:
+                    raise FormulaSyntaxError("Too few parameters for '%s'" % operator, operator_position)
+                if operator in _FLATTENED_OPERATORS:
+                    # verschachtelte And/Or werden als Parameterliste an den gleichen Operator darueber
+                    # weitergegeben und erst beim aeussersten Operator in einem Durchlauf eingeebnet,
+                    # so bleibt auch das Einlesen langer Ketten linear
+                    if stack and stack[-1][0] == operator:
+                        stack[-1][2].append(parameters)
+                        continue
+                    parameters = ParserStringToDIMACS._flatten_parameter_lists(parameters)
+                term = Term(operator, parameters)
+                if not stack:
+                    result = term
+                else:
+                    stack[-1][2].append(term)
             else:
-                assert False, "No valid formula"
-
-            left_parameter = ""
-            right_parameter = ""
-            parentheses_count = 0
-            for i in range(0, len(formula)):
-                if formula[i] == "(":
-                    parentheses_count += 1
-                elif formula[i] == ")":
-                    parentheses_count -= 1
-                if formula[i] == "," and parentheses_count == 0:
-                    right_parameter = formula[i + 1:len(formula)]
-                    break
-                left_parameter += formula[i]
+                raise FormulaSyntaxError("Expected ',' or ')', found '%s'" % token, position)
+        if pending_name is not None and pending_name in _OPERATOR_ARITY:
+            raise FormulaSyntaxError("Expected '(' after operator '%s'" % pending_name, pending_position)
+        if pending_name is not None and not stack:
+            result = Term(pending_name, [])
+        elif stack:
+            raise FormulaSyntaxError("Unexpected end of formula", len(formula))
+        if result is None:
+            raise FormulaSyntaxError("Empty formula", 0)
+        return result
 
-            left_parameter_term = ParserStringToDIMACS.build_term_from_string(left_parameter)  # recursion
-            if operator == "Not":
-                if right_parameter != "":
-                    assert False, "No valid formula"
-                term = Term(operator, [left_parameter_term])
+    @staticmethod
+    def _flatten_parameter_lists(parameters):
+        """ Ebnet die von build_term_from_string verschachtelten Parameterlisten ein
+
+            Argumente: parameters: Liste aus Termen und weiteren solchen Listen
+            returns: Liste der Terme in der Reihenfolge der Formel
+        """
+        flattened = []
+        stack = [iter(parameters)]
+        while stack:
+            for parameter in stack[-1]:
+                if isinstance(parameter, list):
+                    stack.append(iter(parameter))
+                    break
+                flattened.append(parameter)
             else:
-                right_parameter_term = ParserStringToDIMACS.build_term_from_string(right_parameter)  # recursion
-                term = Term(operator, [left_parameter_term, right_parameter_term])
-            return term
-        else:
-            term = Term(formula, [])
-            return term
+                stack.pop()
+        return flattened
 
     @staticmethod
     def eat_whitespace(formula_in_string):
@@ -83,13 +800,7 @@ class ParserStringToDIMACS:
             Argumente: formula_in_string: String
             returns: String ohne Leerzeichen
         """
-        new_formula_in_string = ""
-        for i in range(0, len(formula_in_string)):
-            if formula_in_string[i] != " ":
-                new_formula_in_string += formula_in_string[i]
-            else:
-                continue
-        return new_formula_in_string
+        return formula_in_string.replace(" ", "")
 
     @staticmethod
     def replace_implication(term):
@@ -131,19 +842,38 @@ class ParserStringToDIMACS:
         replaced = term
         if term.operator == "Not":
             if term.parameters[0].operator == "Or":
-                replaced = Term(
-                    "And",
-                    [Term("Not", [term.parameters[0].parameters[0]]), Term("Not", [term.parameters[0].parameters[1]])]
-                )
+                replaced = Term("And", [Term("Not", [parameter]) for parameter in term.parameters[0].parameters])
             if term.parameters[0].operator == "And":
-                replaced = Term(
-                    "Or",
-                    [Term("Not", [term.parameters[0].parameters[0]]), Term("Not", [term.parameters[0].parameters[1]])]
-                )
+                replaced = Term("Or", [Term("Not", [parameter]) for parameter in term.parameters[0].parameters])
             if term.parameters[0].operator == "Not":
                 replaced = Term(term.parameters[0].parameters[0].operator, term.parameters[0].parameters[0].parameters)
         return replaced
 
+    @staticmethod
+    def variables_of(term):
+        """ Liefert die Namen der Variablen eines Terms in der Reihenfolge ihres ersten Auftretens von links nach
+            rechts, jeden Namen einmal
+
+        :param term: Objekt der Klasse Term
+        :return: Liste von Strings
+        """
+        names = []
+        seen = set()
+        visited = set()
+        stack = [term]
+        while stack:
+            current = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            if current.code == OP_VARIABLE:
+                if current.operator not in seen:
+                    seen.add(current.operator)
+                    names.append(current.operator)
+            else:
+                stack.extend(reversed(current.parameters))
+        return names
+
     @staticmethod
     def is_clause(term):
         """ Ueberprueft, ob ein Term eine Klausel ist
@@ -152,18 +882,20 @@ class ParserStringToDIMACS:
                                 :return: true, falls Klausel
         """
         operators = ("Or", "And", "Not", "Impl", "BiImpl")
-        if term.operator not in operators:
-            return True
-        elif term.operator == "Not":
-            if term.parameters[0].operator not in operators:
-                return True
+        # die Parameter verschachtelter Or werden ueber einen Stack statt rekursiv geprueft
+        stack = [term]
+        while stack:
+            term = stack.pop()
+            if term.operator not in operators:
+                continue
+            elif term.operator == "Not":
+                if term.parameters[0].operator in operators:
+                    return False
+            elif term.operator == "Or":
+                stack.extend(term.parameters)
             else:
                 return False
-        elif term.operator == "Or":
-            res = (ParserStringToDIMACS.is_clause(term.parameters[0]) and ParserStringToDIMACS.is_clause(term.parameters[1]))
-            return res
-        else:
-            return False
+        return True
 
     @staticmethod
     def apply_distributive_law(term):
@@ -174,140 +906,476 @@ class ParserStringToDIMACS:
         """
         if term.operator != "Or":  # hack: wir brauchen nur Or, da And bereits in KNF
             return term
-        else:
-            if term.parameters[0].operator != "And" and term.parameters[1].operator != "And":
-                return term
-            # Fall: Or(And(a,b ), And(c, d)
-            elif term.parameters[0].operator == "And" and term.parameters[1].operator =="And":
-                t1 = Term("Or", [term.parameters[0].parameters[0], term.parameters[1].parameters[0]])
-                t2 = Term("Or", [term.parameters[0].parameters[0], term.parameters[1].parameters[1]])
-                t3 = Term("Or", [term.parameters[0].parameters[1], term.parameters[1].parameters[0]])
-                t4 = Term("Or", [term.parameters[0].parameters[1], term.parameters[1].parameters[1]])
-                and1 = Term("And", [t1, t2])
-                and2 = Term("And", [t3, t4])
-                return Term("And", [and1, and2])
-            # Fall: Or(And(a,b ), c)
-            elif term.parameters[0].operator == "And" and term.parameters[1].operator != "And":
-                t1 = Term("Or", [term.parameters[0].parameters[0], term.parameters[1]])
-                t2 = Term("Or", [term.parameters[0].parameters[1], term.parameters[1]])
-                return Term("And", [t1, t2])
-            # Fall: Or(c, And(a,b))
-            elif term.parameters[0].operator != "And" and term.parameters[1].operator == "And":
-                t1 = Term("Or", [term.parameters[1].parameters[0], term.parameters[0]])
-                t2 = Term("Or", [term.parameters[1].parameters[1], term.parameters[0]])
-                return Term("And", [t1, t2])
-
-    @staticmethod
-    def convert_to_cnf(term):
+        conjunctions = [parameter.parameters for parameter in term.parameters if parameter.operator == "And"]
+        if not conjunctions:
+            return term
+        # Fall: Or(And(a,b), And(c,d), e) -> And(Or(a,c,e), Or(a,d,e), Or(b,c,e), Or(b,d,e)),
+        # je ein Parameter aus jedem And, gefolgt von den uebrigen Parametern des Or
+        rest = [parameter for parameter in term.parameters if parameter.operator != "And"]
+        return Term("And", [Term("Or", list(choice) + rest) for choice in itertools.product(*conjunctions)])
+
+    @staticmethod
+    def apply_distributive_law_completely(term, stats=None):
+        """ Wendet das Distributivgesetz so lange an, bis kein Or mehr ein And als Parameter hat.
+            apply_distributive_law zieht das Or nur um eine Ebene nach innen, bei verschachtelten And
+            in den Parametern enthalten die entstehenden Or-Terme wieder And-Terme.
+            Die Terme werden ueber einen expliziten Stack abgearbeitet, die Schachtelungstiefe ist daher
+            nicht durch das Rekursionslimit begrenzt.
+
+        :param term: Or-Term, dessen Parameter in KNF sind
+        :param stats: ConversionStats oder None
+        :return: term in KNF
+        """
+        if stats is not None:
+            start = time.perf_counter()
+        results = []
+        # Aufgaben: Term umformen oder die letzten n Ergebnisse zu einem And zusammenfassen
+        tasks = [(_EVALUATE, term)]
+        while tasks:
+            action, current = tasks.pop()
+            if action == _COMBINE:
+                parameters = results[-current:]
+                del results[-current:]
+                results.append(Term("And", parameters))
+            elif current.operator == "And":
+                tasks.append((_COMBINE, len(current.parameters)))
+                tasks.extend((_EVALUATE, parameter) for parameter in reversed(current.parameters))
+            else:
+                result = ParserStringToDIMACS.apply_distributive_law(current)
+                if result is current:
+                    results.append(current)
+                else:
+                    tasks.append((_EVALUATE, result))
+                    if stats is not None:
+                        stats.distributive_expansions += 1
+        if stats is not None:
+            stats.add_time("distribute", time.perf_counter() - start)
+        return results[0]
+
+    @staticmethod
+    def _negate(term):
+        """ Verneint einen Term und faltet dabei Konstanten und doppelte Verneinungen """
+        if term.code == OP_TOP:
+            return Term("BOT", [])
+        if term.code == OP_BOT:
+            return Term("TOP", [])
+        if term.code == OP_NOT:
+            return term.parameters[0]
+        return Term("Not", [term])
+
+    @staticmethod
+    def _complementary(left, right):
+        return (left.code == OP_NOT and left.parameters[0] is right) or \
+               (right.code == OP_NOT and right.parameters[0] is left)
+
+    @staticmethod
+    def _commutative_key(term):
+        """ Schluessel, unter dem And/Or-Terme mit denselben Parametern in anderer Reihenfolge gleich sind """
+        if term.code == OP_AND or term.code == OP_OR:
+            return term.code, frozenset(term.parameters)
+        return term
+
+    @staticmethod
+    def _simplify_junction(code, parameters):
+        """ Vereinfacht And (code OP_AND) bzw. Or (OP_OR) mit bereits vereinfachten Parametern:
+            neutrale Konstanten entfallen, die absorbierende Konstante oder ein komplementaeres Paar ergibt die
+            Konstante, doppelte Parameter entfallen, ein Parameter mit dem dualen Operator, der einen anderen
+            Parameter enthaelt, wird absorbiert (And(a, Or(a, b)) = a, Or(a, And(a, b)) = a).
+        """
+        neutral, absorbing = (OP_TOP, OP_BOT) if code == OP_AND else (OP_BOT, OP_TOP)
+        dual = OP_OR if code == OP_AND else OP_AND
+        key = ParserStringToDIMACS._commutative_key
+        result = []
+        seen = set()
+        present = set()
+        for parameter in parameters:
+            # gleichnamige Parameter werden eingeebnet
+            for item in (parameter.parameters if parameter.code == code else (parameter,)):
+                if item.code == absorbing:
+                    return Term("TOP", []) if absorbing == OP_TOP else Term("BOT", [])
+                # nur identische Parameter entfallen, so bleiben bereits in KNF gegebene Klauseln erhalten
+                if item.code == neutral or item in present:
+                    continue
+                present.add(item)
+                seen.add(key(item))
+                result.append(item)
+        for item in result:
+            if item.code == OP_NOT and key(item.parameters[0]) in seen:
+                return Term("TOP", []) if absorbing == OP_TOP else Term("BOT", [])
+        result = [
+            item for item in result
+            if item.code != dual or not any(key(inner) in seen for inner in item.parameters)
+        ]
+        if not result:
+            return Term("TOP", []) if neutral == OP_TOP else Term("BOT", [])
+        if len(result) == 1:
+            return result[0]
+        return Term("And" if code == OP_AND else "Or", result)
+
+    @staticmethod
+    def _simplify_node(term, parameters):
+        """ Vereinfacht einen Knoten, dessen Parameter bereits vereinfacht sind """
+        code = term.code
+        if code == OP_NOT:
+            return ParserStringToDIMACS._negate(parameters[0])
+        if code == OP_AND or code == OP_OR:
+            return ParserStringToDIMACS._simplify_junction(code, parameters)
+        if code == OP_IMPL:
+            left, right = parameters
+            if left.code == OP_BOT or right.code == OP_TOP or left is right:
+                return Term("TOP", [])
+            if left.code == OP_TOP:
+                return right
+            if right.code == OP_BOT:
+                return ParserStringToDIMACS._negate(left)
+            if ParserStringToDIMACS._complementary(left, right):
+                # Impl(Not(b), b) = b, Impl(a, Not(a)) = Not(a)
+                return right
+        elif code == OP_BIIMPL:
+            left, right = parameters
+            if left is right:
+                return Term("TOP", [])
+            if ParserStringToDIMACS._complementary(left, right):
+                return Term("BOT", [])
+            for constant, other in ((left, right), (right, left)):
+                if constant.code == OP_TOP:
+                    return other
+                if constant.code == OP_BOT:
+                    return ParserStringToDIMACS._negate(other)
+        if all(new is old for new, old in zip(parameters, term.parameters)):
+            return term
+        return Term(term.operator, parameters)
+
+    @staticmethod
+    def simplify(term, stats=None):
+        """ Vereinfacht einen Term strukturell von den Blaettern zur Wurzel: Konstanten werden gefaltet,
+            doppelte Verneinungen entfernt, doppelte Parameter von And/Or entfernt (Idempotenz), komplementaere
+            Parameter wie in And(a, Not(a)) oder BiImpl(a, Not(a)) erkannt und Absorption angewendet.
+            Gemeinsame Teilterme werden nur einmal vereinfacht, jeder Durchlauf ist daher fast linear in der
+            Groesse des Terms. Die Durchlaeufe werden wiederholt, bis sich der Term nicht mehr aendert.
+
+        :param term: Objekt der Klasse Term
+        :param stats: ConversionStats oder None
+        :return: aequivalenter Term
+        """
+        with stats.stage("simplify") if stats is not None else contextlib.nullcontext():
+            while True:
+                simplified = {}
+                stack = [(term, False)]
+                while stack:
+                    current, expanded = stack.pop()
+                    if current in simplified:
+                        continue
+                    if not current.parameters:
+                        simplified[current] = current
+                    elif not expanded:
+                        stack.append((current, True))
+                        stack.extend((parameter, False) for parameter in current.parameters)
+                    else:
+                        parameters = [simplified[parameter] for parameter in current.parameters]
+                        simplified[current] = ParserStringToDIMACS._simplify_node(current, parameters)
+                if simplified[term] is term:
+                    return term
+                term = simplified[term]
+
+    @staticmethod
+    def _nnf_requirements(term, positive):
+        """ Paare (Teilterm, Polaritaet), aus deren Negationsnormalform die von term in Polaritaet positive
+            zusammengesetzt wird
+        """
+        code = term.code
+        if code == OP_NOT:
+            return ((term.parameters[0], not positive),)
+        if code == OP_AND or code == OP_OR:
+            return tuple((parameter, positive) for parameter in term.parameters)
+        if code == OP_IMPL:
+            return (term.parameters[0], not positive), (term.parameters[1], positive)
+        if code == OP_BIIMPL:
+            left, right = term.parameters
+            return (left, True), (left, False), (right, True), (right, False)
+        return ()
+
+    @staticmethod
+    def _nnf_node(term, positive, nnf):
+        """ Negationsnormalform von term (positive) bzw. Not(term) (nicht positive)
+
+        :param nnf: Dictionary (Teilterm, Polaritaet) -> Negationsnormalform, enthaelt alle Paare aus
+                    _nnf_requirements
+        """
+        code = term.code
+        if code == OP_VARIABLE:
+            return term if positive else Term("Not", [term])
+        if code == OP_TOP or code == OP_BOT:
+            return term if positive else ParserStringToDIMACS._negate(term)
+        if code == OP_NOT:
+            return nnf[(term.parameters[0], not positive)]
+        if code == OP_AND or code == OP_OR:
+            parameters = [nnf[(parameter, positive)] for parameter in term.parameters]
+            if len(parameters) == 1:
+                return parameters[0]
+            # De Morgan: And(a, b) wird verneint zu Or(Not(a), Not(b)) und umgekehrt
+            return Term("And" if (code == OP_AND) == positive else "Or", parameters)
+        if code == OP_IMPL:
+            left, right = term.parameters
+            if positive:
+                return Term("Or", [nnf[(left, False)], nnf[(right, True)]])
+            return Term("And", [nnf[(left, True)], nnf[(right, False)]])
+        if code == OP_BIIMPL:
+            left, right = term.parameters
+            if positive:
+                return Term("And", [Term("Or", [nnf[(left, True)], nnf[(right, False)]]),
+                                    Term("Or", [nnf[(right, True)], nnf[(left, False)]])])
+            return Term("Or", [Term("And", [nnf[(left, False)], nnf[(right, True)]]),
+                               Term("And", [nnf[(right, False)], nnf[(left, True)]])])
+        raise ValueError("Unknown operator " + term.operator)
+
+    @staticmethod
+    def to_nnf(term, stats=None):
+        """ Wandelt einen Term in Negationsnormalform um: nur And, Or, Literale, TOP und BOT, Impl und BiImpl
+            werden dabei ersetzt. Jedes Paar (Teilterm, Polaritaet) wird genau einmal umgewandelt und das Ergebnis
+            wiederverwendet, ein Teilterm unter BiImpl also hoechstens zweimal. Der Aufwand ist damit linear in
+            der Groesse des geteilten Terms.
+
+        :param term: Objekt der Klasse Term
+        :param stats: ConversionStats oder None
+        :return: aequivalenter Term in Negationsnormalform
+        """
+        with stats.stage("nnf") if stats is not None else contextlib.nullcontext():
+            nnf = {}
+            stack = [(term, True, False)]
+            while stack:
+                current, positive, expanded = stack.pop()
+                key = (current, positive)
+                if key in nnf:
+                    continue
+                requirements = ParserStringToDIMACS._nnf_requirements(current, positive)
+                if expanded or not requirements:
+                    nnf[key] = ParserStringToDIMACS._nnf_node(current, positive, nnf)
+                    continue
+                stack.append((current, positive, True))
+                stack.extend((parameter, polarity, False) for parameter, polarity in reversed(requirements)
+                             if (parameter, polarity) not in nnf)
+            return nnf[(term, True)]
+
+    @staticmethod
+    def convert_to_cnf(term, cache=None, stats=None):
         """ Wandelt einen Term durch Anwendung von Umformungsregeln (De Morgan, Distributivgesetz,
             Umwandlung von Implikation/Biimplikation in Terme mit Or/And Verknuepfung)
-            in Konjunktive Normalform(KNF) um
+            in Konjunktive Normalform(KNF) um.
+            Der Term wird zuerst mit simplify vereinfacht und mit to_nnf in Negationsnormalform gebracht, danach
+            bleibt nur noch das Distributivgesetz anzuwenden.
+            Doppelte Literale und Klauseln werden entfernt, tautologische Klauseln wie Or(a, Not(a)) entfallen.
+            Die Teilterme werden ueber einen expliziten Stack abgearbeitet, so dass auch sehr tief
+            verschachtelte Formeln ohne RecursionError umgewandelt werden.
 
         :param term:
+        :param cache: CNFCache fuer bereits umgewandelte Teilterme oder None
+        :param stats: ConversionStats oder None
         :return: term in KNF
         """
-        if term.operator == "Or":
-            # wandle Parameter des Terms rekursiv in KNF um
-            parameter0 = ParserStringToDIMACS.convert_to_cnf(term.parameters[0])
-            parameter1 = ParserStringToDIMACS.convert_to_cnf(term.parameters[1])
+        if stats is not None:
+            with stats.stage("convert"):
+                term = ParserStringToDIMACS.to_nnf(ParserStringToDIMACS.simplify(term, stats), stats)
+                return ParserStringToDIMACS._convert_to_cnf(term, cache, stats)
+        term = ParserStringToDIMACS.to_nnf(ParserStringToDIMACS.simplify(term))
+        return ParserStringToDIMACS._convert_to_cnf(term, cache, None)
+
+    @staticmethod
+    def _convert_to_cnf(term, cache, stats):
+        """ Umwandlung fuer convert_to_cnf, mit stats werden Stacktiefe und Teilstufen gemessen """
+        max_depth = 0
+        results = []
+        # Aufgaben: (_EVALUATE, Term) wandelt einen Term um, (_COMBINE, Term) fasst die umgewandelten
+        # Parameter eines mehrstelligen Terms zusammen, (_STORE, Term) uebernimmt das Ergebnis eines
+        # umgeschriebenen Terms als Ergebnis des urspruenglichen Terms
+        tasks = [(_EVALUATE, term)]
+        while tasks:
+            if stats is not None and len(tasks) > max_depth:
+                max_depth = len(tasks)
+            action, current = tasks.pop()
+            if action == _EVALUATE:
+                if cache is not None:
+                    result = cache.get(current)
+                    if result is not None:
+                        results.append(result)
+                        continue
+                if current.operator in _COMPOUND_OPERATORS and len(current.parameters) > 1:
+                    # wandle zuerst die Parameter des Terms in KNF um
+                    tasks.append((_COMBINE, current))
+                    tasks.extend((_EVALUATE, parameter) for parameter in reversed(current.parameters))
+                    continue
+                result = current
+                if stats is None:
+                    rewritten = ParserStringToDIMACS._rewrite_for_cnf(current)
+                else:
+                    start = time.perf_counter()
+                    rewritten = ParserStringToDIMACS._rewrite_for_cnf(current)
+                    stats.add_time("rewrite", time.perf_counter() - start)
+            elif action == _COMBINE:
+                count = len(current.parameters)
+                parameters = results[-count:]
+                del results[-count:]
+                result, rewritten = ParserStringToDIMACS._combine_cnf(current.operator, parameters, stats)
+            else:
+                result = results.pop()
+                rewritten = None
+            if rewritten is not None and rewritten is not current:
+                tasks.append((_STORE, current))
+                tasks.append((_EVALUATE, rewritten))
+                continue
+            if cache is not None:
+                cache.put(current, result)
+                # ein Term in KNF wird durch erneutes Umwandeln nicht veraendert
+                if result is not current:
+                    cache.put(result, result)
+            results.append(result)
+        if stats is not None:
+            stats.max_stack_depth = max(stats.max_stack_depth, max_depth)
+        return results[0]
+
+    @staticmethod
+    def _rewrite_for_cnf(term):
+        """ Umformung eines Terms ohne zweistelligen Junktor fuer convert_to_cnf
+
+        :param term: Objekt der Klasse Term
+        :return: aequivalenter Term, der weiter umgewandelt werden muss, oder term selbst, falls term in KNF ist
+        """
+        # And/Or mit nur einem Parameter entspricht dem Parameter selbst
+        if term.operator == "Or" or term.operator == "And":
+            return term.parameters[0]
+        if term.operator != "Not":
+            return term
+        parameter = term.parameters[0]
+        # Pruefe, ob der Term aequivalent zu TOP/BOT ist
+        if parameter.operator == "BOT":
+            return Term("TOP", [])
+        if parameter.operator == "TOP":
+            return Term("BOT", [])
+        if parameter.operator == "And" or parameter.operator == "Or":
+            if len(parameter.parameters) == 1:
+                return Term("Not", [parameter.parameters[0]])
+            # De Morgan bei Termen mit Or/ And
+            return ParserStringToDIMACS.de_morgan(term)
+        # eliminiere doppelte Verneinung
+        if parameter.operator == "Not":
+            return parameter.parameters[0]
+        # wandle verneinte Implikation in And (term1, not term2) um
+        if parameter.operator == "Impl":
+            return Term("And", [parameter.parameters[0], Term("Not", [parameter.parameters[1]])])
+        # wandle verneinte BiImpl in Or(not term 1, not term 2) um
+        if parameter.operator == "BiImpl":
+            rep = ParserStringToDIMACS.replace_biimplication(parameter)
+            return Term("Or", [Term("Not", [rep.parameters[0]]), Term("Not", [rep.parameters[1]])])
+        return term
+
+    @staticmethod
+    def _combine_cnf(operator, parameters, stats=None):
+        """ Fasst die bereits in KNF umgewandelten Parameter eines mehrstelligen Terms fuer convert_to_cnf zusammen
+
+        :param operator: "Or", "And", "Impl" oder "BiImpl"
+        :param parameters: Liste der Parameter in KNF
+        :param stats: ConversionStats oder None
+        :return: (Ergebnis, None) oder (None, Term, der weiter umgewandelt werden muss)
+        """
+        if operator == "Or":
             # Pruefe, ob der Term aequivalent ist zu TOP
-            if parameter0.operator == "TOP" or parameter1.operator == "TOP":
-                return Term("TOP", [])
+            if any(parameter.operator == "TOP" for parameter in parameters):
+                return Term("TOP", []), None
             # entferne redundante BOT Parameter
-            if parameter0.operator == "BOT":
-                return parameter1
-            if parameter1.operator == "BOT":
-                return parameter0
-            else:
-                result = Term("Or", [parameter0, parameter1])
-                # Distributivgesetz, um das Or reinzuziehen
-                result = ParserStringToDIMACS.apply_distributive_law(result)
-                return result
-        elif term.operator == "Impl":
-            # wandle Parameter des Terms rekursiv in KNF um
-            parameter0 = ParserStringToDIMACS.convert_to_cnf(term.parameters[0])
-            parameter1 = ParserStringToDIMACS.convert_to_cnf(term.parameters[1])
+            parameters = [parameter for parameter in parameters if parameter.operator != "BOT"]
+            if not parameters:
+                return Term("BOT", []), None
+            if len(parameters) == 1:
+                return parameters[0], None
+            # Distributivgesetz, um das Or reinzuziehen
+            result = ParserStringToDIMACS.apply_distributive_law_completely(Term("Or", parameters), stats)
+            clauses = result.parameters if result.operator == "And" else (result,)
+            return ParserStringToDIMACS._conjunction_of_clauses(clauses), None
+        if operator == "And":
+            # Pruefe, ob der Term aequivalent ist zu BOT
+            if any(parameter.operator == "BOT" for parameter in parameters):
+                return Term("BOT", []), None
+            # entferne redundante TOP Parameter, die Klauseln der Parameter sind bereits vereinfacht
+            clauses = []
+            seen = set()
+            for parameter in parameters:
+                for clause in (parameter.parameters if parameter.operator == "And" else (parameter,)):
+                    if clause.operator != "TOP" and clause not in seen:
+                        seen.add(clause)
+                        clauses.append(clause)
+            if not clauses:
+                return Term("TOP", []), None
+            if len(clauses) == 1:
+                return clauses[0], None
+            return Term("And", clauses), None
+        parameter0, parameter1 = parameters
+        if operator == "Impl":
             # Pruefe, ob der Term aequivalent ist zu TOP
             if parameter0.operator == "BOT" or parameter1.operator == "TOP":
-                return Term("TOP", [])
+                return Term("TOP", []), None
             # entferne redundante Parameter
             if parameter0.operator == "TOP":
-                return parameter1
+                return parameter1, None
             if parameter1.operator == "BOT":
-                return ParserStringToDIMACS.convert_to_cnf(Term('Not', [parameter0]))
-            result = Term("Impl", [parameter0, parameter1])
-            result = ParserStringToDIMACS.replace_implication(result)
-            return ParserStringToDIMACS.convert_to_cnf(result)
-        elif term.operator == "BiImpl":
-            # wandle Parameter des Terms rekursiv in KNF um
-            parameter0 = ParserStringToDIMACS.convert_to_cnf(term.parameters[0])
-            parameter1 = ParserStringToDIMACS.convert_to_cnf(term.parameters[1])
-            # Pruefe, ob der Term aequivalent ist zu TOP
-            if parameter0.operator == "BOT" and parameter1.operator == "BOT":
-                return Term("TOP", [])
-            if parameter0.operator == "TOP" and parameter1.operator == "TOP":
-                return Term("TOP", [])
-            # entferne redundante Parameter
-            if parameter0.operator == "TOP":
-                return parameter1
-            if parameter1.operator == "TOP":
-                return parameter0
-            # Wenn einer der Parameter BOT ist,
-            # dann entspricht der Term dem invertierten anderen Parameter
-            if parameter0.operator == "BOT":
-                return ParserStringToDIMACS.convert_to_cnf(Term('Not', [parameter1]))
-            if parameter1.operator == "BOT":
-                return ParserStringToDIMACS.convert_to_cnf(Term('Not', [parameter0]))
-            result = Term("BiImpl", [parameter0, parameter1])
-            result = ParserStringToDIMACS.replace_biimplication(result)
-            return ParserStringToDIMACS.convert_to_cnf(result)
-        elif term.operator == "And":
-            # wandle Parameter des Terms rekursiv in KNF um
-            parameter0 = ParserStringToDIMACS.convert_to_cnf(term.parameters[0])
-            parameter1 = ParserStringToDIMACS.convert_to_cnf(term.parameters[1])
-            # entferne redundante Parameter
-            if parameter0.operator == "TOP":
-                return parameter1
-            if parameter1.operator == "TOP":
-                return parameter0
-            # Pruefe, ob der Term aequivalent ist zu BOT
-            if parameter0.operator == "BOT" or parameter1.operator == "BOT":
-                return Term("BOT", [])
-            else:
-                result = Term("And", [parameter0, parameter1])
-                return result
-        elif term.operator == "Not":
-            # Pruefe, ob der Term aequivalentyu TOP/BOT ist
-            if term.parameters[0].operator == "BOT":
-                return Term("TOP", [])
-            if term.parameters[0].operator == "TOP":
-                return Term("BOT", [])
-            # De Morgan bei Termen mit Or/ And
-            if term.parameters[0].operator == "And" or term.parameters[0].operator == "Or":
-                result = ParserStringToDIMACS.de_morgan(term)
-                result = ParserStringToDIMACS.convert_to_cnf(result)
-                return result
-            # eliminiere doppelte Verneinung
-            elif term.parameters[0].operator == "Not":
-                return ParserStringToDIMACS.convert_to_cnf(term.parameters[0].parameters[0])
-            # wandle verneinte Implikation in And (term1, not term2) um
-            elif term.parameters[0].operator == "Impl":
-                result = Term(
-                    "And",
-                    [term.parameters[0].parameters[0], Term("Not", [term.parameters[0].parameters[1]])]
-                )
-                return ParserStringToDIMACS.convert_to_cnf(result)
-            # wandle verneinte BiImpl in Or(not term 1, not term 2) um
-            elif term.parameters[0].operator == "BiImpl":
-                rep = ParserStringToDIMACS.replace_biimplication(term.parameters[0])
-                t1 = Term("Not", [rep.parameters[0]])
-                t2 = Term("Not", [rep.parameters[1]])
-                res = Term("Or", [t1, t2])
-                return ParserStringToDIMACS.convert_to_cnf(res)
-            else:
-                return term
-        else:
-            return term
+                return None, Term("Not", [parameter0])
+            return None, ParserStringToDIMACS.replace_implication(Term("Impl", [parameter0, parameter1]))
+        # Pruefe, ob der Term aequivalent ist zu TOP
+        if parameter0.operator == "BOT" and parameter1.operator == "BOT":
+            return Term("TOP", []), None
+        if parameter0.operator == "TOP" and parameter1.operator == "TOP":
+            return Term("TOP", []), None
+        # entferne redundante Parameter
+        if parameter0.operator == "TOP":
+            return parameter1, None
+        if parameter1.operator == "TOP":
+            return parameter0, None
+        # Wenn einer der Parameter BOT ist,
+        # dann entspricht der Term dem invertierten anderen Parameter
+        if parameter0.operator == "BOT":
+            return None, Term("Not", [parameter1])
+        if parameter1.operator == "BOT":
+            return None, Term("Not", [parameter0])
+        return None, ParserStringToDIMACS.replace_biimplication(Term("BiImpl", [parameter0, parameter1]))
+
+    @staticmethod
+    def _conjunction_of_clauses(clauses):
+        """ Entfernt doppelte Literale und Klauseln sowie tautologische Klauseln
+
+        :param clauses: Klauseln, jeweils ein Literal oder ein Or von Literalen
+        :return: And der verbleibenden Klauseln, eine einzelne Klausel oder TOP
+        """
+        result = []
+        seen = set()
+        for clause in clauses:
+            if clause.operator == "Or":
+                # Polaritaet je Variable, eine Variable in beiden Polaritaeten macht die Klausel wahr
+                polarities = {}
+                literals = []
+                for literal in clause.parameters:
+                    negative = literal.operator == "Not"
+                    atom = literal.parameters[0] if negative else literal
+                    polarity = polarities.get(atom)
+                    if polarity is None:
+                        polarities[atom] = negative
+                        literals.append(literal)
+                    elif polarity != negative:
+                        break
+                else:
+                    if len(literals) == 1:
+                        clause = literals[0]
+                    elif len(literals) < len(clause.parameters):
+                        clause = Term("Or", literals)
+                    if clause not in seen:
+                        seen.add(clause)
+                        result.append(clause)
+            elif clause not in seen:
+                seen.add(clause)
+                result.append(clause)
+        if not result:
+            return Term("TOP", [])
+        if len(result) == 1:
+            return result[0]
+        return Term("And", result)
 
     @staticmethod
     def build_pre_dimacs_string(term_in_cnf):
@@ -319,153 +1387,630 @@ class ParserStringToDIMACS:
                 :param term_in_cnf: Objekt der Klasse Term
                 :return: String
                 """
-        output = ""
-        if term_in_cnf.operator == "Or":
-            for x in term_in_cnf.parameters:
-                if x.operator == "Or":
-                    res = ParserStringToDIMACS.build_pre_dimacs_string(x)
-                    output += res
-                elif x.operator == "Not":
-                    variable = x.parameters[0].operator
-                    res = "-" + variable
-                    output += res
-                    output += " "
-                else:
-                    output += x.operator
-                    output += " "
-        # And bedeutet, dass (mind.) zwei Klauseln gefunden wurden, d
-        # aher werden diese durch einen Zeilenumbruch getrennt
-        elif term_in_cnf.operator == "And":
-            res1 = ParserStringToDIMACS.build_pre_dimacs_string(term_in_cnf.parameters[0])
-            res2 = ParserStringToDIMACS.build_pre_dimacs_string(term_in_cnf.parameters[1])
-            output += res1 + "\n"
-            output += res2
-        else:
-            if term_in_cnf.operator == "Not":
-                variable = term_in_cnf.parameters[0].operator
-                res = "-" + variable
-                output += res
-                # output += " 0"
+        output = []
+        # Aufgaben: (False, Term) fuer Terme ausserhalb eines Or, (True, Term) fuer Parameter eines Or
+        # und (None, String) fuer Zeilenumbrueche
+        tasks = [(False, term_in_cnf)]
+        while tasks:
+            in_clause, current = tasks.pop()
+            if in_clause is None:
+                output.append(current)
+            elif current.operator == "Or":
+                tasks.extend((True, parameter) for parameter in reversed(current.parameters))
+            # And bedeutet, dass (mind.) zwei Klauseln gefunden wurden, d
+            # aher werden diese durch einen Zeilenumbruch getrennt
+            elif current.operator == "And" and not in_clause:
+                for index in range(len(current.parameters) - 1, -1, -1):
+                    tasks.append((False, current.parameters[index]))
+                    if index > 0:
+                        tasks.append((None, "\n"))
             else:
-                output += term_in_cnf.operator
-                # output += " 0"
-        return output
+                if current.operator == "Not":
+                    output.append("-" + current.parameters[0].operator)
+                else:
+                    output.append(current.operator)
+                if in_clause:
+                    output.append(" ")
+        return "".join(output)
+
+    @staticmethod
+    def iter_clauses(term_in_cnf, variables):
+        """ Erzeugt die Klauseln eines Terms in KNF nacheinander als Listen ganzzahliger Literale.
+            Variablen werden in der Reihenfolge ihres ersten Auftretens nummeriert, Namen duerfen aus mehreren
+            Zeichen bestehen.
+
+                        :param term_in_cnf: Objekt der Klasse Term
+                        :param variables: VariableMap, z.B. ClauseStore oder DimacsWriter, fuer die Nummerierung
+                        :return: Generator von Klauseln
+        """
+        # And-Knoten werden in Klauseln zerlegt, Or-Knoten in Literale
+        clause_stack = [term_in_cnf]
+        while clause_stack:
+            term = clause_stack.pop()
+            if term.operator == "And":
+                clause_stack.extend(reversed(term.parameters))
+                continue
+            clause = []
+            literal_stack = [term]
+            while literal_stack:
+                literal = literal_stack.pop()
+                if literal.operator == "Or":
+                    literal_stack.extend(reversed(literal.parameters))
+                elif literal.operator == "Not" and not literal.parameters[0].parameters:
+                    clause.append(-variables.variable_number(literal.parameters[0].operator))
+                elif not literal.parameters:
+                    clause.append(variables.variable_number(literal.operator))
+                else:
+                    raise ValueError("Term is not in CNF, found '%s' inside a clause" % literal.operator)
+            yield clause
+
+    @staticmethod
+    def emit_clauses(term_in_cnf, store=None):
+        """ Schreibt die Klauseln eines Terms in KNF direkt als ganzzahlige Literale in einen ClauseStore
+            oder einen DimacsWriter.
+
+                        :param term_in_cnf: Objekt der Klasse Term
+                        :param store: ClauseStore oder DimacsWriter, der ergaenzt wird, oder None fuer einen neuen
+                                      ClauseStore
+                        :return: store
+        """
+        if store is None:
+            store = ClauseStore()
+        for clause in ParserStringToDIMACS.iter_clauses(term_in_cnf, store):
+            store.add_clause(clause)
+        return store
 
     @staticmethod
     def create_dimacs(term_in_cnf):
-        """ Erzeugt aus einem Objekt der Klasse Term in KNF eine Stringausgabe im DIMACS Format. Der Term wird zunächst
-            mittels build_string in ein Stringformat gebracht, in dem jede Klausel in einer Zeile steht und die
-            Operatoren And und Not jeweils durch Leerzeichen bzw. Minuszeichen repräsentiert werden.
-            Dieser wird dann in das DIMACS Format gebracht
+        """ Erzeugt aus einem Objekt der Klasse Term in KNF eine Stringausgabe im DIMACS Format. Die Klauseln werden
+            mittels emit_clauses als ganzzahlige Literale gesammelt und in einem Durchlauf als DIMACS ausgegeben.
 
                         :param term_in_cnf: Objekt der Klasse Term
                         :return: DIMACS-String
         """
-        # Dictionary, das jeder Variablen eine Zahl zuordnet
-        variable_number_by_name = {}
-        # da der Term  mindestens eine Klausel enthält und bei einer einzelnen Klausel kein Zeilenumbruch im String
-        # erfolgt, starten wir bei 1
-        num_clauses = 1
-        num_variables = 0
-        current_number = 1
-        # erstelle den vorläufigen Dimacs String
-        term_in_cnf = ParserStringToDIMACS.build_pre_dimacs_string(term_in_cnf)
-        # Zeilenumbruch = neue Klausel
-        for x in term_in_cnf:
-            if x == "\n":
-                num_clauses += 1
-            elif x == "-" or x == " " or x == "0":
+        return ParserStringToDIMACS.emit_clauses(term_in_cnf).to_dimacs()
+
+    @staticmethod
+    def iter_definitional_clauses(term, variables, polarity_aware=False):
+        """ Wandelt einen Term mit der Tseitin-Kodierung in eine erfuellbarkeitsaequivalente KNF um.
+            Jeder Teilterm mit Operator And, Or, Impl oder BiImpl erhaelt eine Hilfsvariable, die durch
+            Klauseln mit den Literalen seiner Parameter verknuepft wird, die Anzahl der Klauseln ist daher
+            linear in der Groesse des Terms. Mit polarity_aware=True (Plaisted-Greenbaum) werden nur die
+            Implikationsrichtungen erzeugt, die fuer die Polaritaet des Teilterms benoetigt werden.
+            Die Variablen der Formel erhalten die kleinsten Nummern in der Reihenfolge ihres ersten Auftretens,
+            alle groesseren Nummern sind Hilfsvariablen.
+
+        :param term: Objekt der Klasse Term
+        :param variables: VariableMap, z.B. ClauseStore oder DimacsWriter, fuer die Nummerierung
+        :param polarity_aware: Boolean
+        :return: Generator von Klauseln als Listen ganzzahliger Literale
+        """
+        # Teilterme in Postorder, jeder Teilterm nur einmal
+        order = []
+        visited = set()
+        stack = [(term, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
                 continue
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            stack.append((node, True))
+            for parameter in reversed(node.parameters):
+                stack.append((parameter, False))
+
+        # Polaritaeten von oben nach unten weitergeben, in umgekehrter Postorder stehen Terme vor ihren Parametern
+        polarity = {}
+        if polarity_aware:
+            polarity[id(term)] = _POSITIVE
+            for node in reversed(order):
+                node_polarity = polarity.get(id(node), 0)
+                if node.operator == "Not":
+                    flipped = ((node_polarity & _POSITIVE) << 1) | ((node_polarity & _NEGATIVE) >> 1)
+                    child_polarities = [flipped]
+                elif node.operator == "Impl":
+                    flipped = ((node_polarity & _POSITIVE) << 1) | ((node_polarity & _NEGATIVE) >> 1)
+                    child_polarities = [flipped, node_polarity]
+                elif node.operator == "BiImpl":
+                    child_polarities = [_BOTH, _BOTH] if node_polarity else [0, 0]
+                else:
+                    child_polarities = [node_polarity] * len(node.parameters)
+                for parameter, child_polarity in zip(node.parameters, child_polarities):
+                    polarity[id(parameter)] = polarity.get(id(parameter), 0) | child_polarity
+
+        # Variablen der Formel werden zuerst nummeriert
+        for node in order:
+            if not node.parameters and node.operator not in ("TOP", "BOT"):
+                variables.variable_number(node.operator)
+
+        literal_by_id = {}
+        true_literal = None
+        for node in order:
+            operator = node.operator
+            if not node.parameters:
+                if operator == "TOP" or operator == "BOT":
+                    # TOP und BOT teilen sich eine Hilfsvariable, die durch eine Einheitsklausel wahr ist
+                    if true_literal is None:
+                        true_literal = variables.new_auxiliary_variable()
+                        yield [true_literal]
+                    literal = true_literal if operator == "TOP" else -true_literal
+                else:
+                    literal = variables.variable_number_by_name[operator]
+                literal_by_id[id(node)] = literal
+                continue
+            literals = [literal_by_id[id(parameter)] for parameter in node.parameters]
+            if operator == "Not":
+                literal_by_id[id(node)] = -literals[0]
+                continue
+            if len(literals) == 1:
+                literal_by_id[id(node)] = literals[0]
+                continue
+            node_polarity = polarity.get(id(node), 0) if polarity_aware else _BOTH
+            x = variables.new_auxiliary_variable()
+            literal_by_id[id(node)] = x
+            if operator == "Impl":
+                operator = "Or"
+                literals = [-literals[0], literals[1]]
+            if operator == "Or":
+                if node_polarity & _POSITIVE:
+                    yield [-x] + literals
+                if node_polarity & _NEGATIVE:
+                    for literal in literals:
+                        yield [x, -literal]
+            elif operator == "And":
+                if node_polarity & _POSITIVE:
+                    for literal in literals:
+                        yield [-x, literal]
+                if node_polarity & _NEGATIVE:
+                    yield [x] + [-literal for literal in literals]
             else:
-                # Erstelle einen neuen Eintrag im Dictionary, falls x nicht vorhanden
-                if x not in variable_number_by_name:
-                    variable_number_by_name[x] = current_number
-                    current_number += 1
-                    num_variables += 1
-        # Füge die Kopfzeile des DIMAC Formats hinzu
-        dimacs = "p cnf " + str(num_variables) + " " + str(num_clauses) + "\n"
-        # Bilde DIMACS durch ersetzten der Variablen durch die entsprechenden Zahlen
-        for i in range(0, len(term_in_cnf)):
-            y = term_in_cnf[i]
-            # Füge eine 0 an das Ende jeder Zeile hinzu
-            if y == "\n":
-                if term_in_cnf[i - 1] != " ":
-                    dimacs += " "
-                dimacs += "0"
-            if y in variable_number_by_name:
-                y = variable_number_by_name[y]
-            dimacs += str(y)
-            # Füge eine 0 am Ende der letzten Zeile hinzu
-            if i == len(term_in_cnf) - 1:
-                if term_in_cnf[i] != " ":
-                    dimacs += " "
-                dimacs += "0"
-        return dimacs
-
-    @staticmethod
-    def convert_formula_to_dimacs(formula, stabalize):
+                a, b = literals
+                if node_polarity & _POSITIVE:
+                    yield [-x, -a, b]
+                    yield [-x, a, -b]
+                if node_polarity & _NEGATIVE:
+                    yield [x, a, b]
+                    yield [x, -a, -b]
+        # der gesamte Term muss wahr sein, fuer TOP steht die Einheitsklausel schon oben
+        if literal_by_id[id(term)] != true_literal:
+            yield [literal_by_id[id(term)]]
+
+    @staticmethod
+    def convert_to_definitional_cnf(term, polarity_aware=False, store=None):
+        """ Schreibt die Klauseln der Tseitin-Kodierung (siehe iter_definitional_clauses) in einen ClauseStore
+            oder einen DimacsWriter.
+
+        :param term: Objekt der Klasse Term
+        :param polarity_aware: Boolean
+        :param store: ClauseStore oder DimacsWriter, der ergaenzt wird, oder None fuer einen neuen ClauseStore
+        :return: store
+        """
+        if store is None:
+            store = ClauseStore()
+        for clause in ParserStringToDIMACS.iter_definitional_clauses(term, store, polarity_aware):
+            store.add_clause(clause)
+        return store
+
+    @staticmethod
+    def create_definitional_dimacs(term, polarity_aware=False):
+        """ Erzeugt aus einem beliebigen Term ueber convert_to_definitional_cnf eine Stringausgabe im DIMACS Format.
+            Nach der Kopfzeile steht eine Kommentarzeile "c ind ... 0" mit den Nummern der Variablen der Formel,
+            alle uebrigen Variablen sind Hilfsvariablen, auf die Modelle nicht projiziert werden muessen.
+
+                        :param term: Objekt der Klasse Term
+                        :param polarity_aware: Boolean
+                        :return: DIMACS-String
+        """
+        return ParserStringToDIMACS.convert_to_definitional_cnf(term, polarity_aware).to_dimacs()
+
+    @staticmethod
+    def _iter_formula_clauses(names, term_in_cnf, variables):
+        """ Nummeriert die Variablen names und liefert danach die Klauseln von term_in_cnf, BOT als leere Klausel """
+        for name in names:
+            variables.variable_number(name)
+        if term_in_cnf.operator == "BOT":
+            yield []
+        elif term_in_cnf.operator != "TOP":
+            yield from ParserStringToDIMACS.iter_clauses(term_in_cnf, variables)
+
+    @staticmethod
+    def clause_source(formula, encoding=ENCODING_DISTRIBUTIVE, cache=None, stats=None):
+        """ Bereitet eine Formel fuer die Ausgabe ihrer Klauseln vor. Bei der distributiven Kodierung wird die KNF
+            hier einmal berechnet, die Klauseln selbst entstehen erst beim Durchlaufen des Generators und koennen
+            daher mehrfach (z.B. zum Zaehlen und zum Schreiben) erzeugt werden.
+
+        :param formula: String oder Objekt der Klasse Term
+        :param encoding: ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN oder ENCODING_PLAISTED_GREENBAUM
+        :param cache: CNFCache fuer die distributive Kodierung oder None
+        :param stats: ConversionStats oder None
+        :return: Funktion, die fuer eine VariableMap einen Generator der Klauseln liefert
+        """
+        if isinstance(formula, str):
+            if stats is None:
+                formula = ParserStringToDIMACS.build_term_from_string(formula)
+            else:
+                with stats.stage("parse"):
+                    formula = ParserStringToDIMACS.build_term_from_string(formula)
+        if encoding == ENCODING_TSEITIN or encoding == ENCODING_PLAISTED_GREENBAUM:
+            polarity_aware = encoding == ENCODING_PLAISTED_GREENBAUM
+            return lambda variables: ParserStringToDIMACS.iter_definitional_clauses(formula, variables, polarity_aware)
+        if encoding != ENCODING_DISTRIBUTIVE:
+            raise ValueError("Unknown encoding " + repr(encoding))
+        formula_term_in_cnf = ParserStringToDIMACS.convert_to_cnf(formula, cache, stats)
+        # Variablen, die beim Vereinfachen (z.B. mit Tautologien) wegfallen, werden trotzdem nummeriert, die
+        # Klauseln sind so ueber allen Variablen der Formel aequivalent zur Formel
+        names = ParserStringToDIMACS.variables_of(formula)
+        return lambda variables: ParserStringToDIMACS._iter_formula_clauses(names, formula_term_in_cnf, variables)
+
+    @staticmethod
+    def convert_formula_to_clauses(formula, encoding=ENCODING_DISTRIBUTIVE, cache=None, preprocess=False, stats=None):
+        """ Erzeugt fuer eine Formel die Klauselmenge als ClauseStore
+
+                              :param formula: String oder Objekt der Klasse Term
+                              :param encoding: ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN oder ENCODING_PLAISTED_GREENBAUM
+                              :param cache: CNFCache fuer die distributive Kodierung oder None
+                              :param preprocess: bei True wird die Klauselmenge mit preprocess_clauses vereinfacht,
+                                                 die Variablen der Formel bleiben dabei erhalten
+                              :param stats: ConversionStats oder None
+
+                              :return: ClauseStore
+        """
+        store = ClauseStore()
+        source = ParserStringToDIMACS.clause_source(formula, encoding, cache, stats)
+        with stats.stage("emit") if stats is not None else contextlib.nullcontext():
+            for clause in source(store):
+                store.add_clause(clause)
+        if preprocess:
+            store, _ = ParserStringToDIMACS.preprocess_clauses(store, store.original_variables(), stats)
+        return store
+
+    @staticmethod
+    def preprocess_clauses(store, frozen=(), stats=None):
+        """ Vereinfacht die Klauseln eines ClauseStore vor der Ausgabe oder dem Loesen durch Unit Propagation,
+            Elimination reiner Literale, Subsumption und beschraenkte Variablenelimination, siehe Preprocessor.
+            Die Nummerierung der Variablen bleibt unveraendert.
+
+                              :param store: ClauseStore
+                              :param frozen: Nummern der Variablen, deren Modelle erhalten bleiben muessen,
+                                             z.B. die Variablen einer Projektion
+                              :param stats: ConversionStats oder None
+
+                              :return: Paar (ClauseStore mit den vereinfachten Klauseln, Preprocessor, dessen
+                                       extend_model ein Modell zu einem Modell der urspruenglichen Klauseln erweitert)
+        """
+        with stats.stage("preprocess") if stats is not None else contextlib.nullcontext():
+            preprocessor = Preprocessor(store, store.num_variables, frozen)
+            preprocessor.run()
+            reduced = ClauseStore()
+            reduced.variable_number_by_name = dict(store.variable_number_by_name)
+            reduced.variable_names = list(store.variable_names)
+            for clause in preprocessor.clauses():
+                reduced.add_clause(clause)
+        return reduced, preprocessor
+
+    @staticmethod
+    def convert_formula_to_dimacs(formula, stabalize, encoding=ENCODING_DISTRIBUTIVE, cache=None, preprocess=False,
+                                  stats=None):
         """ Erzeugt für eine Formel im Stringformat ,
             welche nach der vorgegebenen Syntax gebildet wurde, eine Ausgabe im DIMACS Format
 
                               :param formula: String
                               :param stabalize:
+                              :param encoding: ENCODING_DISTRIBUTIVE (aequivalente KNF ueber das Distributivgesetz),
+                                               ENCODING_TSEITIN oder ENCODING_PLAISTED_GREENBAUM
+                                               (erfuellbarkeitsaequivalente KNF mit Hilfsvariablen)
+                              :param cache: CNFCache, der ueber mehrere Formeln hinweg verwendet werden kann,
+                                            oder None
+                              :param preprocess: bei True wird die KNF vor der Ausgabe vereinfacht, die Modelle
+                                                 eingeschraenkt auf die Variablen der Formel bleiben erhalten
+                              :param stats: ConversionStats, in der die Laufzeit je Stufe gemessen wird, oder None
 
                               :return: DIMACS-String
               """
-        formula_term = ParserStringToDIMACS.build_term_from_string(formula)
         #if stabalize:
           #  formula_term = ParserStringToDIMACS.stabilize_formula(formula_term)
-        formula_term_in_cnf = ParserStringToDIMACS.convert_to_cnf(formula_term)
-        if formula_term_in_cnf.operator == "BOT":
-            raise Exception("Formula in CNF is BOT, no dmacs exists ")
-        if formula_term_in_cnf.operator == "TOP":
-            raise Exception("Formula in CNF is TOP, no dmacs exists ")
-        return ParserStringToDIMACS.create_dimacs(formula_term_in_cnf)
-
-    def get_all_models(formula, stabalize):
+        store = ParserStringToDIMACS.convert_formula_to_clauses(formula, encoding, cache, preprocess, stats)
+        if stats is None:
+            return store.to_dimacs()
+        with stats.stage("dimacs"):
+            return store.to_dimacs()
+
+    @staticmethod
+    def convert_formulas_to_dimacs(formulas, stabalize=False, encoding=ENCODING_DISTRIBUTIVE, max_workers=None,
+                                   chunk_size=64, ordered=True, executor=None, cache_size=None):
+        """ Wandelt viele Formeln parallel in einem Prozesspool in das DIMACS Format um. Die Formeln werden in
+            Pakete zu chunk_size Formeln aufgeteilt, damit sich der Aufwand fuer die Kommunikation zwischen den
+            Prozessen verteilt. Die Eingabe wird nur so weit gelesen, wie Pakete in Arbeit sind.
+            Fehler einzelner Formeln, z.B. Syntaxfehler, brechen die Umwandlung nicht ab, sondern werden im Ergebnis
+            der Formel zurueckgegeben. Eine Formel, deren KNF BOT bzw. TOP ist, ist kein Fehler, sie ergibt die
+            leere Klausel bzw. keine Klausel ueber den Variablen der Formel.
+
+                              :param formulas: Iterable von Strings
+                              :param stabalize:
+                              :param encoding: ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN oder ENCODING_PLAISTED_GREENBAUM
+                              :param max_workers: Anzahl der Prozesse, None fuer die Anzahl der CPUs
+                              :param chunk_size: Anzahl der Formeln je Paket
+                              :param ordered: True liefert die Ergebnisse in der Reihenfolge der Eingabe,
+                                              False sobald ein Paket fertig ist
+                              :param executor: vorhandener Executor oder None fuer einen eigenen ProcessPoolExecutor
+                              :param cache_size: Groesse eines CNFCache je Prozess, der fuer alle Formeln dieses
+                                                 Prozesses verwendet wird, oder None fuer keinen Cache
+
+                              :return: Generator von BatchResult
+        """
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers)
+        max_pending = 2 * (max_workers or os.cpu_count() or 1)
+        formulas = iter(formulas)
+        next_index = 0
+        # Pakete in Arbeit: Future -> (Index der ersten Formel, Formeln)
+        pending = collections.OrderedDict()
+        try:
+            while True:
+                while len(pending) < max_pending:
+                    chunk = list(itertools.islice(formulas, chunk_size))
+                    if not chunk:
+                        break
+                    future = executor.submit(_convert_chunk_to_dimacs, chunk, stabalize, encoding, cache_size)
+                    pending[future] = (next_index, chunk)
+                    next_index += len(chunk)
+                if not pending:
+                    return
+                if ordered:
+                    done = [next(iter(pending))]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, chunk = pending.pop(future)
+                    for offset, (dimacs, error) in enumerate(future.result()):
+                        yield BatchResult(start + offset, chunk[offset], dimacs, error)
+        finally:
+            for future in pending:
+                future.cancel()
+            if own_executor:
+                executor.shutdown()
+
+    @staticmethod
+    def write_dimacs(formula, file, encoding=ENCODING_DISTRIBUTIVE):
+        """ Schreibt die KNF einer Formel Klausel fuer Klausel im DIMACS Format in ein Datei-Objekt (Text- oder
+            Binaermodus), ohne die gesamte Ausgabe im Speicher zu halten. Ist die Datei seekable, wird die
+            Kopfzeile reserviert und am Ende ueberschrieben, sonst werden die Klauseln zuerst nur gezaehlt.
+
+                              :param formula: String oder Objekt der Klasse Term
+                              :param file: Datei-Objekt
+                              :param encoding: ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN oder ENCODING_PLAISTED_GREENBAUM
+
+                              :return: Paar (Anzahl Variablen, Anzahl Klauseln)
+        """
+        source = ParserStringToDIMACS.clause_source(formula, encoding)
+        if hasattr(file, "seekable") and file.seekable():
+            writer = DimacsWriter(file)
+        else:
+            counter = VariableMap()
+            num_clauses = sum(1 for _ in source(counter))
+            writer = DimacsWriter(file, counter.num_variables, num_clauses)
+        for clause in source(writer):
+            writer.add_clause(clause)
+        writer.close()
+        return writer.num_variables, writer.num_clauses
+
+    @staticmethod
+    def iter_dimacs_chunks(formula, encoding=ENCODING_DISTRIBUTIVE, chunk_size=65536):
+        """ Liefert die DIMACS-Ausgabe einer Formel stueckweise als Strings von etwa chunk_size Zeichen.
+            Die Klauseln werden zweimal erzeugt: einmal, um die Kopfzeile zu bestimmen, und einmal zur Ausgabe.
+
+                              :param formula: String oder Objekt der Klasse Term
+                              :param encoding: ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN oder ENCODING_PLAISTED_GREENBAUM
+                              :param chunk_size: int
+
+                              :return: Generator von Strings
+        """
+        source = ParserStringToDIMACS.clause_source(formula, encoding)
+        counter = VariableMap()
+        num_clauses = sum(1 for _ in source(counter))
+        sink = _ChunkList()
+        writer = DimacsWriter(sink, counter.num_variables, num_clauses, chunk_size)
+        for clause in source(writer):
+            writer.add_clause(clause)
+            if sink.chunks:
+                yield from sink.chunks
+                sink.chunks.clear()
+        writer.close()
+        yield from sink.chunks
+
+    @staticmethod
+    def find_model(formula, encoding=ENCODING_DISTRIBUTIVE):
+        """ Sucht mit dem eingebauten CDCLSolver ein Modell einer Formel
+
+                                      :param formula: String oder Objekt der Klasse Term
+                                      :param encoding: ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN oder
+                                                       ENCODING_PLAISTED_GREENBAUM
+
+                                      :return: Dictionary Variable -> Boolean oder None, falls unerfuellbar
+        """
+        store = ParserStringToDIMACS.convert_formula_to_clauses(formula, encoding)
+        solver = CDCLSolver(store, store.num_variables)
+        if not solver.solve():
+            return None
+        return {name: solver.model[number - 1] > 0 for name, number in store.variable_number_by_name.items()}
+
+    @staticmethod
+    def create_solver(store, backend=BACKEND_CDCL):
+        """ Erzeugt einen SAT-Solver fuer die Klauseln eines ClauseStore
+
+                                      :param store: ClauseStore
+                                      :param backend: BACKEND_CDCL oder BACKEND_MINISAT
+
+                                      :return: CDCLSolver oder MinisatSolver
+        """
+        if backend == BACKEND_CDCL:
+            return CDCLSolver(store, store.num_variables)
+        if backend == BACKEND_MINISAT:
+            return MinisatSolver(store, store.num_variables)
+        raise ValueError("Unknown backend " + repr(backend))
+
+    @staticmethod
+    def shrink_model(store, model, projection, blocking_clauses=()):
+        """ Verkleinert ein Modell auf einen Wuerfel ueber den projizierten Variablen: es bleiben nur so viele
+            projizierte Literale des Modells stehen, dass zusammen mit den unveraenderten Werten aller anderen
+            Variablen jede Klausel erfuellt ist. Jede Belegung der weggelassenen Variablen ergibt dann ebenfalls
+            ein Modell. Die bisherigen Blockierklauseln werden wie Klauseln behandelt, damit sich der Wuerfel nicht
+            mit frueher gefundenen Wuerfeln ueberschneidet.
+
+                                      :param store: ClauseStore
+                                      :param model: Liste der Literale aller Variablen, wie CDCLSolver.model
+                                      :param projection: Liste von Variablennummern
+                                      :param blocking_clauses: Liste von Klauseln
+
+                                      :return: Liste der verbleibenden Literale
+        """
+        projected = set(projection)
+        chosen = set()
+        for clause in itertools.chain(store, blocking_clauses):
+            candidate = None
+            for literal in clause:
+                if model[abs(literal) - 1] == literal:
+                    if abs(literal) not in projected or literal in chosen:
+                        break
+                    if candidate is None:
+                        candidate = literal
+            else:
+                chosen.add(candidate)
+        return [model[variable - 1] for variable in projection if model[variable - 1] in chosen]
+
+    @staticmethod
+    def iter_store_models(store, projection, limit=None, minimize=False, backend=BACKEND_CDCL, stats=None):
+        """ Zaehlt die Modelle eines ClauseStore eingeschraenkt auf die projizierten Variablen auf. Jedes Modell
+            wird geliefert, sobald es gefunden ist, danach schliesst eine Blockierklausel ueber den projizierten
+            Variablen genau dieses Modell aus.
+
+                                      :param store: ClauseStore
+                                      :param projection: Liste von Variablennummern
+                                      :param limit: maximale Anzahl der Modelle oder None
+                                      :param minimize: bei True werden die Modelle mit shrink_model verkleinert,
+                                                       jeder gelieferte Wuerfel steht fuer alle Belegungen der
+                                                       fehlenden projizierten Variablen
+                                      :param backend: BACKEND_CDCL oder BACKEND_MINISAT
+                                      :param stats: ConversionStats, in der Anzahl und Laufzeit der Solveraufrufe
+                                                    gemessen werden, oder None
+
+                                      :return: Generator von Listen von Literalen in der Reihenfolge von projection
+        """
+        solver = ParserStringToDIMACS.create_solver(store, backend)
+        blocking_clauses = []
+        try:
+            count = 0
+            while limit is None or count < limit:
+                if stats is None:
+                    satisfiable = solver.solve()
+                else:
+                    stats.solver_calls += 1
+                    with stats.stage("solve"):
+                        satisfiable = solver.solve()
+                if not satisfiable:
+                    return
+                model = solver.model
+                if minimize:
+                    cube = ParserStringToDIMACS.shrink_model(store, model, projection, blocking_clauses)
+                else:
+                    cube = [model[variable - 1] for variable in projection]
+                yield cube
+                count += 1
+                if not cube:
+                    return
+                blocking_clause = [-literal for literal in cube]
+                if minimize:
+                    blocking_clauses.append(blocking_clause)
+                solver.add_clause(blocking_clause)
+        finally:
+            if hasattr(solver, "close"):
+                solver.close()
+
+    @staticmethod
+    def iter_models(formula, projection=None, limit=None, minimize=False, encoding=ENCODING_DISTRIBUTIVE,
+                    backend=BACKEND_CDCL, preprocess=False, stats=None):
+        """ Liefert die Modelle einer Formel einzeln, sobald sie gefunden werden.
+
+                                      :param formula: String oder Objekt der Klasse Term
+                                      :param projection: Namen der Variablen, auf die projiziert wird, oder None fuer
+                                                         alle Variablen der Formel (ohne Hilfsvariablen)
+                                      :param limit: maximale Anzahl der Modelle oder None
+                                      :param minimize: bei True fehlen in einem Modell die Variablen, deren Wert
+                                                       beliebig ist, die gelieferten Modelle sind trotzdem disjunkt
+                                      :param encoding: ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN oder
+                                                       ENCODING_PLAISTED_GREENBAUM
+                                      :param backend: BACKEND_CDCL oder BACKEND_MINISAT
+                                      :param preprocess: bei True wird die KNF vor der Aufzaehlung vereinfacht, die
+                                                         projizierten Variablen bleiben dabei erhalten
+                                      :param stats: ConversionStats oder None
+
+                                      :return: Generator von Dictionaries Variable -> Boolean
+        """
+        store = ParserStringToDIMACS.convert_formula_to_clauses(formula, encoding, stats=stats)
+        if projection is None:
+            numbers = store.original_variables()
+        else:
+            # Variablen, die in der KNF nicht vorkommen, sind frei und werden ebenfalls aufgezaehlt
+            numbers = [store.variable_number(name) for name in projection]
+        if preprocess:
+            store, _ = ParserStringToDIMACS.preprocess_clauses(store, numbers, stats)
+        names = store.variable_names
+        for cube in ParserStringToDIMACS.iter_store_models(store, numbers, limit, minimize, backend, stats):
+            yield {names[abs(literal) - 1]: literal > 0 for literal in cube}
+
+    @staticmethod
+    def get_all_models(formula, stabalize, backend=BACKEND_CDCL, preprocess=False, stats=None, output="allmodels"):
         """ Erzeugt eine Textdatei "allmodels" für eine gegebene Formel f, die alle Modelle von f enthält.
+            Jede Zeile enthaelt ein Modell als Literale im DIMACS Format mit abschliessender 0.
+            Mit output kann statt "allmodels" im Arbeitsverzeichnis eine andere Datei gewaehlt werden, damit sich
+            mehrere Aufrufe im selben Verzeichnis nicht gegenseitig ueberschreiben.
 
                                       :param formula: String
                                       :param stabalize:
+                                      :param backend: BACKEND_CDCL (eingebauter CDCLSolver) oder
+                                                      BACKEND_MINISAT (externes Programm minisat)
+                                      :param preprocess: bei True wird die KNF einmal vereinfacht, bevor der Solver
+                                                         sie fuer die Aufzaehlung erhaelt
+                                      :param stats: ConversionStats, in der Umwandlung und Solveraufrufe gemessen
+                                                    werden, oder None
+                                      :param output: Pfad der Ausgabedatei oder Datei-Objekt im Textmodus
 
-                                      :return: DIMACS-String
-        """
-
-        sat = True
-        allmodels = open("allmodels", "w+")
-        cnf = ParserStringToDIMACS.convert_formula_to_dmacs(formula, stabalize)
-        file = open("problem.cnf", "w+")
-        file.write(cnf)
-        file.close()
-        while sat:
-            subprocess.run(["minisat", "problem.cnf", "problem.model"])
-            modelfile = open("problem.model", "r")
-            result = modelfile.read()
-            modelfile.close()
-            if result[0:3] != "SAT":
-                sat = False
-                allmodels.close()
-                break
-            newmodel = result[4:]
-            allmodels.write(newmodel)
-            extension_clause = ""
-            for i in range(0, len(newmodel)):
-                if newmodel[i] == "\n" or newmodel[i] == " " or newmodel[i] == "0":
-                    extension_clause += newmodel[i]
-                elif newmodel[i] == "-":
-                    continue
-                else:
-                    if i > 0:
-                        if newmodel[i - 1] == "-":
-                            extension_clause += newmodel[i]
-                        else:
-                            extension_clause += "-" + newmodel[i]
-                    else:
-                        extension_clause += "-" + newmodel[i]
-            file = open("problem.cnf", "r")
-            old_cnf = file.read()
-            file.close()
-            number_of_clauses = int(old_cnf[8]) + 1
-            file = open("problem.cnf", "w+")
-            file.write(old_cnf[:8] + str(number_of_clauses) + old_cnf[9:] + "\n" + extension_clause)
-            file.close()
+                                      :return: stats
+        """
+        store = ParserStringToDIMACS.convert_formula_to_clauses(formula, preprocess=preprocess, stats=stats)
+        projection = store.original_variables()
+        if isinstance(output, (str, bytes, os.PathLike)):
+            allmodels = open(output, "w+")
+        else:
+            allmodels = contextlib.nullcontext(output)
+        with allmodels as file:
+            for model in ParserStringToDIMACS.iter_store_models(store, projection, backend=backend, stats=stats):
+                file.write(" ".join(map(str, model)) + " 0\n")
+        return stats
+
+
+# CNFCache eines Prozesses im Pool von convert_formulas_to_dimacs
+_worker_cache = None
+
+
+def _convert_chunk_to_dimacs(formulas, stabalize, encoding, cache_size=None):
+    """ Wandelt ein Paket von Formeln in einem Prozess des Pools um, siehe convert_formulas_to_dimacs
+
+        :return: Liste von Paaren (DIMACS-String oder None, Exception oder None)
+    """
+    global _worker_cache
+    cache = None
+    if cache_size is not None:
+        if _worker_cache is None or _worker_cache.maxsize != cache_size:
+            _worker_cache = CNFCache(cache_size)
+        cache = _worker_cache
+    results = []
+    for formula in formulas:
+        try:
+            results.append((ParserStringToDIMACS.convert_formula_to_dimacs(formula, stabalize, encoding, cache), None))
+        except Exception as error:
+            results.append((None, error))
+    return results
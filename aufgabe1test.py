@@ -8,7 +8,19 @@
 
 #if __name__ == '__main__':
 #    unittest.main()
-from aufgabe1neu import ParserStringToDIMACS, Term
+import io
+import os
+import pickle
+import random
+import sys
+import tempfile
+
+from aufgabe1neu import (
+    ENCODING_DISTRIBUTIVE, ENCODING_PLAISTED_GREENBAUM, ENCODING_TSEITIN, OP_AND, OP_OR, OP_VARIABLE,
+    CNFCache, ConversionStats, FormulaSyntaxError, IncrementalCNF, MinisatSolver, ParserStringToDIMACS, Term,
+    allocated_terms,
+)
+from oracles import evaluate, formula_models, random_formula
 
 
 def test_build_term_from_formula():
@@ -77,6 +89,45 @@ def test_build_term_from_formula():
     assert x.parameters[1].operator == "And"
 
 
+def test_build_term_from_string_names_and_whitespace():
+    p = ParserStringToDIMACS()
+    x = p.build_term_from_string(" Or ( x12 ,\tAnd(long_name,  y) )\n")
+    assert x.operator == "Or"
+    assert x.parameters[0].operator == "x12"
+    assert x.parameters[1].operator == "And"
+    assert x.parameters[1].parameters[0].operator == "long_name"
+    assert x.parameters[1].parameters[1].operator == "y"
+    x = p.build_term_from_string("variable")
+    assert x.operator == "variable"
+    assert len(x.parameters) == 0
+    tokens = list(p.tokenize("Not( ab)"))
+    assert tokens == [("Not", 0), ("(", 3), ("ab", 5), (")", 7)]
+
+
+def test_build_term_from_string_syntax_errors():
+    p = ParserStringToDIMACS()
+    for formula, position in (
+        ("Or(a,b", 6),
+        ("Or(a,b))", 7),
+        ("Xor(a,b)", 0),
+        ("Not(a,b)", 5),
+        ("Impl(a)", 0),
+        ("Or(a,)", 5),
+        ("a b", 2),
+        ("", 0),
+        # Operatoren sind keine Variablennamen
+        ("Or(And,b)", 3),
+        ("Or(b,Not)", 5),
+        ("Impl", 0),
+    ):
+        try:
+            p.build_term_from_string(formula)
+        except FormulaSyntaxError as error:
+            assert error.position == position, formula
+        else:
+            assert False, formula
+
+
 def test_replace_implication():
     x = "Impl(a,b)"
     y = ParserStringToDIMACS()
@@ -188,19 +239,23 @@ def test_apply_distributive_law():
     x = y.build_term_from_string(x)
     x = y.apply_distributive_law(x)
     assert x.operator == "And"
-    assert x.parameters[0].operator == "And"
-    assert x.parameters[0].parameters[0].operator == "Or"
-    assert x.parameters[0].parameters[1].operator == "Or"
-    assert x.parameters[1].parameters[0].operator == "Or"
-    assert x.parameters[1].parameters[1].operator == "Or"
-    assert x.parameters[0].parameters[0].parameters[0].operator == "a"
-    assert x.parameters[0].parameters[0].parameters[1].operator == "Impl"
-    assert x.parameters[0].parameters[1].parameters[0].operator == "a"
-    assert x.parameters[0].parameters[1].parameters[1].operator == "c"
-    assert x.parameters[1].parameters[0].parameters[0].operator == "b"
-    assert x.parameters[1].parameters[0].parameters[1].operator == "Impl"
-    assert x.parameters[1].parameters[1].parameters[0].operator == "b"
-    assert x.parameters[1].parameters[1].parameters[1].operator == "c"
+    assert len(x.parameters) == 4
+    assert x.parameters[0].operator == "Or"
+    assert x.parameters[1].operator == "Or"
+    assert x.parameters[2].operator == "Or"
+    assert x.parameters[3].operator == "Or"
+    assert x.parameters[0].parameters[0].operator == "a"
+    assert x.parameters[0].parameters[1].operator == "Impl"
+    assert x.parameters[1].parameters[0].operator == "a"
+    assert x.parameters[1].parameters[1].operator == "c"
+    assert x.parameters[2].parameters[0].operator == "b"
+    assert x.parameters[2].parameters[1].operator == "Impl"
+    assert x.parameters[3].parameters[0].operator == "b"
+    assert x.parameters[3].parameters[1].operator == "c"
+    x = "Or(And(a,b),c,And(d,e))"
+    x = y.build_term_from_string(x)
+    x = y.apply_distributive_law(x)
+    assert y.build_pre_dimacs_string(x) == "a d c \na e c \nb d c \nb e c "
 
 
 def test_convert_to_cnf():
@@ -216,7 +271,8 @@ def test_convert_to_cnf():
     assert x.parameters[0].operator == "Or"
     assert x.parameters[1].operator == "Or"
     assert x.parameters[0].parameters[0].operator == "a"
-    assert x.parameters[0].parameters[1].operator == "Or"
+    assert x.parameters[0].parameters[1].operator == "Not"
+    assert x.parameters[0].parameters[2].operator == "d"
     x = "Not(And(a,b))"
     x = y.build_term_from_string(x)
     x = y.convert_to_cnf(x)
@@ -279,15 +335,433 @@ def test_create_dimacs():
     assert res == t
 
 
+def test_term_hash_consing():
+    y = ParserStringToDIMACS()
+    x = y.build_term_from_string("And(Or(a,b),Or(a,b))")
+    assert x.parameters[0] is x.parameters[1]
+    assert x is y.build_term_from_string("And(Or(a, b), Or(a, b))")
+    assert x is Term("And", [Term("Or", [Term("a"), Term("b", [])])] * 2)
+    assert isinstance(x.parameters, tuple)
+    assert x.code == OP_AND and x.parameters[0].code == OP_OR
+    assert x.parameters[0].parameters[0].code == OP_VARIABLE
+    assert len({x, y.build_term_from_string("And(Or(a,b),Or(a,b))")}) == 1
+    try:
+        x.operator = "Or"
+    except AttributeError:
+        pass
+    else:
+        assert False
+    assert pickle.loads(pickle.dumps(x)) is x
+    b = y.replace_biimplication(y.build_term_from_string("BiImpl(a,b)"))
+    assert b.parameters[0].parameters[0] is b.parameters[1].parameters[1].parameters[0]
+
+
+def test_emit_clauses():
+    y = ParserStringToDIMACS()
+    t = y.build_term_from_string("And(Or(x12, Not(x1)), And(x1, Or(x12, long_name)))")
+    store = y.emit_clauses(t)
+    assert store.variable_names == ["x12", "x1", "long_name"]
+    assert [list(clause) for clause in store] == [[1, -2], [2], [1, 3]]
+    assert store.to_dimacs() == "p cnf 3 3\n1 -2 0\n2 0\n1 3 0"
+    t = y.convert_to_cnf(y.build_term_from_string("Or(And(a,And(b,c)),d)"))
+    assert y.create_dimacs(t) == "p cnf 4 3\n1 2 0\n3 2 0\n4 2 0"
+    try:
+        y.emit_clauses(y.build_term_from_string("Or(a,And(b,c))"))
+    except ValueError:
+        pass
+    else:
+        assert False
+
+
+def satisfiable_extension(clauses, assignment, num_variables):
+    fixed = dict(assignment)
+    free = [v for v in range(1, num_variables + 1) if v not in fixed]
+    for bits in range(2 ** len(free)):
+        values = dict(fixed)
+        for i, v in enumerate(free):
+            values[v] = bool(bits >> i & 1)
+        if all(any(values[abs(l)] == (l > 0) for l in clause) for clause in clauses):
+            return True
+    return False
+
+
+class NotSeekableFile:
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def seekable(self):
+        return False
+
+
+def test_write_dimacs():
+    y = ParserStringToDIMACS()
+    for formula, encoding in (
+        ("And(Or(a, b), Or(x, Not(a)))", ENCODING_DISTRIBUTIVE),
+        ("BiImpl(BiImpl(a,b),Or(c,Not(a)))", ENCODING_TSEITIN),
+    ):
+        expected = y.convert_formula_to_dimacs(formula, False, encoding) + "\n"
+        text_file = io.StringIO()
+        assert y.write_dimacs(formula, text_file, encoding) == (
+            int(expected.split()[2]), int(expected.split()[3])
+        )
+        header, rest = text_file.getvalue().split("\n", 1)
+        assert header.rstrip() + "\n" + rest == expected
+        binary_file = io.BytesIO()
+        y.write_dimacs(formula, binary_file, encoding)
+        assert binary_file.getvalue().decode("ascii") == text_file.getvalue()
+        stream = NotSeekableFile()
+        y.write_dimacs(formula, stream, encoding)
+        assert "".join(stream.parts) == expected
+        chunks = list(y.iter_dimacs_chunks(formula, encoding, chunk_size=8))
+        assert len(chunks) > 1
+        assert "".join(chunks) == expected
+
+
+def test_find_model_and_get_all_models():
+    y = ParserStringToDIMACS()
+    model = y.find_model("And(Impl(a, b), Not(b12))", ENCODING_TSEITIN)
+    assert model == {"a": False, "b": False, "b12": False}
+    assert y.find_model("And(a, Not(a))", ENCODING_TSEITIN) is None
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            y.get_all_models("Or(a, b)", False)
+            with open("allmodels") as allmodels:
+                models = allmodels.read().splitlines()
+        finally:
+            os.chdir(working_directory)
+    assert sorted(models) == ["-1 2 0", "1 -2 0", "1 2 0"]
+
+
+def expand(cube, names):
+    free = [name for name in names if name not in cube]
+    for bits in range(2 ** len(free)):
+        model = dict(cube)
+        model.update({name: bool(bits >> i & 1) for i, name in enumerate(free)})
+        yield tuple(model[name] for name in names)
+
+
+def test_iter_models():
+    y = ParserStringToDIMACS()
+    formula = "Or(And(a, b), BiImpl(c, Not(a)))"
+    term = y.build_term_from_string(formula)
+    names = ["a", "b", "c"]
+    expected = set()
+    for bits in range(8):
+        assignment = {name: bool(bits >> i & 1) for i, name in enumerate(names)}
+        if evaluate(term, assignment):
+            expected.add(tuple(assignment[name] for name in names))
+    for encoding in (ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN, ENCODING_PLAISTED_GREENBAUM):
+        models = [tuple(model[name] for name in names) for model in y.iter_models(formula, encoding=encoding)]
+        assert len(models) == len(expected) and set(models) == expected
+        cubes = list(y.iter_models(formula, minimize=True, encoding=encoding))
+        expanded = [model for cube in cubes for model in expand(cube, names)]
+        assert len(expanded) == len(expected) and set(expanded) == expected
+    projected = list(y.iter_models(formula, projection=["a", "d"], encoding=ENCODING_TSEITIN))
+    assert len(projected) == 4
+    assert {(model["a"], model["d"]) for model in projected} == {(False, False), (False, True), (True, False),
+                                                                  (True, True)}
+    assert len(list(y.iter_models("Or(a, Or(b, Or(c, d)))", limit=3))) == 3
+    assert list(y.iter_models("And(a, Not(a))", encoding=ENCODING_TSEITIN)) == []
+    cubes = list(y.iter_models("Or(a, Or(b, Or(c, d)))", minimize=True))
+    assert len(cubes) <= 4
+
+
+FAKE_MINISAT = """import itertools, sys
+lines = [line.split() for line in open(sys.argv[1]) if line.strip() and line[0] not in "cp"]
+clauses = [[int(x) for x in line[:-1]] for line in lines]
+n = max([abs(l) for c in clauses for l in c] + [0])
+with open(sys.argv[2], "w") as out:
+    for bits in itertools.product((False, True), repeat=n):
+        if all(any(bits[abs(l) - 1] == (l > 0) for l in c) for c in clauses):
+            out.write("SAT\\n" + " ".join(str(v if bits[v - 1] else -v) for v in range(1, n + 1)) + " 0\\n")
+            break
+    else:
+        out.write("UNSAT\\n")
+"""
+
+
+def test_minisat_solver_backend():
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "fake-minisat")
+        with open(script, "w") as file:
+            file.write("#!" + sys.executable + "\n" + FAKE_MINISAT)
+        os.chmod(script, 0o755)
+        with MinisatSolver([[1, 2], [-1, 2]], 2, command=script) as solver:
+            models = []
+            while solver.solve():
+                models.append(solver.model)
+                solver.add_clause([-literal for literal in solver.model])
+        assert sorted(models) == [[-1, 2], [1, 2]]
+        assert solver.calls == 3
+
+
+def test_convert_formulas_to_dimacs():
+    y = ParserStringToDIMACS()
+    formulas = ["Or(a%d, b)" % i for i in range(20)] + ["Or(a,", "And(a, BOT)", "Or(a, TOP)", "Impl(a, b)",
+                                                        "Or(And, b)"]
+    results = list(y.convert_formulas_to_dimacs(formulas, max_workers=2, chunk_size=3))
+    assert [result.index for result in results] == list(range(len(formulas)))
+    assert [result.formula for result in results] == formulas
+    assert results[0].dimacs == "p cnf 2 1\n1 2 0" and results[0].error is None
+    assert isinstance(results[20].error, FormulaSyntaxError) and results[20].error.position == 5
+    # unerfuellbare und allgemeingueltige Formeln sind kein Fehler
+    assert results[21].dimacs == "p cnf 1 1\n0" and results[21].error is None
+    assert results[22].dimacs == "p cnf 1 0"
+    assert results[23].dimacs == "p cnf 2 1\n-1 2 0"
+    assert results[24].dimacs is None and isinstance(results[24].error, FormulaSyntaxError)
+    unordered = list(y.convert_formulas_to_dimacs(iter(formulas), encoding=ENCODING_TSEITIN, max_workers=2,
+                                                  chunk_size=5, ordered=False))
+    assert sorted(result.index for result in unordered) == list(range(len(formulas)))
+    assert all((result.error is None) == (result.index not in (20, 24)) for result in unordered)
+
+
+def test_convert_to_cnf_with_cache():
+    y = ParserStringToDIMACS()
+    generator = random.Random(1)
+    cache = CNFCache(maxsize=None)
+    for _ in range(50):
+        term = y.build_term_from_string(random_formula(generator, 3))
+        assert y.convert_to_cnf(term, cache) is y.convert_to_cnf(term)
+    assert cache.hits > 0
+    # gemeinsame Teilterme werden nur einmal umgewandelt
+    shared = "Impl(Or(And(a,b),And(c,Not(d))),BiImpl(a,d))"
+    cache = CNFCache(maxsize=100)
+    term = y.build_term_from_string("And(%s, Or(%s, Not(%s)))" % (shared, shared, shared))
+    y.convert_to_cnf(term, cache)
+    assert len(cache) <= 100
+    assert cache.hits > 0
+    misses = cache.misses
+    y.convert_to_cnf(term, cache)
+    assert cache.misses == misses
+    small = CNFCache(maxsize=2)
+    for formula in ("Not(Or(a,b))", "Not(Or(c,d))", "Not(Or(e,f))"):
+        y.convert_to_cnf(y.build_term_from_string(formula), small)
+    assert len(small) == 2
+    assert small.get(y.build_term_from_string("Not(Or(a,b))")) is None
+    y.convert_formula_to_dimacs("Not(Or(e,f))", False, cache=small)
+    assert small.hits == 1
+
+
+def test_convert_to_definitional_cnf():
+    y = ParserStringToDIMACS()
+    formulas = (
+        "BiImpl(BiImpl(a,b),BiImpl(c,Not(a)))",
+        "Or(And(a,b),And(Impl(a,c),Not(b)))",
+        "Not(Impl(Or(a,TOP),And(b,BOT)))",
+        "And(a,Not(a))",
+    )
+    for formula in formulas:
+        term = y.build_term_from_string(formula)
+        for polarity_aware in (False, True):
+            store = y.convert_to_definitional_cnf(term, polarity_aware)
+            clauses = list(store)
+            numbers = store.variable_number_by_name
+            assert store.original_variables() == list(range(1, len(numbers) + 1))
+            num_variables = store.num_variables
+            names = sorted(numbers)
+            for bits in range(2 ** len(names)):
+                assignment = {name: bool(bits >> i & 1) for i, name in enumerate(names)}
+                expected = evaluate(term, assignment)
+                numbered = {numbers[name]: value for name, value in assignment.items()}
+                assert satisfiable_extension(clauses, numbered, num_variables) == expected, formula
+
+
+def test_convert_formula_to_dimacs_tseitin():
+    y = ParserStringToDIMACS()
+    dimacs = y.convert_formula_to_dimacs("Or(a, long)", False, ENCODING_TSEITIN)
+    assert dimacs == "p cnf 3 4\nc ind 1 2 0\n-3 1 2 0\n3 -1 0\n3 -2 0\n3 0"
+    dimacs = y.convert_formula_to_dimacs("Or(a, long)", False, ENCODING_PLAISTED_GREENBAUM)
+    assert dimacs == "p cnf 3 2\nc ind 1 2 0\n-3 1 2 0\n3 0"
+    # TOP ist die Einheitsklausel der Hilfsvariable, sie wird nicht ein zweites Mal fuer die Wurzel erzeugt
+    assert y.convert_formula_to_dimacs("TOP", False, ENCODING_TSEITIN) == "p cnf 1 1\nc ind 0\n1 0"
+    assert y.convert_formula_to_dimacs("BOT", False, ENCODING_TSEITIN) == "p cnf 1 2\nc ind 0\n1 0\n-1 0"
 
 
-
-
-
-
+def test_n_ary_and_or():
+    y = ParserStringToDIMACS()
+    x = y.build_term_from_string("Or(a,b,Not(c))")
+    assert [parameter.operator for parameter in x.parameters] == ["a", "b", "Not"]
+    # gleichnamige verschachtelte And/Or werden eingeebnet
+    assert y.build_term_from_string("Or(Or(a,b),Not(c))") is x
+    assert Term("Or", [Term("a"), Term("Or", [Term("b"), Term("Not", [Term("c")])])]) is x
+    x = y.build_term_from_string("And(a,Or(b,c),And(d,And(e)))")
+    assert [parameter.operator for parameter in x.parameters] == ["a", "Or", "d", "e"]
+    x = y.de_morgan(y.build_term_from_string("Not(And(a,b,c))"))
+    assert x is y.build_term_from_string("Or(Not(a),Not(b),Not(c))")
+    # doppelte Literale und Klauseln sowie Tautologien werden bei der Umwandlung entfernt
+    x = y.convert_to_cnf(y.build_term_from_string("And(Or(a,b,a),Or(b,Not(b)),c,Or(b,a))"))
+    assert y.build_pre_dimacs_string(x) == "a b \nc\nb a "
+    x = y.convert_to_cnf(y.build_term_from_string("Or(And(a,b),Not(a),c)"))
+    assert x is y.build_term_from_string("Or(b,Not(a),c)")
+    x = y.convert_to_cnf(y.build_term_from_string("Or(a,b,Not(a))"))
+    assert x.operator == "TOP"
+    # eine allgemeingueltige Formel hat keine Klausel, eine unerfuellbare die leere Klausel
+    assert y.convert_formula_to_dimacs("Or(a,Not(a))", False) == "p cnf 1 0"
+    assert y.convert_formula_to_dimacs("And(a,Not(a))", False) == "p cnf 1 1\n0"
+    assert list(y.iter_models("Or(a,Not(a))")) == [{"a": False}, {"a": True}]
+    assert list(y.iter_models("And(a,Not(a))")) == []
+    assert y.find_model("And(a,Not(a))") is None
+    # Variablen einer entfallenen tautologischen Klausel bleiben frei
+    assert y.convert_formula_to_dimacs("And(Or(a,Not(a)),b)", False) == "p cnf 2 1\n2 0"
+    models = list(y.iter_models("And(Or(a,Not(a)),b)"))
+    assert models == [{"a": False, "b": True}, {"a": True, "b": True}]
+    assert y.convert_formula_to_dimacs("Or(And(a,b,c),d,Not(e))", False) == \
+        "p cnf 5 3\n1 4 -5 0\n2 4 -5 0\n3 4 -5 0"
+
+def test_conversion_stats():
+    y = ParserStringToDIMACS()
+    events = []
+    stats = ConversionStats(lambda stage, seconds, current: events.append((stage, current is stats)))
+    formula = "Or(And(s1,s2),And(s3,Not(Impl(s4,s5))),s6)"
+    before = allocated_terms()
+    dimacs = y.convert_formula_to_dimacs(formula, False, stats=stats)
+    assert dimacs == y.convert_formula_to_dimacs(formula, False)
+    assert [stage for stage, _ in events] == ["parse", "simplify", "nnf", "convert", "emit", "dimacs"]
+    assert all(same for _, same in events)
+    assert set(stats.stage_seconds) == {"parse", "simplify", "nnf", "convert", "rewrite", "distribute", "emit", "dimacs"}
+    assert stats.stage_seconds["distribute"] <= stats.stage_seconds["convert"]
+    assert 0 < stats.terms_allocated <= allocated_terms() - before
+    assert stats.stage_terms["emit"] == 0
+    assert stats.distributive_expansions == 1
+    assert stats.max_stack_depth >= 4
+    assert stats.solver_calls == 0
+    stats = ConversionStats()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            assert y.get_all_models("Or(s1,s2)", False, stats=stats) is stats
+        finally:
+            os.chdir(cwd)
+    assert stats.solver_calls == 4
+    assert stats.solver_seconds > 0
+    assert stats.as_dict()["solver_calls"] == 4
+
+def test_deeply_nested_formulas():
+    y = ParserStringToDIMACS()
+    depth = 20000
+    assert depth > sys.getrecursionlimit()
+    # linkslastige And-Kette, rechtslastige Or-Kette und verschachtelte Verneinung
+    formula = "And(" * depth + "x0" + "".join(",x%d)" % (i + 1) for i in range(depth))
+    cnf = y.convert_to_cnf(y.build_term_from_string(formula))
+    assert not y.is_clause(cnf)
+    assert y.build_pre_dimacs_string(cnf).count("\n") == depth
+    assert y.create_dimacs(cnf).startswith("p cnf %d %d\n" % (depth + 1, depth + 1))
+    formula = "".join("Or(x%d," % i for i in range(depth)) + "x%d" % depth + ")" * depth
+    cnf = y.convert_to_cnf(y.build_term_from_string(formula), CNFCache())
+    assert y.is_clause(cnf)
+    assert y.build_pre_dimacs_string(cnf).count(" ") == depth + 1
+    formula = "Not(" * (depth + 1) + "a" + ")" * (depth + 1)
+    assert y.convert_formula_to_dimacs(formula, False) == "p cnf 1 1\n-1 0"
+
+
+
+
+
+
+
+
+
+
+
+def test_incremental_cnf():
+    file = io.StringIO()
+    cnf = IncrementalCNF(file)
+    assert cnf.add_formula("Or(a,b)") == 1
+    assert cnf.add_formula("Impl(a,c)") == 1
+    cnf.sync()
+    assert file.getvalue().split("\n")[0].split() == ["p", "cnf", "3", "2"]
+    assert cnf.solve() and cnf.model == {"a": False, "b": True, "c": False}
+    # neue Klauseln werden nur angehaengt, die Kopfzeile an Ort und Stelle aktualisiert
+    size = len(file.getvalue())
+    cnf.add_clause([-2])
+    assert cnf.add_formula("Or(Not(c),a)") == 1
+    cnf.sync()
+    lines = file.getvalue().split("\n")
+    assert len(file.getvalue()) == size + len("-2 0\n-3 1 0\n")
+    assert lines[0].split() == ["p", "cnf", "3", "4"] and lines[1:] == ["1 2 0", "-1 3 0", "-2 0", "-3 1 0", ""]
+    assert cnf.solve() and cnf.model == {"a": True, "b": False, "c": True}
+    assert not cnf.solve([-1])
+    assert cnf.add_formula("TOP") == 0 and cnf.solve()
+    assert cnf.add_formula("BOT") == 1 and not cnf.solve()
+    cnf = IncrementalCNF(encoding=ENCODING_TSEITIN)
+    cnf.add_formula("BiImpl(a,b)")
+    cnf.add_formula("Not(b)")
+    assert cnf.variable_names[:2] == ["a", "b"]
+    assert cnf.solve() and cnf.model == {"a": False, "b": False}
+    # die Datei haelt wie write_dimacs die Variablen der Formeln in "c ind"-Zeilen fest
+    file = io.StringIO()
+    cnf = IncrementalCNF(file, ENCODING_TSEITIN)
+    cnf.add_formula("Or(a,b)")
+    cnf.add_formula("Impl(c,a)")
+    cnf.sync()
+    lines = file.getvalue().split("\n")
+    assert lines[0].split() == ["p", "cnf", "5", "8"]
+    assert lines[1:] == ["c ind 1 2 0", "-3 1 2 0", "3 -1 0", "3 -2 0", "3 0", "c ind 4 0",
+                         "-5 -4 1 0", "5 4 0", "5 -1 0", "5 0", ""]
+
+def test_simplify():
+    y = ParserStringToDIMACS
+    cases = [
+        ("And(a,TOP,Or(b,BOT))", "And(a,b)"),
+        ("Or(a,And(b,BOT),Not(Not(c)))", "Or(a,c)"),
+        ("And(Or(a,b),Or(a,b),c)", "And(Or(a,b),c)"),
+        ("And(Or(a,b),Or(b,a),c)", "And(Or(a,b),Or(b,a),c)"),
+        ("And(a,b,Not(a))", "BOT"),
+        ("Or(Not(a),c,a)", "TOP"),
+        ("And(a,Or(a,b))", "a"),
+        ("Or(a,And(b,a))", "a"),
+        ("Impl(a,a)", "TOP"),
+        ("Impl(a,BOT)", "Not(a)"),
+        ("BiImpl(a,Not(a))", "BOT"),
+        ("BiImpl(TOP,Or(a,b))", "Or(a,b)"),
+        ("Not(And(a,Not(a)))", "TOP"),
+    ]
+    for formula, expected in cases:
+        assert y.simplify(y.build_term_from_string(formula)) is y.build_term_from_string(expected)
+        # Variablen, die beim Vereinfachen wegfallen, bleiben in der KNF als freie Variablen erhalten
+        names = y.variables_of(y.build_term_from_string(formula))
+        models = list(y.iter_models(formula))
+        assert all(sorted(model) == sorted(names) for model in models), formula
+        assert {tuple(model[name] for name in names) for model in models} == formula_models(formula, names)
+    # bereits einfache Terme werden unveraendert zurueckgegeben
+    x = y.build_term_from_string("Impl(a,Or(b,c))")
+    assert y.simplify(x) is x
+    # gefaltete Konstanten wirken ueber mehrere Ebenen
+    x = y.build_term_from_string("And(Or(a,BiImpl(b,b)),Or(c,And(a,TOP)))")
+    assert y.simplify(x) is y.build_term_from_string("Or(c,a)")
+
+def test_to_nnf():
+    y = ParserStringToDIMACS
+    cases = [
+        ("Not(And(a,Or(b,Not(c))))", "Or(Not(a),And(Not(b),c))"),
+        ("Impl(a,b)", "Or(Not(a),b)"),
+        ("Not(Impl(a,b))", "And(a,Not(b))"),
+        ("BiImpl(a,b)", "And(Or(a,Not(b)),Or(b,Not(a)))"),
+        ("Not(BiImpl(a,b))", "Or(And(Not(a),b),And(Not(b),a))"),
+        ("Not(Not(Not(TOP)))", "BOT"),
+    ]
+    for formula, expected in cases:
+        assert y.to_nnf(y.build_term_from_string(formula)) is y.build_term_from_string(expected)
+    # jedes Paar (Teilterm, Polaritaet) wird einmal umgewandelt, eine Kette von BiImpl mit geteilten Teiltermen
+    # bleibt daher linear statt exponentiell
+    term = y.build_term_from_string("a0")
+    for index in range(1, 200):
+        term = Term("BiImpl", [term, Term("a%d" % index)])
+    before = allocated_terms()
+    nnf = y.to_nnf(term)
+    assert allocated_terms() - before < 200 * 12
+    assert y.to_nnf(nnf) is nnf
 
 
 test_build_term_from_formula()
+test_build_term_from_string_names_and_whitespace()
+test_build_term_from_string_syntax_errors()
 test_replace_implication()
 test_replace_biimplication()
 test_de_morgan()
@@ -295,3 +769,19 @@ test_apply_distributive_law()
 test_convert_to_cnf()
 test_build_pre_dimacs_string()
 test_create_dimacs()
+test_term_hash_consing()
+test_emit_clauses()
+test_convert_to_definitional_cnf()
+test_convert_formula_to_dimacs_tseitin()
+test_write_dimacs()
+test_find_model_and_get_all_models()
+test_iter_models()
+test_minisat_solver_backend()
+test_convert_formulas_to_dimacs()
+test_convert_to_cnf_with_cache()
+test_n_ary_and_or()
+test_conversion_stats()
+test_deeply_nested_formulas()
+test_incremental_cnf()
+test_simplify()
+test_to_nnf()
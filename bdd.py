@@ -0,0 +1,326 @@
+"""
+Reduzierte geordnete binaere Entscheidungsdiagramme (ROBDD) als Alternative zur KNF, z.B. fuer Formeln mit vielen
+BiImpl, bei denen die distributive Umwandlung explodiert, das BDD aber klein bleibt.
+
+Ein Knoten ist eine ganze Zahl: 0 ist FALSE, 1 ist TRUE, jeder weitere Knoten hat eine Variable (als Position in
+der Variablenordnung), einen low-Nachfolger (Variable falsch) und einen high-Nachfolger (Variable wahr). Die
+Knoten werden ueber eine Unique Table geteilt, gleiche Funktionen sind daher derselbe Knoten und die Aequivalenz
+zweier Formeln ist ein Vergleich zweier Zahlen.
+"""
+import collections
+import itertools
+
+from aufgabe1neu import OP_AND, OP_BIIMPL, OP_BOT, OP_IMPL, OP_NOT, OP_OR, OP_TOP, OP_VARIABLE, ParserStringToDIMACS
+
+FALSE = 0
+TRUE = 1
+
+
+class BDD:
+    """
+    Verwaltet die Knoten aller BDDs mit derselben Variablenordnung. Alle Operationen werden auf ite
+    (if-then-else) zurueckgefuehrt, deren Ergebnisse in einem beschraenkten Computed Table (LRU) gespeichert werden.
+    ite und die Auswertungen laufen ueber einen expliziten Stack, die Anzahl der Variablen ist daher nicht durch das
+    Rekursionslimit beschraenkt.
+
+    Attribute: variables: Namen der Variablen in der Reihenfolge der Ordnung
+               cache_hits, cache_misses: Zaehler des Computed Table
+    """
+    def __init__(self, order=(), cache_size=1 << 18):
+        """
+            :param order: Namen der Variablen, oben im BDD zuerst; weitere Variablen werden beim ersten Auftreten
+                          unten angehaengt
+            :param cache_size: maximale Anzahl der Eintraege im Computed Table, None fuer unbeschraenkt
+        """
+        self.variables = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._level_by_name = {}
+        # je Knoten: Position der Variablen in der Ordnung, low- und high-Nachfolger; Terminale haben keine Variable
+        self._level = [None, None]
+        self._low = [FALSE, TRUE]
+        self._high = [FALSE, TRUE]
+        self._unique = {}
+        self._cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        for name in order:
+            self.add_variable(name)
+
+    @property
+    def num_variables(self):
+        return len(self.variables)
+
+    @property
+    def num_nodes(self):
+        """ Anzahl aller angelegten Knoten einschliesslich der beiden Terminale """
+        return len(self._level)
+
+    def add_variable(self, name):
+        """ Haengt eine Variable unten an die Ordnung an, falls sie noch nicht vorkommt
+
+            :param name: String
+            :return: Position der Variablen in der Ordnung
+        """
+        level = self._level_by_name.get(name)
+        if level is None:
+            level = self._level_by_name[name] = len(self.variables)
+            self.variables.append(name)
+        return level
+
+    def variable(self, name):
+        """ Liefert den Knoten der Formel, die nur aus der Variablen besteht """
+        return self._node(self.add_variable(name), FALSE, TRUE)
+
+    def _node(self, level, low, high):
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            node = self._unique[key] = len(self._level)
+            self._level.append(level)
+            self._low.append(low)
+            self._high.append(high)
+        return node
+
+    def _top(self, node):
+        level = self._level[node]
+        return len(self.variables) if level is None else level
+
+    def _cofactors(self, node, level):
+        if self._level[node] == level:
+            return self._low[node], self._high[node]
+        return node, node
+
+    def ite(self, condition, then, otherwise):
+        """ Liefert den Knoten fuer "wenn condition, dann then, sonst otherwise"
+
+            :param condition, then, otherwise: Knoten
+            :return: Knoten
+        """
+        results = []
+        # Aufgaben (f, g, h, None) berechnen ite(f, g, h), (f, g, h, level) setzen den Knoten aus den beiden
+        # Ergebnissen der Kofaktoren zusammen
+        stack = [(condition, then, otherwise, None)]
+        while stack:
+            f, g, h, level = stack.pop()
+            if level is not None:
+                high = results.pop()
+                low = results.pop()
+                node = self._node(level, low, high)
+                self._store((f, g, h), node)
+                results.append(node)
+                continue
+            if f == TRUE or g == h:
+                results.append(g)
+                continue
+            if f == FALSE:
+                results.append(h)
+                continue
+            if g == TRUE and h == FALSE:
+                results.append(f)
+                continue
+            node = self._cache.get((f, g, h))
+            if node is not None:
+                self.cache_hits += 1
+                self._cache.move_to_end((f, g, h))
+                results.append(node)
+                continue
+            self.cache_misses += 1
+            level = min(self._top(f), self._top(g), self._top(h))
+            f0, f1 = self._cofactors(f, level)
+            g0, g1 = self._cofactors(g, level)
+            h0, h1 = self._cofactors(h, level)
+            stack.append((f, g, h, level))
+            stack.append((f1, g1, h1, None))
+            stack.append((f0, g0, h0, None))
+        return results.pop()
+
+    def _store(self, key, node):
+        self._cache[key] = node
+        if self._cache_size is not None and len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def negate(self, node):
+        return self.ite(node, FALSE, TRUE)
+
+    def conjunction(self, left, right):
+        return self.ite(left, right, FALSE)
+
+    def disjunction(self, left, right):
+        return self.ite(left, TRUE, right)
+
+    def implication(self, left, right):
+        return self.ite(left, right, TRUE)
+
+    def biimplication(self, left, right):
+        return self.ite(left, right, self.negate(right))
+
+    def from_term(self, term):
+        """ Uebersetzt einen Term in ein BDD. Gemeinsame Teilterme werden nur einmal uebersetzt.
+
+            :param term: Objekt der Klasse Term
+            :return: Knoten
+        """
+        nodes = {}
+        stack = [(term, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if current in nodes:
+                continue
+            if not expanded and current.parameters:
+                stack.append((current, True))
+                stack.extend((parameter, False) for parameter in reversed(current.parameters))
+                continue
+            code = current.code
+            children = [nodes[parameter] for parameter in current.parameters]
+            if code == OP_VARIABLE:
+                node = self.variable(current.operator)
+            elif code == OP_TOP:
+                node = TRUE
+            elif code == OP_BOT:
+                node = FALSE
+            elif code == OP_NOT:
+                node = self.negate(children[0])
+            elif code == OP_AND:
+                node = TRUE
+                for child in self._bottom_up(children):
+                    node = self.conjunction(child, node)
+            elif code == OP_OR:
+                node = FALSE
+                for child in self._bottom_up(children):
+                    node = self.disjunction(child, node)
+            elif code == OP_IMPL:
+                node = self.implication(children[0], children[1])
+            elif code == OP_BIIMPL:
+                node = self.biimplication(children[0], children[1])
+            else:
+                raise ValueError("Unknown operator " + current.operator)
+            nodes[current] = node
+        return nodes[term]
+
+    def _bottom_up(self, nodes):
+        """ Ordnet die Operanden einer n-stelligen Verknuepfung von unten nach oben, ein Operand oberhalb des
+            bisherigen Ergebnisses wird dann in konstanter Zeit davor gesetzt, statt das Ergebnis zu durchlaufen
+        """
+        return sorted(nodes, key=self._top, reverse=True)
+
+    def from_formula(self, formula):
+        """ Uebersetzt eine Formel im Stringformat oder einen Term in ein BDD
+
+            :param formula: String oder Objekt der Klasse Term
+            :return: Knoten
+        """
+        if isinstance(formula, str):
+            formula = ParserStringToDIMACS.build_term_from_string(formula)
+        return self.from_term(formula)
+
+    def _post_order(self, root):
+        """ Liefert die inneren Knoten unterhalb von root, Nachfolger vor ihren Vorgaengern """
+        order = []
+        seen = {FALSE, TRUE}
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+                continue
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.append((node, True))
+            stack.append((self._high[node], False))
+            stack.append((self._low[node], False))
+        return order
+
+    def size(self, root):
+        """ Anzahl der Knoten des BDD einschliesslich der erreichten Terminale """
+        if root in (FALSE, TRUE):
+            return 1
+        # ein reduziertes BDD, das keine Konstante ist, erreicht beide Terminale
+        return len(self._post_order(root)) + 2
+
+    def count(self, root, num_variables=None):
+        """ Zaehlt die Modelle, linear in der Groesse des BDD
+
+            :param root: Knoten
+            :param num_variables: Anzahl der Variablen der Ordnung, ueber die gezaehlt wird, None fuer alle;
+                                  die Variablen des BDD muessen darunter sein
+            :return: int
+        """
+        if num_variables is None:
+            num_variables = len(self.variables)
+        # je Knoten die Anzahl der Belegungen der Variablen von seiner Position bis zum Ende der Ordnung
+        counts = {FALSE: 0, TRUE: 1}
+
+        def level(node):
+            position = self._level[node]
+            return num_variables if position is None else position
+
+        for node in self._post_order(root):
+            position = self._level[node]
+            low = self._low[node]
+            high = self._high[node]
+            counts[node] = (counts[low] << (level(low) - position - 1)) + (counts[high] << (level(high) - position - 1))
+        return counts[root] << level(root)
+
+    def iter_cubes(self, root):
+        """ Liefert die Pfade zu TRUE als partielle Belegungen, fehlende Variablen sind beliebig.
+            Die Wuerfel sind disjunkt.
+
+            :return: Generator von Dictionaries Variable -> Boolean
+        """
+        stack = [(root, {})]
+        while stack:
+            node, cube = stack.pop()
+            if node == FALSE:
+                continue
+            if node == TRUE:
+                yield cube
+                continue
+            name = self.variables[self._level[node]]
+            stack.append((self._high[node], dict(cube, **{name: True})))
+            stack.append((self._low[node], dict(cube, **{name: False})))
+
+    def iter_models(self, root, variables=None):
+        """ Liefert alle Modelle einzeln
+
+            :param root: Knoten
+            :param variables: Namen der Variablen eines Modells, None fuer alle Variablen der Ordnung; die
+                              Variablen des BDD muessen darunter sein
+            :return: Generator von Dictionaries Variable -> Boolean
+        """
+        if variables is None:
+            variables = self.variables
+        for cube in self.iter_cubes(root):
+            missing = [name for name in variables if name not in cube]
+            for values in itertools.product((False, True), repeat=len(missing)):
+                model = dict(cube)
+                model.update(zip(missing, values))
+                yield model
+
+    def evaluate(self, root, assignment):
+        """ Wertet ein BDD fuer eine Belegung aus
+
+            :param assignment: Dictionary Variable -> Boolean
+            :return: Boolean
+        """
+        node = root
+        while node not in (FALSE, TRUE):
+            node = self._high[node] if assignment[self.variables[self._level[node]]] else self._low[node]
+        return node == TRUE
+
+    def equivalent(self, left, right):
+        """ Zwei Knoten desselben BDD stehen genau dann fuer aequivalente Formeln, wenn sie gleich sind """
+        return left == right
+
+
+def equivalent_formulas(left, right, order=()):
+    """ Prueft zwei Formeln ueber ein gemeinsames BDD auf Aequivalenz
+
+        :param left, right: Strings oder Objekte der Klasse Term
+        :param order: Variablenordnung, siehe BDD
+        :return: Boolean
+    """
+    manager = BDD(order)
+    return manager.equivalent(manager.from_formula(left), manager.from_formula(right))
@@ -0,0 +1,70 @@
+import itertools
+import random
+
+from bdd import BDD, FALSE, TRUE, equivalent_formulas
+from benchmark import left_nested, parity_chain, pigeonhole
+from oracles import formula_models, random_formula
+
+
+def test_bdd_basics():
+    manager = BDD(["a", "b"])
+    a = manager.variable("a")
+    b = manager.variable("b")
+    assert manager.conjunction(a, manager.negate(a)) == FALSE
+    assert manager.disjunction(a, manager.negate(a)) == TRUE
+    assert manager.conjunction(a, b) == manager.conjunction(b, a)
+    assert manager.negate(manager.negate(a)) == a
+    root = manager.from_formula("Or(a,b)")
+    assert manager.disjunction(a, b) == root
+    assert manager.count(root) == 3
+    assert manager.size(root) == 4
+    assert list(manager.iter_models(root)) == [{"a": False, "b": True}, {"a": True, "b": False},
+                                               {"a": True, "b": True}]
+    assert list(manager.iter_cubes(root)) == [{"a": False, "b": True}, {"a": True}]
+    assert manager.evaluate(root, {"a": False, "b": True}) and not manager.evaluate(root, {"a": False, "b": False})
+    assert manager.from_formula("TOP") == TRUE and manager.count(manager.from_formula("BOT")) == 0
+    assert manager.count(manager.variable("c")) == 4
+    assert equivalent_formulas("Impl(a,b)", "Or(Not(a),b)")
+    assert equivalent_formulas("BiImpl(a,b)", "And(Impl(a,b),Impl(b,a))")
+    assert not equivalent_formulas("Impl(a,b)", "Impl(b,a)")
+
+
+def test_bdd_against_truth_table():
+    generator = random.Random(3)
+    names = ["a", "b", "c", "d"]
+    for _ in range(50):
+        formula = random_formula(generator, 4, names)
+        manager = BDD(names)
+        root = manager.from_formula(formula)
+        expected = sorted(formula_models(formula, names))
+        assert manager.count(root) == len(expected)
+        assert sorted(tuple(model[name] for name in names) for model in manager.iter_models(root)) == expected
+        for values in itertools.product((False, True), repeat=len(names)):
+            assignment = dict(zip(names, values))
+            assert manager.evaluate(root, assignment) == (values in expected)
+
+
+def test_bdd_large_formulas():
+    manager = BDD()
+    root = manager.from_formula(parity_chain(300))
+    assert manager.count(root) == 2 ** 299
+    assert manager.size(root) == 601
+    assert manager.cache_hits + manager.cache_misses > 0
+    manager = BDD()
+    assert manager.from_formula(pigeonhole(5)) == FALSE
+    # ein neues BDD, sonst wird auch ueber die Variablen von pigeonhole(5) gezaehlt
+    manager = BDD()
+    assert manager.count(manager.from_formula(pigeonhole(4, 4))) == 24
+    # Ordnung mit allen x vor allen y gegen verschraenkte Ordnung
+    formula = "And(" + ",".join("BiImpl(x%d,y%d)" % (index, index) for index in range(10)) + ")"
+    interleaved = BDD()
+    separated = BDD(["x%d" % index for index in range(10)])
+    assert interleaved.size(interleaved.from_formula(formula)) < separated.size(separated.from_formula(formula))
+    manager = BDD(cache_size=16)
+    root = manager.from_formula(left_nested(3000))
+    assert manager.count(root) == 1 and manager.size(root) == 3003
+
+
+test_bdd_basics()
+test_bdd_against_truth_table()
+test_bdd_large_formulas()
@@ -0,0 +1,287 @@
+"""
+Benchmarks fuer die einzelnen Stufen von ParserStringToDIMACS: Einlesen (build_term_from_string), Umwandlung in
+KNF (convert_to_cnf bzw. convert_to_definitional_cnf), Ausgabe im DIMACS Format (create_dimacs) und Aufzaehlung
+von Modellen. Die Formeln werden von parametrisierten Generatoren in der Syntax des Parsers erzeugt.
+
+Aufruf: python benchmark.py [--quick] [--repeat N] [--output ergebnis.json] [--baseline alt.json]
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from aufgabe1neu import ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN, ParserStringToDIMACS
+
+# Version des Formats der JSON-Ausgabe
+RESULT_FORMAT = 1
+
+
+def pigeonhole(pigeons, holes=None):
+    """ Schubfachprinzip: pigeons Tauben in holes Loecher, unerfuellbar fuer pigeons > holes
+
+        :param pigeons: int
+        :param holes: int oder None fuer pigeons - 1
+        :return: Formel als String
+    """
+    if holes is None:
+        holes = pigeons - 1
+    name = lambda pigeon, hole: "p%d_%d" % (pigeon, hole)
+    parameters = ["Or(" + ",".join(name(pigeon, hole) for hole in range(holes)) + ")" for pigeon in range(pigeons)]
+    for hole in range(holes):
+        for a in range(pigeons):
+            for b in range(a + 1, pigeons):
+                parameters.append("Or(Not(%s),Not(%s))" % (name(a, hole), name(b, hole)))
+    return "And(" + ",".join(parameters) + ")"
+
+
+def random_3sat(num_variables, num_clauses=None, seed=0):
+    """ Zufaellige 3-KNF, ohne Angabe der Klauselanzahl am Phasenuebergang (4.26 Klauseln je Variable)
+
+        :param num_variables: int
+        :param num_clauses: int oder None
+        :param seed: Startwert des Zufallsgenerators
+        :return: Formel als String
+    """
+    if num_clauses is None:
+        num_clauses = int(4.26 * num_variables)
+    generator = random.Random(seed)
+    clauses = []
+    for _ in range(num_clauses):
+        literals = []
+        for variable in generator.sample(range(num_variables), min(3, num_variables)):
+            literal = "x%d" % variable
+            literals.append("Not(%s)" % literal if generator.random() < 0.5 else literal)
+        clauses.append("Or(" + ",".join(literals) + ")")
+    return "And(" + ",".join(clauses) + ")"
+
+
+def parity_chain(length):
+    """ Paritaet von length Variablen als rechtslastige Kette BiImpl(x0, BiImpl(x1, ...)) """
+    return "".join("BiImpl(x%d," % index for index in range(length - 1)) + "x%d" % (length - 1) + ")" * (length - 1)
+
+
+def left_nested(depth, operator="And"):
+    """ Linkslastige Kette operator(operator(operator(x0, x1), x2), ...) der Tiefe depth """
+    return (operator + "(") * depth + "x0" + "".join(",x%d)" % (index + 1) for index in range(depth))
+
+
+def right_nested(depth, operator="Or"):
+    """ Rechtslastige Kette operator(x0, operator(x1, ...)) der Tiefe depth """
+    return "".join("%s(x%d," % (operator, index) for index in range(depth)) + "x%d" % depth + ")" * depth
+
+
+def wide_disjunction(width):
+    """ Flache Disjunktion Or(x0, Not(x1), x2, ...) mit width Parametern """
+    return "Or(" + ",".join("Not(x%d)" % index if index % 2 else "x%d" % index for index in range(width)) + ")"
+
+
+GENERATORS = {
+    "pigeonhole": pigeonhole,
+    "random-3sat": random_3sat,
+    "parity": parity_chain,
+    "left-nested": left_nested,
+    "right-nested": right_nested,
+    "wide-disjunction": wide_disjunction,
+}
+
+# Eintraege: (Generator, Parameter, Kodierung). Die distributive Kodierung waechst bei Paritaetsketten
+# exponentiell, diese werden daher nur kurz distributiv und lang mit der Tseitin-Kodierung gemessen.
+# Bei einer einzigen langen Klausel sind die Blockierklauseln der Aufzaehlung so lang wie die Formel,
+# Or-Ketten und breite Disjunktionen sind daher kleiner gewaehlt.
+DEFAULT_SUITE = [
+    ("pigeonhole", {"pigeons": 7}, ENCODING_DISTRIBUTIVE),
+    ("random-3sat", {"num_variables": 60, "seed": 1}, ENCODING_DISTRIBUTIVE),
+    ("random-3sat", {"num_variables": 60, "seed": 1}, ENCODING_TSEITIN),
+    ("parity", {"length": 4}, ENCODING_DISTRIBUTIVE),
+    ("parity", {"length": 200}, ENCODING_TSEITIN),
+    ("left-nested", {"depth": 20000}, ENCODING_DISTRIBUTIVE),
+    ("right-nested", {"depth": 1000}, ENCODING_DISTRIBUTIVE),
+    ("left-nested", {"depth": 20000}, ENCODING_TSEITIN),
+    ("wide-disjunction", {"width": 1000}, ENCODING_DISTRIBUTIVE),
+]
+
+QUICK_SUITE = [
+    ("pigeonhole", {"pigeons": 4}, ENCODING_DISTRIBUTIVE),
+    ("random-3sat", {"num_variables": 15, "seed": 1}, ENCODING_DISTRIBUTIVE),
+    ("parity", {"length": 3}, ENCODING_DISTRIBUTIVE),
+    ("parity", {"length": 20}, ENCODING_TSEITIN),
+    ("left-nested", {"depth": 200}, ENCODING_DISTRIBUTIVE),
+    ("right-nested", {"depth": 200}, ENCODING_DISTRIBUTIVE),
+    ("wide-disjunction", {"width": 200}, ENCODING_DISTRIBUTIVE),
+]
+
+
+def _measure(function, argument, repeat, memory):
+    """ Fuehrt function(argument) repeat mal aus und misst die kuerzeste Laufzeit, bei memory=True in einem
+        weiteren Lauf mit tracemalloc den hoechsten zusaetzlichen Speicherbedarf.
+        Das Ergebnis des vorherigen Laufs wird vorher freigegeben, damit die Unique-Tabelle der Terme
+        keine Treffer aus einem frueheren Lauf liefert.
+
+        :return: (Ergebnis, Sekunden, Bytes oder None)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        result = None
+        start = time.perf_counter()
+        result = function(argument)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    peak = None
+    if memory:
+        result = None
+        tracemalloc.start()
+        try:
+            result = function(argument)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, best, peak
+
+
+def run_benchmark(generator, parameters, encoding=ENCODING_DISTRIBUTIVE, repeat=1, model_limit=100, memory=True):
+    """ Misst die Stufen fuer eine erzeugte Formel
+
+        :param generator: Name eines Generators aus GENERATORS
+        :param parameters: Dictionary der Parameter des Generators
+        :param encoding: ENCODING_DISTRIBUTIVE oder ENCODING_TSEITIN
+        :param repeat: Anzahl der Laeufe je Stufe, gemeldet wird der schnellste
+        :param model_limit: maximale Anzahl aufgezaehlter Modelle
+        :param memory: bei True wird der Speicherbedarf je Stufe gemessen
+        :return: Dictionary mit den Messwerten
+    """
+    formula = GENERATORS[generator](**parameters)
+    record = {
+        "name": generator + "(" + ",".join("%s=%s" % item for item in sorted(parameters.items())) + ")/" + encoding,
+        "generator": generator,
+        "parameters": parameters,
+        "encoding": encoding,
+        "formula_length": len(formula),
+        "stages": {},
+    }
+
+    def stage(name, function, argument):
+        result, seconds, peak = _measure(function, argument, repeat, memory)
+        record["stages"][name] = {"seconds": seconds, "peak_bytes": peak}
+        return result
+
+    term = stage("build_term_from_string", ParserStringToDIMACS.build_term_from_string, formula)
+    if encoding == ENCODING_DISTRIBUTIVE:
+        cnf = stage("convert_to_cnf", ParserStringToDIMACS.convert_to_cnf, term)
+        dimacs = stage("create_dimacs", ParserStringToDIMACS.create_dimacs, cnf)
+        store = ParserStringToDIMACS.emit_clauses(cnf)
+    else:
+        store = stage("convert_to_cnf", ParserStringToDIMACS.convert_to_definitional_cnf, term)
+        dimacs = stage("create_dimacs", lambda clauses: clauses.to_dimacs(), store)
+    record["num_variables"] = store.num_variables
+    record["num_clauses"] = store.num_clauses
+    record["dimacs_length"] = len(dimacs)
+    projection = store.original_variables()
+    record["num_models"] = stage(
+        "enumerate_models",
+        lambda clauses: sum(1 for _ in ParserStringToDIMACS.iter_store_models(clauses, projection, model_limit)),
+        store,
+    )
+    return record
+
+
+def run_suite(suite=None, repeat=1, model_limit=100, memory=True, progress=None):
+    """ Fuehrt alle Benchmarks einer Liste aus
+
+        :param suite: Liste von (Generator, Parameter, Kodierung), None fuer DEFAULT_SUITE
+        :param progress: Funktion, die nach jedem Benchmark mit dessen Ergebnis aufgerufen wird, oder None
+        :return: Dictionary mit Umgebung und Ergebnissen, das als JSON gespeichert werden kann
+    """
+    results = []
+    for generator, parameters, encoding in (DEFAULT_SUITE if suite is None else suite):
+        record = run_benchmark(generator, parameters, encoding, repeat, model_limit, memory)
+        results.append(record)
+        if progress is not None:
+            progress(record)
+    return {
+        "format": RESULT_FORMAT,
+        "revision": _revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def _revision():
+    """ Aktueller git-Commit oder None """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+            universal_newlines=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(baseline, current, threshold=1.2):
+    """ Vergleicht die Laufzeiten zweier Ergebnisse von run_suite
+
+        :param baseline: aelteres Ergebnis
+        :param current: neues Ergebnis
+        :param threshold: Verhaeltnis neu / alt, ab dem eine Stufe als Regression gilt
+        :return: Liste von (Name, Stufe, alte Sekunden, neue Sekunden, Verhaeltnis), Regressionen zuerst
+    """
+    old_records = {record["name"]: record for record in baseline["results"]}
+    rows = []
+    for record in current["results"]:
+        old = old_records.get(record["name"])
+        if old is None:
+            continue
+        for stage, values in record["stages"].items():
+            old_values = old["stages"].get(stage)
+            if old_values is None or not old_values["seconds"]:
+                continue
+            ratio = values["seconds"] / old_values["seconds"]
+            rows.append((record["name"], stage, old_values["seconds"], values["seconds"], ratio))
+    rows.sort(key=lambda row: (row[4] < threshold, -row[4]))
+    return rows
+
+
+def _print_record(record):
+    stages = "  ".join("%s %.4fs" % (stage, values["seconds"]) for stage, values in record["stages"].items())
+    print("%-50s vars %-7d clauses %-8d %s" % (record["name"], record["num_variables"], record["num_clauses"], stages))
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmarks fuer ParserStringToDIMACS")
+    parser.add_argument("--quick", action="store_true", help="kleine Formeln, z.B. fuer einen schnellen Test")
+    parser.add_argument("--repeat", type=int, default=3, help="Laeufe je Stufe, gemeldet wird der schnellste")
+    parser.add_argument("--model-limit", type=int, default=100, help="maximale Anzahl aufgezaehlter Modelle")
+    parser.add_argument("--no-memory", action="store_true", help="Speicherbedarf nicht messen")
+    parser.add_argument("--output", help="Ergebnisse als JSON in diese Datei schreiben")
+    parser.add_argument("--baseline", help="JSON-Datei eines frueheren Laufs zum Vergleich")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Verhaeltnis, ab dem eine Regression vorliegt")
+    options = parser.parse_args(arguments)
+    results = run_suite(
+        QUICK_SUITE if options.quick else DEFAULT_SUITE, options.repeat, options.model_limit, not options.no_memory,
+        _print_record,
+    )
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+        regressions = 0
+        for name, stage, old, new, ratio in compare_results(baseline, results, options.threshold):
+            marker = "REGRESSION" if ratio >= options.threshold else ""
+            print("%-50s %-24s %.4fs -> %.4fs  x%.2f %s" % (name, stage, old, new, ratio, marker))
+            if ratio >= options.threshold:
+                regressions += 1
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
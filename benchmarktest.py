@@ -0,0 +1,43 @@
+import json
+
+from aufgabe1neu import ENCODING_TSEITIN, ParserStringToDIMACS
+from benchmark import (
+    compare_results, left_nested, parity_chain, pigeonhole, random_3sat, right_nested, run_suite, wide_disjunction,
+)
+
+
+def test_generators():
+    y = ParserStringToDIMACS()
+    assert y.find_model(pigeonhole(4)) is None
+    assert y.find_model(pigeonhole(3, 3)) is not None
+    store = y.convert_formula_to_clauses(random_3sat(10, seed=2))
+    assert store.num_clauses == 42
+    assert all(len(clause) == 3 for clause in store)
+    assert random_3sat(10, seed=2) == random_3sat(10, seed=2)
+    assert len(list(y.iter_models(parity_chain(4)))) == 8
+    assert len(list(y.iter_models(parity_chain(12), encoding=ENCODING_TSEITIN))) == 2048
+    assert left_nested(2) == "And(And(x0,x1),x2)"
+    assert right_nested(2) == "Or(x0,Or(x1,x2))"
+    assert wide_disjunction(3) == "Or(x0,Not(x1),x2)"
+
+
+def test_run_suite_and_compare():
+    suite = [("parity", {"length": 3}, "distributive"), ("left-nested", {"depth": 50}, ENCODING_TSEITIN)]
+    results = json.loads(json.dumps(run_suite(suite, model_limit=5)))
+    first, second = results["results"]
+    assert first["name"] == "parity(length=3)/distributive"
+    assert first["num_variables"] == 3 and first["num_clauses"] == 4 and first["num_models"] == 4
+    assert second["num_models"] == 1
+    assert set(first["stages"]) == {"build_term_from_string", "convert_to_cnf", "create_dimacs", "enumerate_models"}
+    assert all(stage["peak_bytes"] > 0 for stage in first["stages"].values())
+    slower = json.loads(json.dumps(results))
+    for stage in slower["results"][0]["stages"].values():
+        stage["seconds"] = 2 * stage["seconds"] + 1
+    rows = compare_results(results, slower)
+    assert len(rows) == 8
+    assert rows[0][0] == first["name"] and rows[0][4] >= 1.2
+    assert all(row[4] < 1.2 for row in rows[4:])
+
+
+test_generators()
+test_run_suite_and_compare()
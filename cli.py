@@ -0,0 +1,211 @@
+"""
+Kommandozeile fuer ParserStringToDIMACS. Die Eingabe enthaelt eine Formel je Zeile, leere Zeilen und Zeilen, die mit
+# beginnen, werden uebersprungen. Die Zeilen werden erst gelesen, wenn die vorherige Formel verarbeitet ist, die
+Eingabe muss daher nicht in den Speicher passen.
+
+    python cli.py convert [datei] [--encoding tseitin] [--preprocess] [--jobs N]
+    python cli.py solve [datei]
+    python cli.py enumerate [datei] [--limit N] [--projection a,b]
+    python cli.py count [datei] [--projection a,b]
+
+Ohne Datei wird von stdin gelesen, mit --mmap wird die Datei in den Speicher abgebildet. Die Ergebnisse werden nach
+stdout gestreamt, jeweils nach einer Kommentarzeile "c formula <Zeile>", oder mit --output-dir je Formel in eine
+eigene Datei <Zeile>.<Endung>. Es werden keine gemeinsamen temporaeren Dateien verwendet. Fehler einzelner Formeln
+werden auf stderr gemeldet und auf stdout mit einer abschliessenden Kommentarzeile "c error <Meldung>" markiert, die
+uebrigen Formeln werden trotzdem verarbeitet.
+"""
+import argparse
+import contextlib
+import mmap
+import os
+import sys
+
+from aufgabe1neu import (
+    BACKEND_CDCL, BACKEND_MINISAT, ENCODING_DISTRIBUTIVE, ENCODING_PLAISTED_GREENBAUM, ENCODING_TSEITIN,
+    ParserStringToDIMACS,
+)
+from counting import count_formula_models
+
+ENCODINGS = (ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN, ENCODING_PLAISTED_GREENBAUM)
+
+# Dateiendung der Ausgabe je Modus bei --output-dir
+_EXTENSIONS = {"convert": "cnf", "solve": "sol", "enumerate": "models", "count": "count"}
+
+
+def iter_lines(path=None, use_mmap=False, stdin=None):
+    """ Liest die Zeilen der Eingabe nacheinander
+
+        :param path: Pfad der Eingabedatei oder None fuer stdin
+        :param use_mmap: bei True wird die Datei mit mmap gelesen
+        :param stdin: Datei-Objekt statt sys.stdin
+        :return: Generator von Strings ohne Zeilenende
+    """
+    if path is None:
+        for line in stdin if stdin is not None else sys.stdin:
+            yield line.rstrip("\r\n")
+    elif use_mmap:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for line in iter(mapped.readline, b""):
+                    yield line.decode("utf-8").rstrip("\r\n")
+    else:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                yield line.rstrip("\r\n")
+
+
+def iter_formulas(lines):
+    """ Liefert die Formeln der Eingabe mit ihrer Zeilennummer
+
+        :param lines: Iterable von Strings
+        :return: Generator von Paaren (Zeilennummer ab 1, Formel)
+    """
+    for number, line in enumerate(lines, 1):
+        formula = line.strip()
+        if formula and not formula.startswith("#"):
+            yield number, formula
+
+
+def _literal(name, value):
+    return name if value else "-" + name
+
+
+def write_convert(formula, output, options):
+    if options.preprocess:
+        output.write(ParserStringToDIMACS.convert_formula_to_dimacs(formula, False, options.encoding,
+                                                                    preprocess=True) + "\n")
+    elif options.output_dir is not None:
+        # nur eigene Dateien werden fuer die Kopfzeile zurueckgespult, stdout wird in Stuecken geschrieben
+        ParserStringToDIMACS.write_dimacs(formula, output, options.encoding)
+    else:
+        for chunk in ParserStringToDIMACS.iter_dimacs_chunks(formula, options.encoding):
+            output.write(chunk)
+
+
+def write_solve(formula, output, options):
+    model = next(ParserStringToDIMACS.iter_models(formula, limit=1, encoding=options.encoding,
+                                                  backend=options.backend, preprocess=options.preprocess), None)
+    if model is None:
+        output.write("s UNSATISFIABLE\n")
+    else:
+        output.write("s SATISFIABLE\n")
+        output.write("v " + "".join(_literal(name, value) + " " for name, value in model.items()) + "0\n")
+
+
+def write_enumerate(formula, output, options):
+    for model in ParserStringToDIMACS.iter_models(formula, options.projection, options.limit, options.minimize,
+                                                  options.encoding, options.backend, options.preprocess):
+        output.write("".join(_literal(name, value) + " " for name, value in model.items()) + "0\n")
+
+
+def write_count(formula, output, options):
+    output.write("%d\n" % count_formula_models(formula, options.projection, options.encoding, options.preprocess))
+
+
+_WRITERS = {"convert": write_convert, "solve": write_solve, "enumerate": write_enumerate, "count": write_count}
+
+
+def _iter_batch_results(formulas, options):
+    """ Wandelt die Formeln mit convert_formulas_to_dimacs in options.jobs Prozessen um, die Eingabe wird dabei
+        weiterhin nur paketweise gelesen
+    """
+    # Index in convert_formulas_to_dimacs -> Zeilennummer, nur fuer Formeln in Arbeit
+    numbers = {}
+
+    def texts():
+        for index, (number, formula) in enumerate(formulas):
+            numbers[index] = number
+            yield formula
+
+    for result in ParserStringToDIMACS.convert_formulas_to_dimacs(texts(), encoding=options.encoding,
+                                                                  max_workers=options.jobs):
+        yield numbers.pop(result.index), result.dimacs, result.error
+
+
+def run(options, stdin=None, stdout=None, stderr=None):
+    """ Verarbeitet alle Formeln der Eingabe
+
+        :param options: Ergebnis von build_argument_parser().parse_args()
+        :return: Exit-Code, 1 falls eine Formel nicht verarbeitet werden konnte
+    """
+    stdout = stdout if stdout is not None else sys.stdout
+    stderr = stderr if stderr is not None else sys.stderr
+    formulas = iter_formulas(iter_lines(options.input, options.mmap, stdin))
+    if options.output_dir is not None:
+        os.makedirs(options.output_dir, exist_ok=True)
+
+    def output_path(number):
+        return os.path.join(options.output_dir, "%d.%s" % (number, _EXTENSIONS[options.mode]))
+
+    def open_output(number):
+        if options.output_dir is None:
+            stdout.write("c formula %d\n" % number)
+            return contextlib.nullcontext(stdout)
+        return open(output_path(number), "w")
+
+    def report_error(number, error):
+        stderr.write("formula %d: %s\n" % (number, error))
+        if options.output_dir is None:
+            # die bis dahin ausgegebenen Zeilen der Formel sind unvollstaendig
+            stdout.write("c error %s\n" % " ".join(str(error).split()))
+
+    failed = 0
+    if options.mode == "convert" and options.jobs is not None:
+        for number, dimacs, error in _iter_batch_results(formulas, options):
+            if error is not None:
+                if options.output_dir is None:
+                    stdout.write("c formula %d\n" % number)
+                report_error(number, error)
+                failed += 1
+                continue
+            with open_output(number) as output:
+                output.write(dimacs + "\n")
+        return 1 if failed else 0
+    writer = _WRITERS[options.mode]
+    for number, formula in formulas:
+        try:
+            with open_output(number) as output:
+                writer(formula, output, options)
+        except Exception as error:
+            report_error(number, error)
+            failed += 1
+            # keine unvollstaendigen Ergebnisdateien zuruecklassen
+            if options.output_dir is not None and os.path.exists(output_path(number)):
+                os.remove(output_path(number))
+    return 1 if failed else 0
+
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(description="Formeln in das DIMACS Format umwandeln und loesen")
+    parser.add_argument("mode", choices=sorted(_WRITERS), help="convert, solve, enumerate oder count")
+    parser.add_argument("input", nargs="?", help="Datei mit einer Formel je Zeile, ohne Angabe stdin")
+    parser.add_argument("--mmap", action="store_true", help="Eingabedatei mit mmap lesen")
+    parser.add_argument("--output-dir", help="Ergebnis je Formel in eine eigene Datei in diesem Verzeichnis")
+    parser.add_argument("--encoding", choices=ENCODINGS,
+                        help="KNF-Kodierung, Standard distributive fuer convert, sonst tseitin")
+    parser.add_argument("--preprocess", action="store_true", help="KNF vor Ausgabe bzw. Solveraufruf vereinfachen")
+    parser.add_argument("--backend", choices=(BACKEND_CDCL, BACKEND_MINISAT), default=BACKEND_CDCL)
+    parser.add_argument("--limit", type=int, help="enumerate: maximale Anzahl der Modelle je Formel")
+    parser.add_argument("--minimize", action="store_true", help="enumerate: Modelle zu Wuerfeln verkleinern")
+    parser.add_argument("--projection", type=lambda value: [name for name in value.split(",") if name],
+                        help="enumerate/count: kommagetrennte Variablen, auf die projiziert wird")
+    parser.add_argument("--jobs", type=int, help="convert: Anzahl der Prozesse fuer die Umwandlung")
+    return parser
+
+
+def main(arguments=None):
+    parser = build_argument_parser()
+    options = parser.parse_args(arguments)
+    if options.mmap and options.input is None:
+        parser.error("--mmap needs an input file")
+    if options.jobs is not None and (options.mode != "convert" or options.preprocess):
+        parser.error("--jobs is only supported for convert without --preprocess")
+    if options.encoding is None:
+        options.encoding = ENCODING_DISTRIBUTIVE if options.mode == "convert" else ENCODING_TSEITIN
+    return run(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
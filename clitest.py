@@ -0,0 +1,76 @@
+import contextlib
+import io
+import os
+import tempfile
+
+from cli import iter_formulas, main
+
+
+def _run(arguments):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        code = main(arguments)
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
+def test_iter_formulas():
+    lines = ["# Kommentar", "Or(a,b)", "", "  And(a,b)  "]
+    assert list(iter_formulas(lines)) == [(2, "Or(a,b)"), (4, "And(a,b)")]
+
+
+def test_modes_on_stdout():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "formulas.txt")
+        with open(path, "w") as file:
+            file.write("Or(a,b)\n# uebersprungen\nAnd(a,Not(a))\n")
+        code, output, _ = _run(["convert", path])
+        assert code == 0
+        assert output == "c formula 1\np cnf 2 1\n1 2 0\nc formula 3\np cnf 1 1\n0\n"
+        code, mapped, _ = _run(["convert", path, "--mmap"])
+        assert mapped == output
+        code, output, _ = _run(["solve", path])
+        lines = output.splitlines()
+        assert lines[0] == "c formula 1" and lines[1] == "s SATISFIABLE"
+        assert lines[2].startswith("v ") and lines[2].endswith(" 0") and "a" in lines[2]
+        assert lines[3:] == ["c formula 3", "s UNSATISFIABLE"]
+        code, output, _ = _run(["enumerate", path, "--projection", "a"])
+        assert output.splitlines() == ["c formula 1", "-a 0", "a 0", "c formula 3"] or \
+            output.splitlines() == ["c formula 1", "a 0", "-a 0", "c formula 3"]
+        code, output, _ = _run(["enumerate", path, "--limit", "1"])
+        assert len(output.splitlines()) == 3
+        code, output, _ = _run(["count", path])
+        assert output == "c formula 1\n3\nc formula 3\n0\n"
+
+
+def test_output_dir_and_errors():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "formulas.txt")
+        with open(path, "w") as file:
+            file.write("Or(a,b\nImpl(a,b)\n")
+        results = os.path.join(directory, "results")
+        code, output, errors = _run(["convert", path, "--output-dir", results, "--encoding", "tseitin"])
+        assert code == 1 and output == ""
+        assert errors.startswith("formula 1: ")
+        assert os.listdir(results) == ["2.cnf"]
+        with open(os.path.join(results, "2.cnf")) as file:
+            assert file.readline().startswith("p cnf ")
+        code, _, errors = _run(["convert", path, "--output-dir", results, "--jobs", "2"])
+        assert code == 1 and errors.startswith("formula 1: ")
+        with open(os.path.join(results, "2.cnf")) as file:
+            assert file.read() == "p cnf 2 1\n-1 2 0\n"
+        # auf stdout wird die fehlerhafte Formel mit und ohne --jobs mit einer Kommentarzeile markiert
+        code, output, errors = _run(["convert", path])
+        assert code == 1 and errors.startswith("formula 1: ")
+        message = errors[len("formula 1: "):].strip()
+        assert output == "c formula 1\nc error %s\nc formula 2\np cnf 2 1\n-1 2 0\n" % message
+        code, batched, _ = _run(["convert", path, "--jobs", "2"])
+        assert batched == output
+        code, _, _ = _run(["count", path, "--output-dir", results])
+        with open(os.path.join(results, "2.count")) as file:
+            assert file.read() == "3\n"
+
+
+test_iter_formulas()
+test_modes_on_stdout()
+test_output_dir_and_errors()
@@ -0,0 +1,224 @@
+"""
+Exaktes Zaehlen von Modellen (#SAT) einer Klauselmenge im DIMACS Format, ohne die Modelle aufzuzaehlen.
+
+Das Verfahren ist DPLL mit Zerlegung in Zusammenhangskomponenten: nach der Unit Propagation wird die Klauselmenge
+in Komponenten ohne gemeinsame Variablen zerlegt, deren Anzahlen multipliziert werden. Die Anzahl jeder Komponente
+wird unter ihrer Klauselmenge zwischengespeichert, gleiche Teilprobleme in verschiedenen Zweigen werden daher nur
+einmal gezaehlt. Die Ergebnisse sind Python-ints und damit auch fuer sehr viele Modelle exakt.
+
+Beim projizierten Zaehlen wird nur ueber die projizierten Variablen verzweigt. Eine Komponente ohne projizierte
+Variablen traegt 1 oder 0 bei, je nachdem, ob sie erfuellbar ist; das prueft CDCLSolver.
+"""
+from aufgabe1neu import ENCODING_PLAISTED_GREENBAUM, ENCODING_TSEITIN, ParserStringToDIMACS
+from solver import CDCLSolver
+
+
+def _propagate(clauses):
+    """ Unit Propagation auf einer Liste von Klauseln (Tupel von int)
+
+        :return: Paar (vereinfachte Klauseln, Menge der belegten Literale) oder None bei einem Konflikt
+    """
+    assigned = set()
+    units = [clause[0] for clause in clauses if len(clause) == 1]
+    while units:
+        for literal in units:
+            if -literal in assigned:
+                return None
+            assigned.add(literal)
+        units = []
+        remaining = []
+        for clause in clauses:
+            if any(literal in assigned for literal in clause):
+                continue
+            reduced = tuple(literal for literal in clause if -literal not in assigned)
+            if not reduced:
+                return None
+            if len(reduced) == 1:
+                units.append(reduced[0])
+            remaining.append(reduced)
+        clauses = remaining
+    return clauses, assigned
+
+
+def _components(clauses):
+    """ Zerlegt Klauseln in Gruppen ohne gemeinsame Variablen (Union-Find ueber die Variablen)
+
+        :return: Liste von Listen von Klauseln
+    """
+    parent = {}
+
+    def find(variable):
+        root = variable
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while variable != root:
+            parent[variable], variable = root, parent[variable]
+        return root
+
+    for clause in clauses:
+        first = find(abs(clause[0]))
+        for literal in clause[1:]:
+            other = find(abs(literal))
+            if other != first:
+                parent[other] = first
+    groups = {}
+    for clause in clauses:
+        groups.setdefault(find(abs(clause[0])), []).append(clause)
+    return list(groups.values())
+
+
+def _assign(clauses, literal):
+    """ Setzt ein Literal wahr: erfuellte Klauseln entfallen, das negierte Literal wird entfernt """
+    return [
+        tuple(other for other in clause if other != -literal) for clause in clauses if literal not in clause
+    ]
+
+
+class ModelCounter:
+    """
+    Zaehlt die Modelle einer Klauselmenge, optional projiziert auf eine Teilmenge der Variablen.
+    Der Komponenten-Cache bleibt zwischen Aufrufen von count erhalten, solange die Projektion gleich ist.
+
+    Die Verzweigungen werden nicht rekursiv verfolgt: jedes Teilproblem ist ein Generator, der seine Teilprobleme
+    mit yield anfordert und deren Anzahl zurueckerhaelt. Die offenen Generatoren liegen auf einem expliziten
+    Stack, die Tiefe ist daher nicht durch das Rekursionslimit beschraenkt.
+
+    Attribute: decisions: Anzahl der Verzweigungen
+               components: Anzahl der gezaehlten Komponenten
+               cache_hits: Anzahl der Komponenten, deren Anzahl aus dem Cache kam
+               sat_checks: Anzahl der Aufrufe von CDCLSolver fuer Komponenten ohne projizierte Variablen
+    """
+    def __init__(self, projection=None, max_cache_size=None):
+        """
+            :param projection: Iterable von Variablennummern oder None, um ueber alle Variablen zu zaehlen
+            :param max_cache_size: maximale Anzahl der Eintraege im Komponenten-Cache oder None; ist der Cache
+                                   voll, wird er geleert
+        """
+        self.decisions = 0
+        self.components = 0
+        self.cache_hits = 0
+        self.sat_checks = 0
+        self._projection = None if projection is None else frozenset(projection)
+        self._max_cache_size = max_cache_size
+        self._cache = {}
+
+    def count(self, clauses, num_variables=0):
+        """ Zaehlt die Modelle einer Klauselmenge
+
+            :param clauses: Iterable von Klauseln (Iterables von int), z.B. ein ClauseStore
+            :param num_variables: Anzahl der Variablen; Variablen bis num_variables, die in keiner Klausel vorkommen,
+                                  verdoppeln die Anzahl, sofern sie projiziert werden
+            :return: Anzahl der Belegungen der (projizierten) Variablen, die sich zu einem Modell erweitern lassen
+        """
+        normalized = set()
+        variables = set(range(1, num_variables + 1))
+        for clause in clauses:
+            literals = frozenset(clause)
+            variables.update(abs(literal) for literal in literals)
+            if not literals:
+                return 0
+            if not any(-literal in literals for literal in literals):
+                normalized.add(tuple(sorted(literals)))
+        if self._projection is not None:
+            variables = self._projection
+        return self._run(self._count(sorted(normalized), frozenset(variables)))
+
+    @staticmethod
+    def _run(generator):
+        """ Fuehrt einen Generator von _count bzw. _count_component mit allen angeforderten Teilproblemen aus """
+        stack = [generator]
+        value = None
+        while stack:
+            try:
+                request = stack[-1].send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+            stack.append(request)
+            value = None
+        return value
+
+    def _projected(self, variable):
+        return self._projection is None or variable in self._projection
+
+    def _count(self, clauses, variables):
+        """ Zaehlt die Belegungen der Variablen in variables, die sich zu Modellen von clauses erweitern lassen.
+            variables enthaelt nur projizierte Variablen, auch solche, die in keiner Klausel vorkommen.
+        """
+        propagated = _propagate(clauses)
+        if propagated is None:
+            return 0
+        clauses, assigned = propagated
+        occurring = {abs(literal) for clause in clauses for literal in clause}
+        free = variables - occurring - {abs(literal) for literal in assigned}
+        result = 1 << len(free)
+        for component in sorted(_components(clauses), key=len):
+            value = yield self._count_component(component)
+            if value == 0:
+                return 0
+            result *= value
+        return result
+
+    def _count_component(self, component):
+        key = frozenset(component)
+        value = self._cache.get(key)
+        if value is not None:
+            self.cache_hits += 1
+            return value
+        self.components += 1
+        occurrences = {}
+        for clause in component:
+            for literal in clause:
+                variable = abs(literal)
+                if self._projected(variable):
+                    occurrences[variable] = occurrences.get(variable, 0) + 1
+        if not occurrences:
+            self.sat_checks += 1
+            value = 1 if CDCLSolver(component).solve() else 0
+        else:
+            variable = max(occurrences, key=occurrences.get)
+            self.decisions += 1
+            remaining = frozenset(occurrences) - {variable}
+            value = yield self._count(_assign(component, variable), remaining)
+            value += yield self._count(_assign(component, -variable), remaining)
+        if self._max_cache_size is not None and len(self._cache) >= self._max_cache_size:
+            self._cache.clear()
+        self._cache[key] = value
+        return value
+
+
+def count_models(clauses, num_variables=0, projection=None):
+    """ Zaehlt die Modelle einer Klauselmenge, siehe ModelCounter
+
+        :param clauses: Iterable von Klauseln (Iterables von int)
+        :param num_variables: Anzahl der Variablen
+        :param projection: Iterable von Variablennummern oder None
+        :return: int
+    """
+    return ModelCounter(projection).count(clauses, num_variables)
+
+
+def count_formula_models(formula, projection=None, encoding=ENCODING_TSEITIN, preprocess=False):
+    """ Zaehlt die Modelle einer Formel, projiziert auf die Variablen der Formel, Hilfsvariablen der Kodierung
+        werden also nicht mitgezaehlt. Bei der Tseitin-Kodierung sind die Hilfsvariablen durch die Variablen der
+        Formel eindeutig bestimmt, ohne Projektion und Vereinfachung wird daher ueber alle Variablen gezaehlt und
+        auch ueber Hilfsvariablen verzweigt, was die Klauselmenge viel frueher in Komponenten zerlegt.
+
+        :param formula: String oder Objekt der Klasse Term
+        :param projection: Namen der Variablen, auf die projiziert wird, oder None fuer alle Variablen der Formel
+        :param encoding: ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN oder ENCODING_PLAISTED_GREENBAUM
+        :param preprocess: bei True wird die KNF vorher vereinfacht, die projizierten Variablen bleiben erhalten
+        :return: int
+    """
+    store = ParserStringToDIMACS.convert_formula_to_clauses(formula, encoding)
+    if projection is None:
+        numbers = store.original_variables()
+    else:
+        # Variablen, die in der KNF nicht vorkommen, sind frei und verdoppeln die Anzahl
+        numbers = [store.variable_number(name) for name in projection]
+    if preprocess:
+        store, _ = ParserStringToDIMACS.preprocess_clauses(store, numbers)
+    elif projection is None and encoding != ENCODING_PLAISTED_GREENBAUM:
+        return ModelCounter().count(store, store.num_variables)
+    return ModelCounter(numbers).count(store, store.num_variables)
@@ -0,0 +1,62 @@
+import random
+
+from aufgabe1neu import ENCODING_DISTRIBUTIVE, ENCODING_PLAISTED_GREENBAUM, ENCODING_TSEITIN, ParserStringToDIMACS
+from benchmark import parity_chain, pigeonhole
+from counting import ModelCounter, count_formula_models, count_models
+from oracles import clause_models
+
+
+def test_count_models():
+    assert count_models([[1, 2]], 2) == 3
+    assert count_models([[1, 2]], 5) == 24
+    assert count_models([], 100) == 2 ** 100
+    assert count_models([[1], [-1]]) == 0
+    assert count_models([[1, -1], [2]], 2) == 2
+    assert count_models([[]], 3) == 0
+    # zwei unabhaengige Komponenten
+    assert count_models([[1, 2], [3, 4]], 4) == 9
+    assert count_models([[1, 2], [-2, 3]], 3, projection=[1]) == 2
+    assert count_models([[1, 2], [-2, 3]], 3, projection=[1, 4]) == 4
+
+
+def test_count_random_clauses():
+    generator = random.Random(5)
+    for _ in range(40):
+        num_variables = generator.randint(1, 8)
+        clauses = [
+            [generator.choice((1, -1)) * generator.randint(1, num_variables) for _ in range(generator.randint(1, 3))]
+            for _ in range(generator.randint(0, 14))
+        ]
+        projection = generator.sample(range(1, num_variables + 1), generator.randint(1, num_variables))
+        every_variable = range(1, num_variables + 1)
+        assert count_models(clauses, num_variables) == len(clause_models(num_variables, clauses, every_variable))
+        assert count_models(clauses, num_variables, projection) == len(clause_models(num_variables, clauses,
+                                                                                     projection))
+
+
+def test_count_formula_models():
+    assert count_formula_models("Or(a,b)") == 3
+    assert count_formula_models("Or(a,b)", ["a"]) == 2
+    assert count_formula_models("Or(a,b)", ["a", "c"]) == 4
+    assert count_formula_models("And(a,Not(a))") == 0
+    for encoding in (ENCODING_DISTRIBUTIVE, ENCODING_TSEITIN, ENCODING_PLAISTED_GREENBAUM):
+        assert count_formula_models(parity_chain(4), encoding=encoding) == 8
+        assert count_formula_models(parity_chain(4), encoding=encoding, preprocess=True) == 8
+        assert count_formula_models("Or(a,Not(a),b)", encoding=encoding) == 4
+        assert count_formula_models("And(a,Not(a),b)", encoding=encoding) == 0
+        assert count_formula_models("And(Or(a,Not(a)),b)", encoding=encoding) == 2
+    assert count_formula_models(pigeonhole(4, 4)) == 24
+    assert count_formula_models(pigeonhole(5)) == 0
+    # viel zu viele Modelle zum Aufzaehlen
+    assert count_formula_models(parity_chain(200)) == 2 ** 199
+    counter = ModelCounter()
+    store = ParserStringToDIMACS.convert_formula_to_clauses("And(Or(a,b),Or(c,d),Or(e,f))", ENCODING_TSEITIN)
+    assert counter.count(store, store.num_variables) == 27
+    assert counter.cache_hits == 0
+    assert counter.count(store, store.num_variables) == 27
+    assert counter.cache_hits > 0
+
+
+test_count_models()
+test_count_random_clauses()
+test_count_formula_models()
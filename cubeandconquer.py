@@ -0,0 +1,211 @@
+"""
+Parallele Suche und Aufzaehlung von Modellen nach dem Cube-and-Conquer-Verfahren.
+
+Der Suchraum wird ueber k ausgewaehlte projizierte Variablen in 2^k Wuerfel zerlegt, je Wuerfel eine feste
+Belegung dieser Variablen. Jeder Wuerfel wird in einem Prozess des Pools als eigene Klauselmenge (die Klauseln der
+Formel und je ein Unit-Literal des Wuerfels) geloest bzw. aufgezaehlt. Da sich die Wuerfel in den projizierten
+Variablen unterscheiden, sind die Modelle verschiedener Wuerfel disjunkt und es braucht keine Blockierklauseln
+ueber Prozessgrenzen hinweg.
+
+Es werden deutlich mehr Wuerfel als Prozesse erzeugt und aus einer gemeinsamen Warteschlange verteilt: ein
+Prozess, der mit einem kleinen Wuerfel fertig ist, holt sich sofort den naechsten, statt auf Prozesse mit grossen
+Wuerfeln zu warten.
+"""
+import contextlib
+import itertools
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from aufgabe1neu import BACKEND_CDCL, ENCODING_DISTRIBUTIVE, ClauseStore, ParserStringToDIMACS
+
+# Klauselmenge eines Prozesses im Pool und Event, mit dem die Suche beendet wird, siehe _initialize_worker
+_worker_store = None
+_worker_stop = None
+
+
+def select_cube_variables(clauses, candidates, count):
+    """ Waehlt die Variablen fuer die Zerlegung nach der Anzahl ihrer Vorkommen, Vorkommen in kurzen Klauseln
+        zaehlen mehr (Jeroslow-Wang). Bevorzugt werden Variablen, die in beiden Polaritaeten oft vorkommen, da
+        beide Haelften der Zerlegung dann durch Propagation kleiner werden.
+
+        :param clauses: Iterable von Klauseln (Folgen von int)
+        :param candidates: Variablennummern, aus denen gewaehlt wird
+        :param count: Anzahl der gewuenschten Variablen
+        :return: Liste von hoechstens count Variablennummern, die wichtigste zuerst
+    """
+    candidates = list(candidates)
+    allowed = set(candidates)
+    positive = dict.fromkeys(candidates, 0.0)
+    negative = dict.fromkeys(candidates, 0.0)
+    for clause in clauses:
+        weight = 2.0 ** -len(clause)
+        for literal in clause:
+            variable = abs(literal)
+            if variable in allowed:
+                if literal > 0:
+                    positive[variable] += weight
+                else:
+                    negative[variable] += weight
+    order = {variable: position for position, variable in enumerate(candidates)}
+
+    def score(variable):
+        return (positive[variable] * negative[variable] + positive[variable] + negative[variable], -order[variable])
+
+    return sorted(candidates, key=score, reverse=True)[:max(count, 0)]
+
+
+def iter_cubes(variables):
+    """ Liefert alle 2^k Belegungen der Variablen als Wuerfel
+
+        :param variables: Liste von k Variablennummern
+        :return: Generator von Tupeln von Literalen
+    """
+    for signs in itertools.product((1, -1), repeat=len(variables)):
+        yield tuple(sign * variable for sign, variable in zip(signs, variables))
+
+
+def _cube_depth(num_candidates, max_workers, cubes_per_worker):
+    """ Anzahl der Variablen, damit mindestens cubes_per_worker Wuerfel je Prozess entstehen """
+    depth = 0
+    while (1 << depth) < max_workers * cubes_per_worker and depth < num_candidates:
+        depth += 1
+    return depth
+
+
+def _initialize_worker(literals, offsets, variable_names, stop):
+    global _worker_store, _worker_stop
+    _worker_store = ClauseStore()
+    _worker_store.literals = literals
+    _worker_store.offsets = offsets
+    _worker_store.variable_names = variable_names
+    _worker_stop = stop
+
+
+def _solve_cube(cube, projection, limit, minimize, backend):
+    """ Zaehlt die Modelle eines Wuerfels in einem Prozess des Pools auf, siehe iter_store_models. Ist die Suche
+        beendet, bricht die Aufzaehlung nach dem naechsten Modell ab.
+
+        :return: Liste von Listen von Literalen in der Reihenfolge von projection
+    """
+    store = ClauseStore()
+    store.variable_names = _worker_store.variable_names
+    store.literals = array("i", _worker_store.literals)
+    store.offsets = array("q", _worker_store.offsets)
+    for literal in cube:
+        store.add_clause([literal])
+    models = []
+    for model in ParserStringToDIMACS.iter_store_models(store, projection, limit, minimize, backend):
+        models.append(model)
+        if _worker_stop.is_set():
+            break
+    return models
+
+
+def iter_store_models_parallel(store, projection, limit=None, minimize=False, backend=BACKEND_CDCL, max_workers=None,
+                               cube_variables=None, cubes_per_worker=8):
+    """ Zaehlt die Modelle eines ClauseStore wie iter_store_models auf, verteilt auf die Wuerfel einer Zerlegung.
+        Die Modelle eines Wuerfels werden geliefert, sobald der Wuerfel fertig ist, die Reihenfolge der Wuerfel ist
+        daher nicht festgelegt.
+
+        :param store: ClauseStore
+        :param projection: Liste von Variablennummern
+        :param limit: maximale Anzahl der Modelle oder None
+        :param minimize: siehe iter_store_models
+        :param backend: BACKEND_CDCL oder BACKEND_MINISAT
+        :param max_workers: Anzahl der Prozesse, None fuer die Anzahl der CPUs
+        :param cube_variables: Variablen der Zerlegung (Teilmenge von projection) oder None fuer die Auswahl mit
+                               select_cube_variables
+        :param cubes_per_worker: Anzahl der Wuerfel je Prozess bei automatischer Auswahl
+        :return: Generator von Listen von Literalen in der Reihenfolge von projection
+    """
+    projection = list(projection)
+    max_workers = max_workers or os.cpu_count() or 1
+    if cube_variables is None:
+        depth = _cube_depth(len(projection), max_workers, cubes_per_worker)
+        cube_variables = select_cube_variables(store, projection, depth)
+    elif not set(cube_variables) <= set(projection):
+        raise ValueError("Cube variables must be projected, otherwise the models of different cubes overlap")
+    max_pending = 2 * max_workers
+    cubes = iter_cubes(list(cube_variables))
+    count = 0
+    pending = set()
+    stop = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers, initializer=_initialize_worker,
+                                   initargs=(store.literals, store.offsets, store.variable_names, stop))
+    try:
+        while True:
+            for cube in itertools.islice(cubes, max_pending - len(pending)):
+                remaining = None if limit is None else limit - count
+                pending.add(executor.submit(_solve_cube, cube, projection, remaining, minimize, backend))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for model in future.result():
+                    if limit is not None and count >= limit:
+                        return
+                    yield model
+                    count += 1
+            if limit is not None and count >= limit:
+                return
+    finally:
+        # wartende Wuerfel werden verworfen, laufende brechen nach ihrem naechsten Modell ab, statt ihre Modelle
+        # vollstaendig aufzuzaehlen, wenn der Aufrufer vorzeitig aufhoert
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_models_parallel(formula, projection=None, limit=None, minimize=False, encoding=ENCODING_DISTRIBUTIVE,
+                         backend=BACKEND_CDCL, max_workers=None, cube_variables=None, cubes_per_worker=8):
+    """ Wie ParserStringToDIMACS.iter_models, die Aufzaehlung laeuft parallel ueber iter_store_models_parallel
+
+        :param cube_variables: Namen der Variablen der Zerlegung oder None fuer die automatische Auswahl
+        :return: Generator von Dictionaries Variable -> Boolean
+    """
+    store = ParserStringToDIMACS.convert_formula_to_clauses(formula, encoding)
+    if projection is None:
+        numbers = store.original_variables()
+    else:
+        numbers = [store.variable_number(name) for name in projection]
+    if cube_variables is not None:
+        cube_variables = [store.variable_number(name) for name in cube_variables]
+    names = store.variable_names
+    for cube in iter_store_models_parallel(store, numbers, limit, minimize, backend, max_workers, cube_variables,
+                                           cubes_per_worker):
+        yield {names[abs(literal) - 1]: literal > 0 for literal in cube}
+
+
+def find_model_parallel(formula, encoding=ENCODING_DISTRIBUTIVE, backend=BACKEND_CDCL, max_workers=None,
+                        cubes_per_worker=8):
+    """ Sucht parallel ein Modell einer Formel, der erste erfuellbare Wuerfel beendet die Suche
+
+        :return: Dictionary Variable -> Boolean oder None, falls unerfuellbar
+    """
+    models = iter_models_parallel(formula, limit=1, encoding=encoding, backend=backend, max_workers=max_workers,
+                                  cubes_per_worker=cubes_per_worker)
+    with contextlib.closing(models):
+        return next(models, None)
+
+
+def get_all_models_parallel(formula, output="allmodels", backend=BACKEND_CDCL, max_workers=None,
+                            cubes_per_worker=8):
+    """ Wie ParserStringToDIMACS.get_all_models, die Modelle werden parallel aufgezaehlt. Jede Zeile der
+        Ausgabe enthaelt ein Modell als Literale im DIMACS Format mit abschliessender 0.
+
+        :param output: Pfad der Ausgabedatei oder Datei-Objekt im Textmodus
+        :return: Anzahl der Modelle
+    """
+    store = ParserStringToDIMACS.convert_formula_to_clauses(formula)
+    if isinstance(output, (str, bytes, os.PathLike)):
+        allmodels = open(output, "w+")
+    else:
+        allmodels = contextlib.nullcontext(output)
+    count = 0
+    with allmodels as file:
+        for model in iter_store_models_parallel(store, store.original_variables(), backend=backend,
+                                                max_workers=max_workers, cubes_per_worker=cubes_per_worker):
+            file.write(" ".join(map(str, model)) + " 0\n")
+            count += 1
+    return count
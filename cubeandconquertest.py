@@ -0,0 +1,84 @@
+import io
+import multiprocessing
+import os
+import tempfile
+
+from aufgabe1neu import BACKEND_CDCL, ENCODING_TSEITIN, ParserStringToDIMACS
+from benchmark import parity_chain, pigeonhole
+from cubeandconquer import (
+    _initialize_worker, _solve_cube, find_model_parallel, get_all_models_parallel, iter_cubes, iter_models_parallel,
+    select_cube_variables,
+)
+from evaluator import compile_formula
+
+
+def as_set(models):
+    return {tuple(sorted(model.items())) for model in models}
+
+
+def test_select_cube_variables():
+    clauses = [[1, 2], [-1, 3], [-1, -2, 4]]
+    # 1 kommt in beiden Polaritaeten vor, 3 und 4 nur in einer
+    assert select_cube_variables(clauses, [4, 3, 2, 1], 2) == [1, 2]
+    assert select_cube_variables(clauses, [3, 4], 5) == [3, 4]
+    assert select_cube_variables(clauses, [1, 2], 0) == []
+    assert list(iter_cubes([3, 1])) == [(3, 1), (3, -1), (-3, 1), (-3, -1)]
+    assert list(iter_cubes([])) == [()]
+
+
+def test_iter_models_parallel():
+    formula = "Or(And(a,b),And(Not(c),d),BiImpl(a,e))"
+    sequential = as_set(ParserStringToDIMACS.iter_models(formula))
+    models = list(iter_models_parallel(formula, max_workers=2))
+    # die Modelle verschiedener Wuerfel ueberschneiden sich nicht
+    assert len(models) == len(sequential) and as_set(models) == sequential
+    # b faellt durch Absorption aus der KNF weg und bleibt frei
+    assert as_set(iter_models_parallel("Or(a,And(a,b))", max_workers=2)) == \
+        {(("a", True), ("b", False)), (("a", True), ("b", True))}
+    models = list(iter_models_parallel(formula, projection=["a", "b"], max_workers=2, cube_variables=["b"]))
+    assert as_set(models) == as_set(ParserStringToDIMACS.iter_models(formula, projection=["a", "b"]))
+    assert len(list(iter_models_parallel(formula, limit=3, max_workers=2))) == 3
+    cubes = list(iter_models_parallel(formula, minimize=True, max_workers=2))
+    assert sum(2 ** (5 - len(cube)) for cube in cubes) == len(sequential)
+    models = list(iter_models_parallel(parity_chain(6), encoding=ENCODING_TSEITIN, max_workers=2))
+    assert len(models) == 32 and all(len(model) == 6 for model in models)
+    try:
+        list(iter_models_parallel(formula, projection=["a"], cube_variables=["b"], max_workers=1))
+    except ValueError:
+        pass
+    else:
+        assert False
+
+
+def test_find_and_get_all_models_parallel():
+    model = find_model_parallel(pigeonhole(4, 4), max_workers=2)
+    assert model is not None and compile_formula(pigeonhole(4, 4)).evaluate_model(model)
+    assert find_model_parallel(pigeonhole(4), encoding=ENCODING_TSEITIN, max_workers=2) is None
+    output = io.StringIO()
+    assert get_all_models_parallel("Or(a,b)", output, max_workers=2) == 3
+    assert sorted(output.getvalue().splitlines()) == ["-1 2 0", "1 -2 0", "1 2 0"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "allmodels")
+        assert get_all_models_parallel("And(a,Or(b,c))", path, max_workers=2) == 3
+        with open(path) as file:
+            assert len(file.read().splitlines()) == 3
+
+
+def test_running_cubes_stop_early():
+    store = ParserStringToDIMACS.convert_formula_to_clauses("Or(a,b,c)")
+    stop = multiprocessing.Event()
+    _initialize_worker(store.literals, store.offsets, store.variable_names, stop)
+    assert len(_solve_cube((), [1, 2, 3], None, False, BACKEND_CDCL)) == 7
+    # nach dem Ende der Suche liefert ein laufender Wuerfel nur noch sein naechstes Modell
+    stop.set()
+    assert len(_solve_cube((), [1, 2, 3], None, False, BACKEND_CDCL)) == 1
+    # ein vorzeitig geschlossener Generator gibt den Pool frei
+    models = iter_models_parallel("Or(a,b,c,d,e,f)", max_workers=2)
+    assert next(models) is not None
+    models.close()
+
+
+test_select_cube_variables()
+test_iter_models_parallel()
+test_find_and_get_all_models_parallel()
+test_running_cubes_stop_early()
@@ -0,0 +1,188 @@
+"""
+Uebersetzt einen Term in Python-Funktionen, die Belegungen schnell pruefen, z.B. um Modelle eines Solvers zu
+kontrollieren oder viele Stichproben zu filtern.
+
+Der Quelltext wird einmal erzeugt und mit compile/exec uebersetzt. Jeder zusammengesetzte Teilterm wird genau einmal
+berechnet und an eine lokale Variable gebunden; da Terme ueber Hash-Consing geteilt werden, werden gemeinsame
+Teilausdruecke dabei nur einmal ausgewertet. Der erzeugte Code ist gerade, ohne Verschachtelung, daher gibt es auch
+fuer sehr tiefe Terme keine Grenze durch die Schachtelungstiefe des Python-Parsers.
+"""
+import functools
+import operator
+
+from aufgabe1neu import OP_AND, OP_BIIMPL, OP_BOT, OP_IMPL, OP_NOT, OP_OR, OP_TOP, OP_VARIABLE, ParserStringToDIMACS
+
+# Ausdruecke je Operator: fuer einzelne Wahrheitswerte und bitweise fuer Spalten (z.B. numpy-Arrays mit dtype bool)
+_SCALAR = {
+    OP_NOT: lambda names: "not " + names[0],
+    OP_AND: lambda names: " and ".join(names),
+    OP_OR: lambda names: " or ".join(names),
+    OP_IMPL: lambda names: "not " + names[0] + " or " + names[1],
+    OP_BIIMPL: lambda names: "(not " + names[0] + ") == (not " + names[1] + ")",
+}
+
+_BITWISE = {
+    OP_NOT: lambda names: "~" + names[0],
+    OP_AND: lambda names: " & ".join(names),
+    OP_OR: lambda names: " | ".join(names),
+    OP_IMPL: lambda names: "~" + names[0] + " | " + names[1],
+    OP_BIIMPL: lambda names: "~(" + names[0] + " ^ " + names[1] + ")",
+}
+
+
+def _statements(term, position, expressions, constants):
+    """ Erzeugt die Zuweisungen fuer alle zusammengesetzten Teilterme, Kinder vor ihren Eltern
+
+        :param position: Dictionary Variablenname -> Index
+        :param expressions: _SCALAR oder _BITWISE
+        :param constants: Paar (Name fuer TOP, Name fuer BOT)
+        :return: Paar (Liste von Zeilen, Name des Ergebnisses)
+    """
+    names = {}
+    lines = []
+    stack = [(term, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if current in names:
+            continue
+        code = current.code
+        if code == OP_VARIABLE:
+            index = position.get(current.operator)
+            if index is None:
+                raise ValueError("Variable " + current.operator + " is not in the list of variables")
+            names[current] = "v%d" % index
+        elif code == OP_TOP:
+            names[current] = constants[0]
+        elif code == OP_BOT:
+            names[current] = constants[1]
+        elif not expanded:
+            stack.append((current, True))
+            stack.extend((parameter, False) for parameter in reversed(current.parameters))
+        else:
+            name = "t%d" % len(lines)
+            lines.append(name + " = " + expressions[code]([names[parameter] for parameter in current.parameters]))
+            names[current] = name
+    return lines, names[term]
+
+
+def _unpack(count, source):
+    if count == 0:
+        return []
+    return ["".join("v%d, " % index for index in range(count)) + "= " + source]
+
+
+class CompiledFormula:
+    """
+    Aus einem Term erzeugte Auswertungsfunktionen. Eine Belegung ist eine Folge von Wahrheitswerten in der
+    Reihenfolge von variables (auch 0 und 1), ein Modell ein Dictionary Variable -> Boolean.
+
+    Attribute: variables: Namen der Variablen in der Reihenfolge der Belegungen
+               source: erzeugter Quelltext
+    """
+    def __init__(self, term, variables=None):
+        """
+            :param term: Objekt der Klasse Term
+            :param variables: Namen der Variablen, None fuer die Variablen des Terms in der Reihenfolge ihres ersten
+                              Auftretens
+        """
+        self.variables = ParserStringToDIMACS.variables_of(term) if variables is None else list(variables)
+        position = {name: index for index, name in enumerate(self.variables)}
+        count = len(self.variables)
+        scalar, result = _statements(term, position, _SCALAR, ("True", "False"))
+        bitwise, column_result = _statements(term, position, _BITWISE, ("ones", "zeros"))
+        lines = ["def evaluate(values):"]
+        lines.extend("    " + line for line in _unpack(count, "values") + scalar)
+        lines.append("    return bool(" + result + ")")
+        lines.append("def evaluate_batch(assignments):")
+        lines.append("    results = []")
+        lines.append("    append = results.append")
+        lines.append("    for values in assignments:")
+        lines.extend("        " + line for line in _unpack(count, "values") + scalar)
+        lines.append("        append(bool(" + result + "))")
+        lines.append("    return results")
+        lines.append("def evaluate_columns(columns, ones, zeros):")
+        lines.extend("    " + line for line in _unpack(count, "columns") + bitwise)
+        lines.append("    return " + column_result + " & ones")
+        self.source = "\n".join(lines) + "\n"
+        namespace = {}
+        exec(compile(self.source, "<compiled formula>", "exec"), namespace)
+        self._evaluate = namespace["evaluate"]
+        self._evaluate_batch = namespace["evaluate_batch"]
+        self._evaluate_columns = namespace["evaluate_columns"]
+        if count == 0:
+            self._values_of = lambda model: ()
+        elif count == 1:
+            name = self.variables[0]
+            self._values_of = lambda model: (model[name],)
+        else:
+            self._values_of = operator.itemgetter(*self.variables)
+
+    def __call__(self, values):
+        """ Wertet die Formel fuer eine Belegung aus
+
+            :param values: Folge von Wahrheitswerten in der Reihenfolge von variables
+            :return: Boolean
+        """
+        return self._evaluate(values)
+
+    def evaluate_model(self, model):
+        """ Wertet die Formel fuer ein Modell aus
+
+            :param model: Dictionary Variable -> Boolean, das alle Variablen enthaelt
+            :return: Boolean
+        """
+        return self._evaluate(self._values_of(model))
+
+    def evaluate_batch(self, assignments):
+        """ Wertet die Formel fuer viele Belegungen in einem Aufruf aus, die Schleife laeuft im erzeugten Code
+
+            :param assignments: Iterable von Folgen von Wahrheitswerten
+            :return: Liste von Booleans
+        """
+        return self._evaluate_batch(assignments)
+
+    def evaluate_models(self, models):
+        """ Wie evaluate_batch fuer Modelle als Dictionaries
+
+            :param models: Iterable von Dictionaries Variable -> Boolean
+            :return: Liste von Booleans
+        """
+        return self._evaluate_batch(map(self._values_of, models))
+
+    def evaluate_array(self, assignments):
+        """ Wertet die Formel bitweise fuer eine Matrix von Belegungen aus, eine Zeile je Belegung und eine Spalte
+            je Variable, z.B. ein numpy-Array mit dtype bool
+
+            :param assignments: zweidimensionales numpy-Array
+            :return: eindimensionales numpy-Array mit dtype bool
+        """
+        import numpy
+        assignments = numpy.asarray(assignments, dtype=bool)
+        if assignments.ndim != 2 or assignments.shape[1] != len(self.variables):
+            raise ValueError("Expected an array with one column per variable")
+        ones = numpy.ones(assignments.shape[0], dtype=bool)
+        zeros = numpy.zeros(assignments.shape[0], dtype=bool)
+        return self._evaluate_columns(list(assignments.T), ones, zeros)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_cached(formula, variables):
+    if isinstance(formula, str):
+        formula = ParserStringToDIMACS.build_term_from_string(formula)
+    return CompiledFormula(formula, variables)
+
+
+def compile_formula(formula, variables=None):
+    """ Liefert die CompiledFormula einer Formel. Die letzten 256 uebersetzten Formeln werden zwischengespeichert,
+        wiederholte Aufrufe mit derselben Formel und Variablenliste uebersetzen also nicht erneut.
+
+        :param formula: String oder Objekt der Klasse Term
+        :param variables: Namen der Variablen oder None, siehe CompiledFormula
+        :return: CompiledFormula
+    """
+    return _compile_cached(formula, None if variables is None else tuple(variables))
+
+
+def clear_cache():
+    """ Leert den Cache von compile_formula """
+    _compile_cached.cache_clear()
@@ -0,0 +1,81 @@
+import importlib.util
+import itertools
+import random
+
+import pytest
+
+from aufgabe1neu import ParserStringToDIMACS
+from benchmark import parity_chain
+from evaluator import CompiledFormula, clear_cache, compile_formula
+from oracles import formula_models, random_formula
+
+
+def test_variables_of():
+    y = ParserStringToDIMACS()
+    assert y.variables_of(y.build_term_from_string("Or(b,And(a,b),c)")) == ["b", "a", "c"]
+    assert y.variables_of(y.build_term_from_string("TOP")) == []
+
+
+def test_compiled_formula():
+    term = ParserStringToDIMACS.build_term_from_string("And(Impl(a,b),BiImpl(Or(a,c),Not(b)),Or(a,c))")
+    compiled = CompiledFormula(term)
+    assert compiled.variables == ["a", "b", "c"]
+    # Or(a,c) kommt zweimal vor und wird nur einmal berechnet
+    assert compiled.source.split("def evaluate_batch")[0].count("v0 or v2") == 1
+    assignments = list(itertools.product((False, True), repeat=3))
+    expected = [False, True, False, False, False, False, False, False]
+    assert [compiled(values) for values in assignments] == expected
+    assert compiled.evaluate_batch(assignments) == expected
+    assert compiled.evaluate_batch(itertools.product((0, 1), repeat=3)) == expected
+    models = [dict(zip("abc", values)) for values in assignments]
+    assert [compiled.evaluate_model(model) for model in models] == expected
+    assert compiled.evaluate_models(models) == expected
+    assert compile_formula("TOP")(()) and compile_formula("BOT").evaluate_batch([(), ()]) == [False, False]
+    assert compile_formula("Not(x)").evaluate_models([{"x": False}, {"x": True}]) == [True, False]
+    assert compile_formula("Or(a,b)", ["b", "c", "a"])((False, True, True))
+
+
+def test_compiled_formula_against_models():
+    generator = random.Random(6)
+    names = ["a", "b", "c", "d"]
+    assignments = list(itertools.product((False, True), repeat=len(names)))
+    for _ in range(40):
+        formula = random_formula(generator, 5, names)
+        compiled = compile_formula(formula, names)
+        expected = formula_models(formula, names)
+        assert compiled.evaluate_batch(assignments) == [values in expected for values in assignments]
+
+
+def test_evaluate_array():
+    # nur evaluate_array braucht numpy
+    numpy = pytest.importorskip("numpy")
+    compiled = compile_formula("And(Impl(a,b),BiImpl(Or(a,c),Not(b)),Or(a,c))")
+    assignments = list(itertools.product((False, True), repeat=3))
+    expected = [False, True, False, False, False, False, False, False]
+    assert compiled.evaluate_array(numpy.array(assignments)).tolist() == expected
+    assert compile_formula("TOP").evaluate_array(numpy.zeros((2, 0))).tolist() == [True, True]
+    generator = random.Random(6)
+    names = ["a", "b", "c", "d"]
+    assignments = list(itertools.product((False, True), repeat=len(names)))
+    for _ in range(40):
+        formula = random_formula(generator, 5, names)
+        expected = formula_models(formula, names)
+        results = compile_formula(formula, names).evaluate_array(numpy.array(assignments)).tolist()
+        assert results == [values in expected for values in assignments]
+
+
+def test_compile_cache_and_deep_formulas():
+    clear_cache()
+    assert compile_formula("Or(a,b)") is compile_formula("Or(a,b)")
+    assert compile_formula("Or(a,b)") is not compile_formula("Or(a,b)", ["b", "a"])
+    formula = parity_chain(20000)
+    compiled = compile_formula(formula)
+    assert compiled((True,) * 20000) and not compiled((False,) + (True,) * 19999)
+
+
+test_variables_of()
+test_compiled_formula()
+test_compiled_formula_against_models()
+test_compile_cache_and_deep_formulas()
+if importlib.util.find_spec("numpy") is not None:
+    test_evaluate_array()
@@ -0,0 +1,87 @@
+"""
+Hilfsfunktionen fuer die Tests: ein Generator fuer zufaellige Formeln und Orakel, die die Modelle einer Formel oder
+einer Klauselmenge durch Ausprobieren aller Belegungen bestimmen.
+"""
+import itertools
+
+from aufgabe1neu import ParserStringToDIMACS
+
+
+def random_formula(generator, depth, names=("a", "b", "c", "d")):
+    """ Erzeugt eine zufaellige Formel im Stringformat, selten auch mit TOP und BOT
+
+        :param generator: random.Random
+        :param depth: maximale Schachtelungstiefe
+        :param names: Namen der Variablen
+        :return: String
+    """
+    names = tuple(names)
+    if depth == 0 or generator.random() < 0.2:
+        return generator.choice(names + ("TOP", "BOT") if generator.random() < 0.1 else names)
+    operator = generator.choice(("Or", "And", "Not", "Impl", "BiImpl"))
+    if operator == "Not":
+        return "Not(%s)" % random_formula(generator, depth - 1, names)
+    return "%s(%s,%s)" % (operator, random_formula(generator, depth - 1, names),
+                          random_formula(generator, depth - 1, names))
+
+
+def evaluate(term, assignment):
+    """ Wertet einen Term unter einer Belegung aus
+
+        :param term: Objekt der Klasse Term
+        :param assignment: Dictionary Variable -> Boolean
+        :return: Boolean
+    """
+    if term.operator == "TOP":
+        return True
+    if term.operator == "BOT":
+        return False
+    if not term.parameters:
+        return assignment[term.operator]
+    values = [evaluate(parameter, assignment) for parameter in term.parameters]
+    if term.operator == "Not":
+        return not values[0]
+    if term.operator == "And":
+        return all(values)
+    if term.operator == "Or":
+        return any(values)
+    if term.operator == "Impl":
+        return not values[0] or values[1]
+    return values[0] == values[1]
+
+
+def formula_models(formula, names):
+    """ Modelle einer Formel ueber den Variablen names
+
+        :param formula: String oder Objekt der Klasse Term
+        :param names: Namen der Variablen, muss alle Variablen der Formel enthalten
+        :return: Menge von Tupeln von Booleans in der Reihenfolge von names
+    """
+    if isinstance(formula, str):
+        formula = ParserStringToDIMACS.build_term_from_string(formula)
+    return {
+        values for values in itertools.product((False, True), repeat=len(names))
+        if evaluate(formula, dict(zip(names, values)))
+    }
+
+
+def satisfies(model, clauses):
+    """ Prueft, ob ein Modell als Liste von Literalen (Literal i an Stelle i - 1) alle Klauseln erfuellt """
+    return all(any(model[abs(literal) - 1] == literal for literal in clause) for clause in clauses)
+
+
+def clause_models(num_variables, clauses, projection):
+    """ Modelle einer Klauselmenge, eingeschraenkt auf die Variablen der Projektion
+
+        :param num_variables: Anzahl der Variablen
+        :param clauses: Iterable von Klauseln als Listen ganzzahliger Literale
+        :param projection: Nummern der Variablen
+        :return: Menge von Tupeln der Literale der Projektion
+    """
+    clauses = list(clauses)
+    models = set()
+    for bits in itertools.product((False, True), repeat=num_variables):
+        model = [variable if bit else -variable for variable, bit in enumerate(bits, 1)]
+        if satisfies(model, clauses):
+            models.add(tuple(model[variable - 1] for variable in projection))
+    return models
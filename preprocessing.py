@@ -0,0 +1,280 @@
+import heapq
+
+
+class Preprocessor:
+    """
+    Vereinfacht eine Klauselmenge im DIMACS Format (Variable n als Literal n, Not(Variable n) als -n), bevor sie
+    ausgegeben oder an einen SAT-Solver uebergeben wird: Unit Propagation, Elimination reiner Literale,
+    Subsumption ueber Vorkommenslisten und beschraenkte Variablenelimination (BVE).
+
+    Die vereinfachte Klauselmenge ist erfuellbarkeitsaequivalent zur urspruenglichen. Entfernte Klauseln werden
+    auf einem Rekonstruktionsstapel abgelegt, mit extend_model wird ein Modell der vereinfachten Klauselmenge zu
+    einem Modell der urspruenglichen erweitert. Eingefrorene Variablen (z.B. die Variablen einer Projektion)
+    werden weder eliminiert noch als rein behandelt, ihre Modelle bleiben daher erhalten: die Projektion der
+    Modelle auf die eingefrorenen Variablen ist vor und nach der Vereinfachung gleich.
+
+    Attribute: unsatisfiable: True, sobald die leere Klausel abgeleitet wurde
+               fixed_variables, pure_literals, eliminated_variables, subsumed_clauses: Zaehler fuer Statistiken
+    """
+    def __init__(self, clauses=(), num_variables=0, frozen=(), max_resolvent_length=16, max_occurrences=16):
+        self.unsatisfiable = False
+        self.fixed_variables = 0
+        self.pure_literals = 0
+        self.eliminated_variables = 0
+        self.subsumed_clauses = 0
+        self._max_resolvent_length = max_resolvent_length
+        self._max_occurrences = max_occurrences
+        self._num_variables = num_variables
+        self._frozen = set(frozen)
+        # Klauseln als Listen von Literalen, entfernte Klauseln sind None
+        self._clauses = []
+        # Literal -> Menge der Indizes der Klauseln, die das Literal enthalten
+        self._occurrences = {}
+        # Variable -> belegtes Literal
+        self._values = {}
+        self._units = []
+        self._eliminated = set()
+        # Paare (Zeugenliteral, Klausel) in der Reihenfolge der Entfernung
+        self._reconstruction = []
+        for clause in clauses:
+            self.add_clause(clause)
+
+    @property
+    def num_variables(self):
+        return self._num_variables
+
+    def freeze(self, variable):
+        """ Schuetzt eine Variable vor Elimination und Elimination als reines Literal
+
+            :param variable: int
+        """
+        self._frozen.add(variable)
+
+    def add_clause(self, clause):
+        """ Fuegt eine Klausel hinzu, doppelte Literale werden entfernt, Tautologien verworfen
+
+            :param clause: Iterable von int
+        """
+        literals = []
+        for literal in clause:
+            if -literal in literals:
+                return
+            if literal not in literals:
+                literals.append(literal)
+                self._num_variables = max(self._num_variables, abs(literal))
+        self._add(literals)
+
+    def _add(self, literals):
+        if not literals:
+            self.unsatisfiable = True
+            return None
+        index = len(self._clauses)
+        self._clauses.append(literals)
+        for literal in literals:
+            self._occurrences.setdefault(literal, set()).add(index)
+        if len(literals) == 1:
+            self._units.append(literals[0])
+        return index
+
+    def _remove(self, index):
+        for literal in self._clauses[index]:
+            self._occurrences[literal].discard(index)
+        self._clauses[index] = None
+
+    def _occurrence(self, literal):
+        return self._occurrences.get(literal, ())
+
+    def run(self):
+        """ Wendet die Vereinfachungen an, bis sich nichts mehr aendert
+
+            :return: False, falls die Klauselmenge unerfuellbar ist, sonst True
+        """
+        steps = (self._propagate, self._subsume_all, self._eliminate_pure_literals, self._eliminate_variables)
+        changed = True
+        while changed and not self.unsatisfiable:
+            changed = False
+            for step in steps:
+                if self.unsatisfiable:
+                    break
+                changed = step() or changed
+        return not self.unsatisfiable
+
+    def _propagate(self):
+        """ Unit Propagation: Klauseln mit einem wahren Literal entfallen, falsche Literale werden entfernt """
+        changed = False
+        while self._units and not self.unsatisfiable:
+            literal = self._units.pop()
+            variable = abs(literal)
+            value = self._values.get(variable)
+            if value == literal:
+                continue
+            if value is not None:
+                self.unsatisfiable = True
+                return True
+            changed = True
+            self._values[variable] = literal
+            self.fixed_variables += 1
+            self._reconstruction.append((literal, [literal]))
+            for index in list(self._occurrence(literal)):
+                self._remove(index)
+            for index in list(self._occurrence(-literal)):
+                clause = self._clauses[index]
+                clause.remove(-literal)
+                self._occurrences[-literal].discard(index)
+                if not clause:
+                    self.unsatisfiable = True
+                    return True
+                if len(clause) == 1:
+                    self._units.append(clause[0])
+        return changed
+
+    def _subsumes(self, clause, index):
+        other = self._clauses[index]
+        return len(clause) <= len(other) and all(literal in other for literal in clause)
+
+    def _backward_subsume(self, index):
+        """ Entfernt alle Klauseln, die von der Klausel mit dem gegebenen Index subsumiert werden. Kandidaten sind
+            die Klauseln im kuerzesten Vorkommen eines ihrer Literale.
+        """
+        clause = self._clauses[index]
+        literal = min(clause, key=lambda literal: len(self._occurrence(literal)))
+        removed = False
+        for other in list(self._occurrence(literal)):
+            if other != index and self._subsumes(clause, other):
+                self._remove(other)
+                self.subsumed_clauses += 1
+                removed = True
+        return removed
+
+    def _forward_subsumed(self, clause):
+        """ Prueft, ob eine neue Klausel von einer vorhandenen Klausel subsumiert wird """
+        for literal in clause:
+            for index in self._occurrence(literal):
+                other = self._clauses[index]
+                if len(other) <= len(clause) and all(other_literal in clause for other_literal in other):
+                    return True
+        return False
+
+    def _subsume_all(self):
+        """ Subsumption fuer alle Klauseln, kurze Klauseln zuerst """
+        order = sorted((len(clause), index) for index, clause in enumerate(self._clauses) if clause is not None)
+        changed = False
+        for _, index in order:
+            if self._clauses[index] is not None:
+                changed = self._backward_subsume(index) or changed
+        return changed
+
+    def _candidate(self, variable):
+        return variable not in self._frozen and variable not in self._values and variable not in self._eliminated
+
+    def _eliminate_pure_literals(self):
+        """ Entfernt die Klauseln einer Variablen, die nur in einer Polaritaet vorkommt """
+        changed = False
+        for variable in range(1, self._num_variables + 1):
+            if not self._candidate(variable):
+                continue
+            positive = self._occurrence(variable)
+            negative = self._occurrence(-variable)
+            if bool(positive) == bool(negative):
+                continue
+            literal = variable if positive else -variable
+            for index in list(self._occurrence(literal)):
+                self._reconstruction.append((literal, self._clauses[index]))
+                self._remove(index)
+            self._eliminated.add(variable)
+            self.pure_literals += 1
+            changed = True
+        return changed
+
+    def _resolvents(self, variable):
+        """ Liefert die nicht tautologischen Resolventen ueber eine Variable oder None, falls die Elimination die
+            Anzahl der Klauseln erhoehen wuerde oder eine Resolvente zu lang wird
+        """
+        positive = [self._clauses[index] for index in self._occurrence(variable)]
+        negative = [self._clauses[index] for index in self._occurrence(-variable)]
+        limit = len(positive) + len(negative)
+        resolvents = []
+        for clause in positive:
+            for other in negative:
+                resolvent = [literal for literal in clause if literal != variable]
+                for literal in other:
+                    if literal == -variable or literal in resolvent:
+                        continue
+                    if -literal in resolvent:
+                        break
+                    resolvent.append(literal)
+                else:
+                    if len(resolvent) > self._max_resolvent_length or len(resolvents) == limit:
+                        return None
+                    resolvents.append(resolvent)
+        return resolvents
+
+    def _eliminate_variables(self):
+        """ Beschraenkte Variablenelimination: eine Variable wird durch alle Resolventen ihrer Klauseln ersetzt,
+            wenn dabei nicht mehr Klauseln entstehen als entfallen. Variablen mit wenigen Vorkommen zuerst.
+        """
+        heap = []
+        for variable in range(1, self._num_variables + 1):
+            if self._candidate(variable):
+                cost = len(self._occurrence(variable)) * len(self._occurrence(-variable))
+                heapq.heappush(heap, (cost, variable))
+        changed = False
+        while heap and not self.unsatisfiable:
+            _, variable = heapq.heappop(heap)
+            if not self._candidate(variable):
+                continue
+            positive = self._occurrence(variable)
+            negative = self._occurrence(-variable)
+            if not positive and not negative:
+                continue
+            if len(positive) + len(negative) > self._max_occurrences:
+                continue
+            resolvents = self._resolvents(variable)
+            if resolvents is None:
+                continue
+            for literal in (variable, -variable):
+                for index in list(self._occurrence(literal)):
+                    self._reconstruction.append((literal, self._clauses[index]))
+                    self._remove(index)
+            self._eliminated.add(variable)
+            self.eliminated_variables += 1
+            changed = True
+            for resolvent in resolvents:
+                if not self._forward_subsumed(resolvent):
+                    index = self._add(resolvent)
+                    if index is not None:
+                        self._backward_subsume(index)
+            if self._units:
+                self._propagate()
+        return changed
+
+    def clauses(self):
+        """ Liefert die vereinfachten Klauseln. Belegte eingefrorene Variablen bleiben als Einheitsklauseln
+            erhalten, eine unerfuellbare Klauselmenge ergibt die leere Klausel.
+
+            :return: Generator von Listen von int
+        """
+        if self.unsatisfiable:
+            yield []
+            return
+        for variable, literal in self._values.items():
+            if variable in self._frozen:
+                yield [literal]
+        for clause in self._clauses:
+            if clause is not None:
+                yield list(clause)
+
+    def extend_model(self, model):
+        """ Erweitert ein Modell der vereinfachten Klauselmenge zu einem Modell der urspruenglichen: der
+            Rekonstruktionsstapel wird rueckwaerts durchlaufen, ist eine entfernte Klausel nicht erfuellt,
+            wird ihr Zeugenliteral wahr gesetzt.
+
+            :param model: Liste der Literale der Variablen 1 bis n, wie CDCLSolver.model
+            :return: Liste der Literale aller Variablen
+        """
+        model = list(model)
+        model.extend(-variable for variable in range(len(model) + 1, self._num_variables + 1))
+        for witness, clause in reversed(self._reconstruction):
+            if not any(model[abs(literal) - 1] == literal for literal in clause):
+                model[abs(witness) - 1] = witness
+        return model
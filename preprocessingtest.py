@@ -0,0 +1,73 @@
+import random
+
+from aufgabe1neu import ENCODING_TSEITIN, ParserStringToDIMACS
+from oracles import clause_models, satisfies
+from preprocessing import Preprocessor
+from solver import CDCLSolver
+
+
+def test_unit_propagation_and_pure_literals():
+    preprocessor = Preprocessor([[1], [-1, 2], [-2, 3, 4], [-3, 4], [5, -4, 6]])
+    assert preprocessor.run()
+    assert list(preprocessor.clauses()) == []
+    assert preprocessor.fixed_variables == 2
+    model = preprocessor.extend_model([])
+    assert satisfies(model, [[1], [-1, 2], [-2, 3, 4], [-3, 4], [5, -4, 6]])
+    # eingefrorene Variablen bleiben als Einheitsklauseln erhalten und werden nicht als rein eliminiert
+    preprocessor = Preprocessor([[1], [-1, 2], [2, 3]], frozen=[2, 3])
+    assert preprocessor.run()
+    assert list(preprocessor.clauses()) == [[2]]
+    preprocessor = Preprocessor([[1, 2], [1, -2], [-1, 3], [-1, -3]])
+    assert not preprocessor.run()
+    assert list(preprocessor.clauses()) == [[]]
+
+
+def test_subsumption():
+    preprocessor = Preprocessor([[1, 2, 3], [1, 2], [-1, 2, 4, 3], [2, 3, -1]], frozen=[1, 2, 3, 4])
+    assert preprocessor.run()
+    assert sorted(map(sorted, preprocessor.clauses())) == [[-1, 2, 3], [1, 2]]
+    assert preprocessor.subsumed_clauses == 2
+
+
+def test_random_formulas():
+    generator = random.Random(3)
+    for _ in range(300):
+        num_variables = generator.randint(1, 8)
+        clauses = [
+            [generator.choice((-1, 1)) * generator.randint(1, num_variables) for _ in range(generator.randint(1, 3))]
+            for _ in range(generator.randint(1, 30))
+        ]
+        frozen = [variable for variable in range(1, num_variables + 1) if generator.random() < 0.3]
+        preprocessor = Preprocessor(clauses, num_variables, frozen)
+        reduced = list(preprocessor.clauses()) if preprocessor.run() else [[]]
+        solver = CDCLSolver(reduced, num_variables)
+        assert solver.solve() == CDCLSolver(clauses, num_variables).solve(), clauses
+        if solver.model is not None:
+            assert satisfies(preprocessor.extend_model(solver.model), clauses), clauses
+        # die Modelle eingeschraenkt auf die eingefrorenen Variablen bleiben erhalten
+        assert clause_models(num_variables, reduced, frozen) == clause_models(num_variables, clauses, frozen)
+
+
+def test_preprocess_formulas():
+    y = ParserStringToDIMACS()
+    # die distributive Kodierung erzeugt viele subsumierte Klauseln
+    formula = "Or(And(a,b),And(a,c),And(Not(d),a))"
+    assert y.convert_formula_to_dimacs(formula, False).startswith("p cnf 4 8\n")
+    assert y.convert_formula_to_dimacs(formula, False, preprocess=True) == "p cnf 4 2\n1 0\n2 3 -4 0"
+    # die Hilfsvariablen der Tseitin-Kodierung werden eliminiert, die Nummerierung bleibt erhalten
+    formula = "Impl(And(a,Or(b,Not(c))),BiImpl(c,a))"
+    dimacs = y.convert_formula_to_dimacs(formula, False, ENCODING_TSEITIN, preprocess=True)
+    assert dimacs == "p cnf 7 1\nc ind 1 2 3 0\n3 -1 0"
+    for encoding in ("distributive", ENCODING_TSEITIN):
+        models = sorted(sorted(model.items()) for model in y.iter_models(formula, encoding=encoding))
+        assert len(models) == 6
+        assert models == sorted(
+            sorted(model.items()) for model in y.iter_models(formula, encoding=encoding, preprocess=True))
+        models = list(y.iter_models(formula, projection=["b", "c"], encoding=encoding, preprocess=True))
+        assert len(models) == 4
+
+
+test_unit_propagation_and_pure_literals()
+test_subsumption()
+test_random_formulas()
+test_preprocess_formulas()
@@ -0,0 +1,242 @@
+"""
+Binaerformat fuer Term-DAGs und Klauselmengen, damit umgewandelte Formeln nicht bei jedem Lauf neu eingelesen werden
+muessen.
+
+Aufbau einer Datei (little-endian, alle Abschnitte auf 8 Byte ausgerichtet):
+
+    Kopf:   Magic b"PSTD", Version (uint16), Art (uint16, KIND_TERMS oder KIND_CLAUSES), 8 Byte frei,
+            danach fuenf Anzahlen (uint64), deren Bedeutung von der Art abhaengt
+    Namen:  Laengen der Namen in Byte (int32, -1 fuer Hilfsvariablen ohne Namen), danach die UTF-8 Bytes
+
+    KIND_TERMS, Anzahlen: Namen, Bytes der Namen, Knoten, Kindverweise, Wurzeln
+            Operatorkennung je Knoten (int32, siehe Term.code), Namensindex je Knoten (int32, -1 fuer Operatoren),
+            Beginn der Kinder je Knoten (int64, Knoten + 1 Eintraege), Kinder als Knotenindizes (int32),
+            Wurzeln als Knotenindizes (int32). Kinder stehen in der Knotentabelle vor ihren Eltern, gemeinsame
+            Teilterme nur einmal.
+
+    KIND_CLAUSES, Anzahlen: Variablen, Bytes der Namen, Klauseln, Literale, 0
+            Beginn der Klauseln (int64, Klauseln + 1 Eintraege), Literale (int32), wie ClauseStore.offsets und
+            ClauseStore.literals
+
+Beim Laden aus einem mmap oder memoryview werden die Literale einer Klauselmenge nicht kopiert, der ClauseStore
+verweist direkt auf den Puffer und ist daher nur lesbar. Mehrere Prozesse koennen so dieselbe Datei gemeinsam nutzen.
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+from aufgabe1neu import OP_AND, OP_BIIMPL, OP_BOT, OP_IMPL, OP_NOT, OP_OR, OP_TOP, OP_VARIABLE, ClauseStore, Term
+
+MAGIC = b"PSTD"
+FORMAT_VERSION = 1
+
+KIND_TERMS = 1
+KIND_CLAUSES = 2
+
+_HEADER = struct.Struct("<4sHH8x5Q")
+
+_OPERATORS = {
+    OP_TOP: "TOP",
+    OP_BOT: "BOT",
+    OP_NOT: "Not",
+    OP_AND: "And",
+    OP_OR: "Or",
+    OP_IMPL: "Impl",
+    OP_BIIMPL: "BiImpl",
+}
+
+
+def _padding(length):
+    return b"\0" * (-length % 8)
+
+
+def _write_array(file, values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    data = values.tobytes()
+    file.write(data)
+    file.write(_padding(len(data)))
+
+
+def _write_names(file, names):
+    encoded = [None if name is None else name.encode("utf-8") for name in names]
+    _write_array(file, array("i", (-1 if data is None else len(data) for data in encoded)))
+    blob = b"".join(data for data in encoded if data is not None)
+    file.write(blob)
+    file.write(_padding(len(blob)))
+    return len(blob)
+
+
+def dump_terms(terms, file):
+    """ Schreibt Terme als gemeinsamen DAG in ein Datei-Objekt im Binaermodus
+
+        :param terms: Liste von Objekten der Klasse Term
+        :param file: Datei-Objekt
+    """
+    index_by_term = {}
+    names = []
+    index_by_name = {}
+    codes = array("i")
+    name_indices = array("i")
+    child_offsets = array("q", [0])
+    children = array("i")
+    # Knoten werden nach ihren Kindern nummeriert, der Stack ersetzt die Rekursion
+    for root in terms:
+        stack = [(root, False)]
+        while stack:
+            term, expanded = stack.pop()
+            if term in index_by_term:
+                continue
+            if not expanded and term.parameters:
+                stack.append((term, True))
+                stack.extend((parameter, False) for parameter in reversed(term.parameters))
+                continue
+            if term.code == OP_VARIABLE:
+                name_index = index_by_name.get(term.operator)
+                if name_index is None:
+                    name_index = index_by_name[term.operator] = len(names)
+                    names.append(term.operator)
+            else:
+                name_index = -1
+            index_by_term[term] = len(codes)
+            codes.append(term.code)
+            name_indices.append(name_index)
+            children.extend(index_by_term[parameter] for parameter in term.parameters)
+            child_offsets.append(len(children))
+    roots = array("i", (index_by_term[term] for term in terms))
+    names_bytes = sum(len(name.encode("utf-8")) for name in names)
+    file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, KIND_TERMS, len(names), names_bytes, len(codes), len(children),
+                            len(roots)))
+    _write_names(file, names)
+    for values in (codes, name_indices, child_offsets, children, roots):
+        _write_array(file, values)
+
+
+def dump_clauses(store, file):
+    """ Schreibt einen ClauseStore mit seinen Variablennamen in ein Datei-Objekt im Binaermodus
+
+        :param store: ClauseStore
+        :param file: Datei-Objekt
+    """
+    names_bytes = sum(len(name.encode("utf-8")) for name in store.variable_names if name is not None)
+    literals = store.literals if isinstance(store.literals, array) else array("i", store.literals)
+    offsets = store.offsets if isinstance(store.offsets, array) else array("q", store.offsets)
+    file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, KIND_CLAUSES, store.num_variables, names_bytes,
+                            len(offsets) - 1, len(literals), 0))
+    _write_names(file, store.variable_names)
+    _write_array(file, offsets)
+    _write_array(file, literals)
+
+
+class _Reader:
+    """ Liest die Abschnitte einer Datei nacheinander aus einem Puffer """
+    def __init__(self, buffer, kind):
+        self.view = memoryview(buffer).cast("B")
+        if len(self.view) < _HEADER.size:
+            raise ValueError("File too short for a header")
+        magic, version, file_kind, *counts = _HEADER.unpack_from(self.view)
+        if magic != MAGIC:
+            raise ValueError("Not a serialized formula file")
+        if version != FORMAT_VERSION:
+            raise ValueError("Unsupported format version %d" % version)
+        if file_kind != kind:
+            raise ValueError("File contains kind %d, expected %d" % (file_kind, kind))
+        self.counts = counts
+        self.position = _HEADER.size
+
+    def bytes(self, length):
+        end = self.position + length
+        if end > len(self.view):
+            raise ValueError("File is truncated")
+        data = self.view[self.position:end]
+        self.position = end + (-length % 8)
+        return data
+
+    def array(self, typecode, count, copy=False):
+        """ Liefert count Werte als memoryview auf den Puffer oder, bei copy=True bzw. big-endian, als array """
+        data = self.bytes(count * array(typecode).itemsize)
+        if sys.byteorder != "little":
+            values = array(typecode, data.tobytes())
+            values.byteswap()
+            return values
+        if copy:
+            return array(typecode, data.tobytes())
+        return data.cast(typecode)
+
+    def names(self, count, names_bytes):
+        lengths = self.array("i", count)
+        blob = self.bytes(names_bytes)
+        names = []
+        position = 0
+        for length in lengths:
+            if length < 0:
+                names.append(None)
+            else:
+                names.append(str(blob[position:position + length], "utf-8"))
+                position += length
+        return names
+
+
+def load_terms(buffer):
+    """ Liest Terme aus einem Puffer (bytes, mmap, memoryview), den dump_terms geschrieben hat.
+        Durch das Hash-Consing sind die Ergebnisse dieselben Objekte wie die urspruenglichen Terme, solange diese
+        noch existieren.
+
+        :param buffer: Objekt mit Buffer-Protokoll
+        :return: Liste von Objekten der Klasse Term in der Reihenfolge von dump_terms
+    """
+    reader = _Reader(buffer, KIND_TERMS)
+    num_names, names_bytes, num_nodes, num_children, num_roots = reader.counts
+    names = reader.names(num_names, names_bytes)
+    codes_position = reader.position
+    codes = reader.array("i", num_nodes)
+    name_indices = reader.array("i", num_nodes)
+    child_offsets = reader.array("q", num_nodes + 1)
+    children = reader.array("i", num_children)
+    roots = reader.array("i", num_roots)
+    nodes = []
+    for index in range(num_nodes):
+        code = codes[index]
+        if code == OP_VARIABLE:
+            nodes.append(Term(names[name_indices[index]], []))
+        else:
+            operator = _OPERATORS.get(code)
+            if operator is None:
+                raise ValueError("Unknown operator code %d at offset %d" % (code, codes_position + 4 * index))
+            parameters = [nodes[child] for child in children[child_offsets[index]:child_offsets[index + 1]]]
+            nodes.append(Term(operator, parameters))
+    return [nodes[root] for root in roots]
+
+
+def load_clauses(buffer, copy=False):
+    """ Liest einen ClauseStore aus einem Puffer (bytes, mmap, memoryview), den dump_clauses geschrieben hat.
+        Ohne copy verweisen literals und offsets des ClauseStore als memoryview direkt auf den Puffer, es koennen
+        dann keine Klauseln hinzugefuegt werden.
+
+        :param buffer: Objekt mit Buffer-Protokoll
+        :param copy: bei True werden die Literale in arrays kopiert, der ClauseStore ist dann veraenderbar
+        :return: ClauseStore
+    """
+    reader = _Reader(buffer, KIND_CLAUSES)
+    num_variables, names_bytes, num_clauses, num_literals, _ = reader.counts
+    store = ClauseStore()
+    store.variable_names = reader.names(num_variables, names_bytes)
+    store.variable_number_by_name = {
+        name: number for number, name in enumerate(store.variable_names, 1) if name is not None
+    }
+    store.offsets = reader.array("q", num_clauses + 1, copy)
+    store.literals = reader.array("i", num_literals, copy)
+    return store
+
+
+def map_file(path):
+    """ Bildet eine Datei nur lesbar in den Speicher ab, z.B. fuer load_terms und load_clauses.
+        Das mmap bleibt geoeffnet, solange ein geladener ClauseStore darauf verweist.
+
+        :param path: Pfad der Datei
+        :return: mmap.mmap
+    """
+    with open(path, "rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
@@ -0,0 +1,86 @@
+import io
+import os
+import tempfile
+from array import array
+
+from aufgabe1neu import ENCODING_TSEITIN, ParserStringToDIMACS
+from serialization import dump_clauses, dump_terms, load_clauses, load_terms, map_file
+from solver import CDCLSolver
+
+
+def test_terms_round_trip():
+    y = ParserStringToDIMACS()
+    formulas = ["And(Or(a,b),Or(a,b),Not(c))", "BiImpl(Or(a,b),TOP)", "long_name_ä"]
+    terms = [y.build_term_from_string(formula) for formula in formulas]
+    file = io.BytesIO()
+    dump_terms(terms, file)
+    data = file.getvalue()
+    assert len(data) % 8 == 0
+    # gemeinsame Teilterme sind dieselben Objekte
+    loaded = load_terms(data)
+    assert all(a is b for a, b in zip(loaded, terms))
+    assert loaded[0].parameters[0] is loaded[1].parameters[0]
+    assert load_terms(memoryview(data)) == loaded
+    deep = y.build_term_from_string("Not(" * 5000 + "a" + ")" * 5000)
+    file = io.BytesIO()
+    dump_terms([deep], file)
+    assert load_terms(file.getvalue())[0] is deep
+
+
+def test_clauses_round_trip_with_mmap():
+    y = ParserStringToDIMACS()
+    store = y.convert_formula_to_clauses("Impl(And(a,Or(b,Not(c))),BiImpl(c,a))", ENCODING_TSEITIN)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "formula.bin")
+        with open(path, "wb") as file:
+            dump_clauses(store, file)
+        mapped = map_file(path)
+        loaded = load_clauses(mapped)
+        assert isinstance(loaded.literals, memoryview) and loaded.literals.obj is mapped
+        assert loaded.to_dimacs() == store.to_dimacs()
+        assert loaded.variable_number_by_name == store.variable_number_by_name
+        assert loaded.variable_names == store.variable_names
+        assert CDCLSolver(loaded, loaded.num_variables).solve()
+        copied = load_clauses(mapped, copy=True)
+        assert isinstance(copied.literals, array)
+        copied.add_clause([1])
+        assert copied.num_clauses == store.num_clauses + 1
+        del loaded
+        mapped.close()
+        # dump_clauses schreibt auch einen aus dem Puffer geladenen ClauseStore
+        with open(path, "rb") as file:
+            data = file.read()
+        file = io.BytesIO()
+        dump_clauses(load_clauses(data), file)
+        assert file.getvalue() == data
+
+
+def test_invalid_files():
+    file = io.BytesIO()
+    dump_terms([ParserStringToDIMACS.build_term_from_string("a")], file)
+    data = file.getvalue()
+    for buffer, message in (
+        (b"", "too short"),
+        (b"XXXX" + data[4:], "Not a serialized"),
+        (data[:4] + b"\x09\x00" + data[6:], "version"),
+        (data[:-8], "truncated"),
+        # Kopf (56 Bytes) und Namen (zweimal 8 Bytes), danach der Operatorcode des einzigen Knotens
+        (data[:72] + (99).to_bytes(4, "little") + data[76:], "Unknown operator code 99 at offset 72"),
+    ):
+        try:
+            load_terms(buffer)
+        except ValueError as error:
+            assert message in str(error), message
+        else:
+            assert False, message
+    try:
+        load_clauses(data)
+    except ValueError as error:
+        assert "kind" in str(error)
+    else:
+        assert False
+
+
+test_terms_round_trip()
+test_clauses_round_trip_with_mmap()
+test_invalid_files()
@@ -0,0 +1,414 @@
+import heapq
+
+
+def luby(index):
+    """ Liefert das Glied mit dem gegebenen Index (ab 0) der Luby-Folge 1, 1, 2, 1, 1, 2, 4, 1, ...
+
+        :param index: int
+        :return: int
+    """
+    size = 1
+    exponent = 0
+    while size < index + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        exponent -= 1
+        index = index % size
+    return 1 << exponent
+
+
+class CDCLSolver:
+    """
+    SAT-Solver nach dem CDCL-Verfahren (Conflict Driven Clause Learning) fuer Klauseln im DIMACS Format,
+    Variable n als Literal n, Not(Variable n) als -n.
+
+    Verwendet werden zwei beobachtete Literale je Klausel fuer die Unit Propagation, VSIDS-Aktivitaeten fuer
+    die Wahl der Entscheidungsvariablen mit Phase Saving, 1UIP-Klausellernen mit Minimierung, Neustarts nach der
+    Luby-Folge und das Loeschen gelernter Klauseln mit hoher LBD. Der Solver ist inkrementell: nach solve()
+    koennen weitere Klauseln hinzugefuegt werden, gelernte Klauseln bleiben erhalten.
+
+    Intern wird Literal n als 2 * n und -n als 2 * n + 1 dargestellt.
+
+    Attribute: model: nach erfolgreichem solve() die Liste der Literale aller Variablen, sonst None
+               core: nach solve() mit widerspruechlichen Annahmen die Liste der beteiligten Annahmen
+               conflicts, decisions, propagations, restarts: Zaehler fuer Statistiken
+    """
+    def __init__(self, clauses=(), num_variables=0, restart_base=100, variable_decay=0.95):
+        self.model = None
+        self.core = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.restarts = 0
+        self._restart_base = restart_base
+        self._variable_decay = variable_decay
+        self._ok = True
+        self._num_variables = 0
+        # je Literal: 1 wahr, -1 falsch, 0 unbelegt
+        self._values = [0, 0]
+        self._level = [0]
+        self._reason = [None]
+        self._activity = [0.0]
+        self._polarity = [False]
+        self._seen = [False]
+        self._watches = [[], []]
+        self._heap = []
+        self._variable_increment = 1.0
+        self._trail = []
+        self._trail_limits = []
+        self._queue_head = 0
+        self._learnts = []
+        self._lbd = {}
+        self._max_learnts = 2000
+        if num_variables:
+            self._ensure_variable(num_variables)
+        for clause in clauses:
+            self.add_clause(clause)
+
+    @property
+    def num_variables(self):
+        return self._num_variables
+
+    def new_variable(self):
+        """ Legt eine neue Variable an
+
+            :return: Nummer der Variablen
+        """
+        self._ensure_variable(self._num_variables + 1)
+        return self._num_variables
+
+    def _ensure_variable(self, variable):
+        while self._num_variables < variable:
+            self._num_variables += 1
+            self._values.extend((0, 0))
+            self._level.append(0)
+            self._reason.append(None)
+            self._activity.append(0.0)
+            self._polarity.append(False)
+            self._seen.append(False)
+            self._watches.extend(([], []))
+            heapq.heappush(self._heap, (0.0, self._num_variables))
+
+    def add_clause(self, literals):
+        """ Fuegt eine Klausel hinzu. Doppelte Literale werden entfernt, Tautologien ignoriert.
+
+            :param literals: Iterable von int
+            :return: False, falls die Klauselmenge damit bereits auf Ebene 0 unerfuellbar ist
+        """
+        if not self._ok:
+            return False
+        if self._trail_limits:
+            self._cancel_until(0)
+        clause = []
+        present = set()
+        for literal in literals:
+            variable = abs(literal)
+            if variable == 0:
+                raise ValueError("0 is not a valid literal")
+            self._ensure_variable(variable)
+            encoded = 2 * variable + (literal < 0)
+            value = self._values[encoded]
+            if value == 1 or encoded ^ 1 in present:
+                return True
+            if value == 0 and encoded not in present:
+                present.add(encoded)
+                clause.append(encoded)
+        if not clause:
+            self._ok = False
+            return False
+        if len(clause) == 1:
+            self._enqueue(clause[0], None)
+            if self._propagate() is not None:
+                self._ok = False
+            return self._ok
+        self._watches[clause[0]].append(clause)
+        self._watches[clause[1]].append(clause)
+        return True
+
+    def _enqueue(self, literal, reason):
+        variable = literal >> 1
+        self._values[literal] = 1
+        self._values[literal ^ 1] = -1
+        self._level[variable] = len(self._trail_limits)
+        self._reason[variable] = reason
+        self._trail.append(literal)
+
+    def _propagate(self):
+        """ Unit Propagation ueber die beobachteten Literale
+
+            :return: Konfliktklausel oder None
+        """
+        values = self._values
+        watches = self._watches
+        trail = self._trail
+        conflict = None
+        while self._queue_head < len(trail):
+            false_literal = trail[self._queue_head] ^ 1
+            self._queue_head += 1
+            self.propagations += 1
+            watch_list = watches[false_literal]
+            i = 0
+            j = 0
+            end = len(watch_list)
+            while i < end:
+                clause = watch_list[i]
+                i += 1
+                # das falsche Literal steht an Position 1
+                if clause[0] == false_literal:
+                    clause[0] = clause[1]
+                    clause[1] = false_literal
+                first = clause[0]
+                if values[first] == 1:
+                    watch_list[j] = clause
+                    j += 1
+                    continue
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    if values[literal] != -1:
+                        clause[1] = literal
+                        clause[k] = false_literal
+                        watches[literal].append(clause)
+                        break
+                else:
+                    watch_list[j] = clause
+                    j += 1
+                    if values[first] == -1:
+                        conflict = clause
+                        while i < end:
+                            watch_list[j] = watch_list[i]
+                            j += 1
+                            i += 1
+                        self._queue_head = len(trail)
+                    else:
+                        self._enqueue(first, clause)
+            del watch_list[j:]
+            if conflict is not None:
+                return conflict
+        return None
+
+    def _analyze(self, conflict):
+        """ Bestimmt die gelernte Klausel nach dem ersten Unique Implication Point und die Ruecksprungebene
+
+            :return: Paar (gelernte Klausel, Ebene)
+        """
+        seen = self._seen
+        level = self._level
+        trail = self._trail
+        current_level = len(self._trail_limits)
+        learnt = [0]
+        counter = 0
+        literal = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                variable = other >> 1
+                if not seen[variable] and level[variable] > 0:
+                    self._bump_variable(variable)
+                    seen[variable] = True
+                    if level[variable] >= current_level:
+                        counter += 1
+                    else:
+                        learnt.append(other)
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            literal = trail[index]
+            index -= 1
+            clause = self._reason[literal >> 1]
+            seen[literal >> 1] = False
+            counter -= 1
+            if counter == 0:
+                break
+        learnt[0] = literal ^ 1
+
+        # Minimierung: Literale, deren Begruendung vollstaendig in der Klausel liegt, sind ueberfluessig
+        minimized = [learnt[0]]
+        for other in learnt[1:]:
+            reason = self._reason[other >> 1]
+            if reason is None or any(not seen[x >> 1] and level[x >> 1] > 0 for x in reason[1:]):
+                minimized.append(other)
+        for other in learnt:
+            seen[other >> 1] = False
+
+        backtrack_level = 0
+        if len(minimized) > 1:
+            best = 1
+            for k in range(2, len(minimized)):
+                if level[minimized[k] >> 1] > level[minimized[best] >> 1]:
+                    best = k
+            minimized[1], minimized[best] = minimized[best], minimized[1]
+            backtrack_level = level[minimized[1] >> 1]
+        return minimized, backtrack_level
+
+    def _analyze_final(self, literal):
+        """ Bestimmt die Annahmen, die zusammen das falsche Literal erzwingen
+
+            :param literal: kodiertes Literal, das wahr sein muesste
+            :return: Liste der beteiligten Annahmen im DIMACS Format
+        """
+        core = [literal]
+        if not self._trail_limits:
+            return [self._decode(literal)]
+        seen = self._seen
+        seen[literal >> 1] = True
+        for index in range(len(self._trail) - 1, self._trail_limits[0] - 1, -1):
+            variable = self._trail[index] >> 1
+            if seen[variable]:
+                reason = self._reason[variable]
+                if reason is None:
+                    core.append(self._trail[index])
+                else:
+                    for other in reason[1:]:
+                        if self._level[other >> 1] > 0:
+                            seen[other >> 1] = True
+                seen[variable] = False
+        seen[literal >> 1] = False
+        return [self._decode(x) for x in core]
+
+    @staticmethod
+    def _decode(literal):
+        return -(literal >> 1) if literal & 1 else literal >> 1
+
+    def _bump_variable(self, variable):
+        activity = self._activity
+        activity[variable] += self._variable_increment
+        if activity[variable] > 1e100:
+            for v in range(1, self._num_variables + 1):
+                activity[v] *= 1e-100
+            self._variable_increment *= 1e-100
+            self._heap = [(-activity[v], v) for v in range(1, self._num_variables + 1) if self._values[2 * v] == 0]
+            heapq.heapify(self._heap)
+        elif self._values[2 * variable] == 0:
+            heapq.heappush(self._heap, (-activity[variable], variable))
+
+    def _pick_branch_literal(self):
+        heap = self._heap
+        activity = self._activity
+        values = self._values
+        while heap:
+            negative_activity, variable = heapq.heappop(heap)
+            if values[2 * variable] != 0 or -negative_activity != activity[variable]:
+                continue
+            return 2 * variable + (not self._polarity[variable])
+        return None
+
+    def _cancel_until(self, level):
+        if len(self._trail_limits) <= level:
+            return
+        values = self._values
+        activity = self._activity
+        start = self._trail_limits[level]
+        for index in range(len(self._trail) - 1, start - 1, -1):
+            literal = self._trail[index]
+            variable = literal >> 1
+            values[literal] = 0
+            values[literal ^ 1] = 0
+            self._reason[variable] = None
+            self._polarity[variable] = not literal & 1
+            heapq.heappush(self._heap, (-activity[variable], variable))
+        del self._trail[start:]
+        del self._trail_limits[level:]
+        self._queue_head = start
+        if len(self._heap) > 8 * self._num_variables + 64:
+            # veraltete Eintraege entfernen
+            self._heap = [(-activity[v], v) for v in range(1, self._num_variables + 1) if values[2 * v] == 0]
+            heapq.heapify(self._heap)
+
+    def _locked(self, clause):
+        variable = clause[0] >> 1
+        return self._reason[variable] is clause and self._values[clause[0]] == 1
+
+    def _reduce_learnts(self):
+        """ Loescht die Haelfte der gelernten Klauseln mit der groessten LBD """
+        lbd = self._lbd
+        self._learnts.sort(key=lambda clause: lbd[id(clause)])
+        keep = []
+        removed = set()
+        half = len(self._learnts) // 2
+        for index, clause in enumerate(self._learnts):
+            if index < half or lbd[id(clause)] <= 2 or self._locked(clause):
+                keep.append(clause)
+            else:
+                removed.add(id(clause))
+                del lbd[id(clause)]
+        self._learnts = keep
+        for watch_list in self._watches:
+            watch_list[:] = [clause for clause in watch_list if id(clause) not in removed]
+
+    def solve(self, assumptions=()):
+        """ Prueft die Klauselmenge unter den gegebenen Annahmen auf Erfuellbarkeit
+
+            :param assumptions: Iterable von Literalen, die als wahr angenommen werden
+            :return: True, falls erfuellbar (Modell in self.model), sonst False
+                     (bei widerspruechlichen Annahmen stehen die beteiligten Annahmen in self.core)
+        """
+        self.model = None
+        self.core = None
+        if not self._ok:
+            self.core = []
+            return False
+        encoded_assumptions = []
+        for literal in assumptions:
+            self._ensure_variable(abs(literal))
+            encoded_assumptions.append(2 * abs(literal) + (literal < 0))
+        self._cancel_until(0)
+        restart_limit = luby(self.restarts) * self._restart_base
+        conflicts_since_restart = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts_since_restart += 1
+                if not self._trail_limits:
+                    self._ok = False
+                    self.core = []
+                    return False
+                learnt, backtrack_level = self._analyze(conflict)
+                self._cancel_until(backtrack_level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    levels = set(self._level[literal >> 1] for literal in learnt)
+                    self._lbd[id(learnt)] = len(levels)
+                    self._learnts.append(learnt)
+                    self._watches[learnt[0]].append(learnt)
+                    self._watches[learnt[1]].append(learnt)
+                    self._enqueue(learnt[0], learnt)
+                self._variable_increment /= self._variable_decay
+                continue
+
+            if conflicts_since_restart >= restart_limit:
+                self.restarts += 1
+                conflicts_since_restart = 0
+                restart_limit = luby(self.restarts) * self._restart_base
+                self._cancel_until(0)
+                continue
+            if len(self._learnts) - len(self._trail) >= self._max_learnts:
+                self._reduce_learnts()
+                self._max_learnts = int(self._max_learnts * 1.1)
+
+            next_literal = None
+            while len(self._trail_limits) < len(encoded_assumptions):
+                literal = encoded_assumptions[len(self._trail_limits)]
+                value = self._values[literal]
+                if value == 1:
+                    # Annahme ist bereits erfuellt, leere Entscheidungsebene
+                    self._trail_limits.append(len(self._trail))
+                elif value == -1:
+                    self.core = self._analyze_final(literal)
+                    self._cancel_until(0)
+                    return False
+                else:
+                    next_literal = literal
+                    break
+            if next_literal is None:
+                next_literal = self._pick_branch_literal()
+                if next_literal is None:
+                    self.model = [v if self._values[2 * v] == 1 else -v for v in range(1, self._num_variables + 1)]
+                    self._cancel_until(0)
+                    return True
+                self.decisions += 1
+            self._trail_limits.append(len(self._trail))
+            self._enqueue(next_literal, None)
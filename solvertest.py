@@ -0,0 +1,67 @@
+import random
+
+from aufgabe1neu import ParserStringToDIMACS
+from benchmark import pigeonhole
+from oracles import clause_models
+from solver import CDCLSolver, luby
+
+
+def test_luby():
+    assert [luby(i) for i in range(15)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+
+def test_solve_random_formulas():
+    generator = random.Random(1)
+    for _ in range(300):
+        num_variables = generator.randint(1, 8)
+        clauses = [
+            [generator.choice((-1, 1)) * generator.randint(1, num_variables) for _ in range(generator.randint(1, 3))]
+            for _ in range(generator.randint(1, 35))
+        ]
+        solver = CDCLSolver(clauses)
+        result = solver.solve()
+        assert result == bool(clause_models(num_variables, clauses, ())), clauses
+        if result:
+            assert all(any(solver.model[abs(literal) - 1] == literal for literal in clause) for clause in clauses)
+
+
+def test_solve_pigeonhole():
+    assert not CDCLSolver(ParserStringToDIMACS.convert_formula_to_clauses(pigeonhole(6, 5))).solve()
+    solver = CDCLSolver(ParserStringToDIMACS.convert_formula_to_clauses(pigeonhole(5, 5)))
+    assert solver.solve()
+    assert solver.conflicts >= 0
+
+
+def test_incremental_add_clause_and_assumptions():
+    solver = CDCLSolver([[1, 2], [-1, 3]])
+    assert solver.solve()
+    assert solver.solve([-3])
+    assert solver.model[0] == -1 and solver.model[1] == 2
+    assert not solver.solve([-3, -2])
+    assert set(solver.core) <= {-3, -2}
+    assert not CDCLSolver([[1, 2], [-1, 3]] + [[literal] for literal in solver.core]).solve()
+    # Annahmen wirken nur fuer einen Aufruf
+    assert solver.solve()
+    solver.add_clause([-2])
+    assert solver.solve()
+    assert solver.model[:3] == [1, -2, 3]
+    solver.add_clause([-3])
+    assert not solver.solve()
+    assert not solver.add_clause([4])
+
+
+def test_enumerate_with_blocking_clauses():
+    solver = CDCLSolver([[1, 2, 3]])
+    models = []
+    while solver.solve():
+        models.append(tuple(solver.model))
+        solver.add_clause([-literal for literal in solver.model])
+    assert len(models) == 7
+    assert len(set(models)) == 7
+
+
+test_luby()
+test_solve_random_formulas()
+test_solve_pigeonhole()
+test_incremental_add_clause_and_assumptions()
+test_enumerate_with_blocking_clauses()
@@ -0,0 +1,205 @@
+"""
+Bitparallele Wahrheitstafel fuer Formeln mit wenigen Variablen (bis etwa 25), die alle Modelle direkt berechnet,
+statt einen SAT-Solver fuer jedes Modell aufzurufen. Benoetigt NumPy.
+
+Die Belegungen der Variablen v_0 ... v_(n-1) sind von 0 bis 2^n - 1 nummeriert, v_0 ist das hoechstwertige Bit.
+Die Nummern laufen damit in derselben Reihenfolge wie itertools.product((False, True), repeat=n). Jede Spalte der
+Tafel ist ein Bitvektor mit einem Bit je Belegung, gepackt in uint64-Woerter: Bit j von Wort w gehoert zur Belegung
+64 * w + j. Der Term wird je Block einmal von den Blaettern zur Wurzel ausgewertet, jeder Operator ist eine
+vektorisierte Bitoperation auf den Spalten seiner Kinder. Die Belegungen werden in Bloecken von 2^chunk_bits
+verarbeitet, der Speicherbedarf haengt daher nur von chunk_bits und der Groesse des Terms ab.
+"""
+import numpy
+
+from aufgabe1neu import OP_AND, OP_BIIMPL, OP_BOT, OP_IMPL, OP_NOT, OP_OR, OP_TOP, OP_VARIABLE, ParserStringToDIMACS
+
+MAX_VARIABLES = 32
+
+_ALL = numpy.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Spalten der Variablen, deren Bit innerhalb eines Wortes wechselt: Bit b der Belegungsnummer fuer b < 6
+_WORD_PATTERNS = [
+    numpy.uint64(0xAAAAAAAAAAAAAAAA),
+    numpy.uint64(0xCCCCCCCCCCCCCCCC),
+    numpy.uint64(0xF0F0F0F0F0F0F0F0),
+    numpy.uint64(0xFF00FF00FF00FF00),
+    numpy.uint64(0xFFFF0000FFFF0000),
+    numpy.uint64(0xFFFFFFFF00000000),
+]
+
+# Anzahl der gesetzten Bits je Byte, falls numpy.bitwise_count fehlt (NumPy vor 2.0)
+_BYTE_POPCOUNT = numpy.array([bin(value).count("1") for value in range(256)], dtype=numpy.uint8)
+
+
+def _as_term(formula):
+    if isinstance(formula, str):
+        return ParserStringToDIMACS.build_term_from_string(formula)
+    return formula
+
+
+def _variables(term, variables):
+    return ParserStringToDIMACS.variables_of(term) if variables is None else list(variables)
+
+
+def _popcount(words):
+    bitwise_count = getattr(numpy, "bitwise_count", None)
+    if bitwise_count is not None:
+        return int(bitwise_count(words).sum(dtype=numpy.uint64))
+    return int(_BYTE_POPCOUNT[words.view(numpy.uint8)].sum(dtype=numpy.uint64))
+
+
+class _Evaluator:
+    """ Wertet einen oder mehrere Terme blockweise ueber allen Belegungen der gegebenen Variablen aus """
+    def __init__(self, terms, variables, chunk_bits):
+        if len(variables) > MAX_VARIABLES:
+            raise ValueError("Too many variables for a truth table: %d > %d" % (len(variables), MAX_VARIABLES))
+        self.num_variables = len(variables)
+        self.num_assignments = 1 << self.num_variables
+        self._terms = terms
+        self._position = {name: index for index, name in enumerate(variables)}
+        self._words_per_chunk = max(1, (1 << max(chunk_bits, 6)) >> 6)
+        self._num_words = max(1, self.num_assignments >> 6)
+        # Teilterme in Auswertungsreihenfolge und je Teilterm die Anzahl seiner Vorkommen als Kind, damit Spalten
+        # freigegeben werden koennen, sobald alle Eltern ausgewertet sind
+        self._order = []
+        self._uses = {}
+        visited = set()
+        for term in terms:
+            self._uses[term] = self._uses.get(term, 0) + 1
+            stack = [(term, False)]
+            while stack:
+                current, expanded = stack.pop()
+                if expanded:
+                    self._order.append(current)
+                    continue
+                if current in visited:
+                    continue
+                visited.add(current)
+                if current.code == OP_VARIABLE and current.operator not in self._position:
+                    raise ValueError("Variable " + current.operator + " is not in the list of variables")
+                stack.append((current, True))
+                for parameter in reversed(current.parameters):
+                    self._uses[parameter] = self._uses.get(parameter, 0) + 1
+                    stack.append((parameter, False))
+
+    def _variable_column(self, name, word_indices):
+        bit = self.num_variables - 1 - self._position[name]
+        if bit < 6:
+            return numpy.full(len(word_indices), _WORD_PATTERNS[bit], dtype=numpy.uint64)
+        selected = (word_indices >> numpy.uint64(bit - 6)) & numpy.uint64(1)
+        return numpy.where(selected != 0, _ALL, numpy.uint64(0))
+
+    def chunks(self):
+        """ Liefert je Block die Nummer der ersten Belegung und die Spalten der Terme. Bits hinter der letzten
+            Belegung (nur bei weniger als 6 Variablen) sind geloescht.
+
+            :return: Generator von Paaren (int, Liste von numpy.ndarray mit dtype uint64)
+        """
+        for first_word in range(0, self._num_words, self._words_per_chunk):
+            word_indices = numpy.arange(first_word, min(first_word + self._words_per_chunk, self._num_words),
+                                        dtype=numpy.uint64)
+            columns = self._evaluate(word_indices)
+            if self.num_assignments < 64:
+                mask = numpy.uint64((1 << self.num_assignments) - 1)
+                columns = [column & mask for column in columns]
+            yield first_word << 6, columns
+
+    def _evaluate(self, word_indices):
+        columns = {}
+        remaining = dict(self._uses)
+
+        def take(term):
+            remaining[term] -= 1
+            if remaining[term] == 0:
+                return columns.pop(term)
+            return columns[term]
+
+        for term in self._order:
+            code = term.code
+            if code == OP_VARIABLE:
+                column = self._variable_column(term.operator, word_indices)
+            elif code == OP_TOP:
+                column = numpy.full(len(word_indices), _ALL, dtype=numpy.uint64)
+            elif code == OP_BOT:
+                column = numpy.zeros(len(word_indices), dtype=numpy.uint64)
+            else:
+                children = [take(parameter) for parameter in term.parameters]
+                if code == OP_NOT:
+                    column = numpy.invert(children[0])
+                elif code == OP_AND:
+                    column = children[0].copy()
+                    for child in children[1:]:
+                        numpy.bitwise_and(column, child, out=column)
+                elif code == OP_OR:
+                    column = children[0].copy()
+                    for child in children[1:]:
+                        numpy.bitwise_or(column, child, out=column)
+                elif code == OP_IMPL:
+                    column = numpy.invert(children[0])
+                    numpy.bitwise_or(column, children[1], out=column)
+                elif code == OP_BIIMPL:
+                    column = numpy.bitwise_xor(children[0], children[1])
+                    numpy.invert(column, out=column)
+                else:
+                    raise ValueError("Unknown operator " + term.operator)
+            columns[term] = column
+        return [take(term) for term in self._terms]
+
+
+def count_models(formula, variables=None, chunk_bits=22):
+    """ Zaehlt die Modelle einer Formel ueber ihre Wahrheitstafel
+
+        :param formula: String oder Objekt der Klasse Term
+        :param variables: Namen der Variablen, ueber die gezaehlt wird, None fuer die Variablen der Formel
+        :param chunk_bits: je Block werden 2^chunk_bits Belegungen ausgewertet
+        :return: int
+    """
+    term = _as_term(formula)
+    evaluator = _Evaluator([term], _variables(term, variables), chunk_bits)
+    return sum(_popcount(columns[0]) for _, columns in evaluator.chunks())
+
+
+def iter_model_indices(formula, variables=None, chunk_bits=22):
+    """ Liefert die Nummern der Belegungen, die Modelle sind, blockweise als numpy-Arrays (aufsteigend)
+
+        :return: Generator von numpy.ndarray mit dtype int64
+    """
+    term = _as_term(formula)
+    evaluator = _Evaluator([term], _variables(term, variables), chunk_bits)
+    for first, columns in evaluator.chunks():
+        # little-endian, damit Bit j eines Wortes an Position j der entpackten Bytes steht
+        bits = numpy.unpackbits(columns[0].astype("<u8", copy=False).view(numpy.uint8), bitorder="little")
+        indices = numpy.flatnonzero(bits)
+        if len(indices):
+            yield indices + first
+
+
+def iter_models(formula, variables=None, chunk_bits=22):
+    """ Liefert alle Modelle einer Formel in der Reihenfolge von itertools.product((False, True), ...)
+
+        :param formula: String oder Objekt der Klasse Term
+        :param variables: Namen der Variablen eines Modells, None fuer die Variablen der Formel
+        :param chunk_bits: je Block werden 2^chunk_bits Belegungen ausgewertet
+        :return: Generator von Dictionaries Variable -> Boolean
+    """
+    term = _as_term(formula)
+    names = _variables(term, variables)
+    shifts = [len(names) - 1 - position for position in range(len(names))]
+    for indices in iter_model_indices(term, names, chunk_bits):
+        for index in indices.tolist():
+            yield {name: bool(index >> shift & 1) for name, shift in zip(names, shifts)}
+
+
+def equivalent(left, right, chunk_bits=22):
+    """ Prueft zwei Formeln auf Aequivalenz, indem ihre Wahrheitstafeln blockweise verglichen werden
+
+        :param left, right: Strings oder Objekte der Klasse Term
+        :return: Boolean
+    """
+    left = _as_term(left)
+    right = _as_term(right)
+    names = ParserStringToDIMACS.variables_of(left)
+    known = set(names)
+    names.extend(name for name in ParserStringToDIMACS.variables_of(right) if name not in known)
+    evaluator = _Evaluator([left, right], names, chunk_bits)
+    return all(numpy.array_equal(first, second) for _, (first, second) in evaluator.chunks())
@@ -0,0 +1,56 @@
+import itertools
+import random
+
+import pytest
+
+from aufgabe1neu import ParserStringToDIMACS
+from benchmark import parity_chain, pigeonhole
+from oracles import formula_models, random_formula
+
+# truthtable braucht numpy, ohne numpy wird das ganze Modul uebersprungen
+pytest.importorskip("numpy")
+
+from truthtable import count_models, equivalent, iter_model_indices, iter_models
+
+
+def test_truth_table_small_formulas():
+    assert count_models("Or(a,b)") == 3
+    assert list(iter_models("Or(a,b)")) == [{"a": False, "b": True}, {"a": True, "b": False},
+                                            {"a": True, "b": True}]
+    assert count_models("Or(a,b)", ["a", "b", "c"]) == 6
+    assert count_models("TOP") == 1 and count_models("BOT") == 0
+    assert count_models("And(a,Not(a))") == 0
+    assert [indices.tolist() for indices in iter_model_indices("Impl(a,b)")] == [[0, 1, 3]]
+    assert equivalent("Impl(a,b)", "Or(Not(a),b)")
+    assert equivalent("BiImpl(a,b)", "Not(BiImpl(a,Not(b)))")
+    assert not equivalent("Impl(a,b)", "Impl(b,a)")
+    assert not equivalent("a", "Or(a,And(b,Not(b)),c)")
+
+
+def test_truth_table_against_enumeration():
+    generator = random.Random(4)
+    names = ["a", "b", "c", "d", "e"]
+    for _ in range(40):
+        formula = random_formula(generator, 4, names)
+        term = ParserStringToDIMACS.build_term_from_string(formula)
+        expected = sorted(formula_models(term, names))
+        assert [tuple(model[name] for name in names) for model in iter_models(term, names)] == expected
+        assert count_models(term, names) == len(expected)
+    assert list(itertools.islice(iter_models("TOP", names), 3)) == [
+        dict(zip(names, values)) for values in itertools.islice(itertools.product((False, True), repeat=5), 3)
+    ]
+
+
+def test_truth_table_chunks():
+    # 2^20 Belegungen in Bloecken zu 2^10
+    assert count_models(parity_chain(20), chunk_bits=10) == 2 ** 19
+    assert count_models(pigeonhole(4, 4), chunk_bits=8) == 24
+    indices = [index for block in iter_model_indices(pigeonhole(3, 3), chunk_bits=6) for index in block.tolist()]
+    assert len(indices) == 6 and indices == sorted(indices)
+    assert equivalent(parity_chain(16), "Not(" + parity_chain(16) + ")") is False
+    assert equivalent(parity_chain(12), parity_chain(12), chunk_bits=7)
+
+
+test_truth_table_small_formulas()
+test_truth_table_against_enumeration()
+test_truth_table_chunks()